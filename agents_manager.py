@@ -1,39 +1,16 @@
 from iointel import Agent, PersonaConfig, AsyncMemory
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from settings import Settings
-from learning_engine import ZeraLearningEngine, get_enhanced_security_instructions, get_enhanced_gas_instructions
+from learning_engine import ZeraLearningEngine, get_enhanced_security_instructions, get_enhanced_gas_instructions, dumps_json, loads_json, contract_digest
 # from custom import DataAnalysisTool, ReportGenerationTool, CoordinationTool  # Commented out until we create this file
 
-class AgentManager:
-    def __init__(self, settings: Settings):
-        self.settings = settings
-        self.agents: Dict[str, Agent] = {}
-        self.shared_memory = AsyncMemory(connection_string=settings.memory_connection_string) if settings.enable_memory else None
-        self.learning_engine = ZeraLearningEngine(settings) if settings.enable_memory else None
-    
-    async def create_agents(self, contract_name: str = "GenericContract", contract_code: str = ""):
-        """Create specialized smart contract security auditing agents with learning capabilities"""
-        
-        # Get learning insights from similar contracts if learning engine is available
-        learning_data = {}
-        if self.learning_engine and contract_code:
-            learning_data = await self.learning_engine.learn_from_similar_contracts(contract_name, contract_code)
-        
-        # Security Analyst Agent - Primary vulnerability detection
-        security_persona = PersonaConfig(
-            name="Zera Prime",
-            role="Senior Smart Contract Security Auditor",
-            style="meticulous and security-focused",
-            domain_knowledge=[
-                "Solidity security patterns", "EVM internals", "DeFi attack vectors", 
-                "reentrancy attacks", "access control vulnerabilities", "proxy patterns",
-                "flash loan exploits", "MEV vulnerabilities", "storage collisions"
-            ],
-            personality="paranoid, thorough, assumes malicious intent, detail-obsessed"
-        )
-        
-        # Use enhanced instructions with learning data
-        security_instructions = get_enhanced_security_instructions(learning_data) if learning_data else """You are Zera, an elite smart contract security auditor. Your mission is to identify ALL vulnerabilities in Solidity code.
+# Default agent instructions and personas are static, so build them once at import time
+_SECURITY_DEFAULT_INSTRUCTIONS = """You are Zera, an elite smart contract security auditor. Your mission is to identify ALL vulnerabilities in Solidity code.
 
             🔍 COMPREHENSIVE SECURITY ANALYSIS REQUIRED:
 
@@ -81,32 +58,8 @@ class AgentManager:
             Rate severity: CRITICAL, HIGH, MEDIUM, LOW, INFORMATIONAL
             BE THOROUGH - Find ALL issues, not just obvious ones.
             Always explain attack scenarios and provide exploit examples."""
-        
-        self.agents["security_auditor"] = Agent(
-            name="ZeraSecurityAuditor", 
-            instructions=security_instructions,
-            persona=security_persona,
-            tools=[],
-            memory=self.shared_memory,
-            model=self.settings.default_model,
-            api_key=self.settings.api_key,
-            base_url=self.settings.base_url
-        )
-        
-        # Gas Optimization Agent
-        gas_persona = PersonaConfig(
-            name="Gaser",
-            role="Gas Optimization Specialist", 
-            style="efficiency-obsessed and cost-conscious",
-            domain_knowledge=[
-                "EVM opcodes", "storage layout optimization", "gas mechanics",
-                "compiler optimizations", "assembly patterns", "state variable packing"
-            ],
-            personality="frugal, analytical, optimization-focused"
-        )
-        
-        # Use enhanced instructions with learning data
-        gas_instructions = get_enhanced_gas_instructions(learning_data) if learning_data else """You are a gas optimization expert. Analyze Solidity code for gas inefficiencies.
+
+_GAS_DEFAULT_INSTRUCTIONS = """You are a gas optimization expert. Analyze Solidity code for gas inefficiencies.
 
             ⚡ COMPREHENSIVE GAS OPTIMIZATION ANALYSIS:
 
@@ -149,32 +102,7 @@ class AgentManager:
             Provide gas savings estimates and refactored code examples.
             Prioritize optimizations by impact and provide implementation guidance."""
 
-        self.agents["gas_optimizer"] = Agent(
-            name="GasOptimizer",
-            instructions=gas_instructions,
-            persona=gas_persona,
-            tools=[],
-            memory=self.shared_memory,
-            model=self.settings.default_model,
-            api_key=self.settings.api_key,
-            base_url=self.settings.base_url
-        )
-        
-        # Audit Reporter Agent  
-        reporter_persona = PersonaConfig(
-            name="AuditScribe",
-            role="Security Audit Report Writer",
-            style="comprehensive and professional",
-            domain_knowledge=[
-                "audit report formats", "vulnerability documentation", 
-                "technical writing", "security standards", "compliance frameworks"
-            ],
-            personality="thorough, structured, clarity-focused"
-        )
-        
-        self.agents["audit_reporter"] = Agent(
-            name="AuditReporter",
-            instructions="""You are an expert audit report writer. Create comprehensive, professional security audit reports.
+_REPORTER_INSTRUCTIONS = """You are an expert audit report writer. Create comprehensive, professional security audit reports.
 
             Report Structure:
             1. Executive Summary
@@ -193,15 +121,221 @@ class AgentManager:
             - Remediation steps
             - References to standards (SWC, OWASP)
             
-            Use professional audit language, be precise, and focus on actionable insights.""",
-            persona=reporter_persona,
+            Use professional audit language, be precise, and focus on actionable insights."""
+
+@dataclass(frozen=True, slots=True)
+class PersonaSpec:
+    """Immutable description of an agent persona; hashable, so PersonaConfig objects can be cached per spec"""
+    name: str
+    role: str
+    style: str
+    domain_knowledge: Tuple[str, ...]
+    personality: str
+
+@functools.lru_cache(maxsize=None)
+def _persona_from_spec(spec: PersonaSpec) -> PersonaConfig:
+    """Build (once per spec) the PersonaConfig used by iointel"""
+    return PersonaConfig(
+        name=spec.name,
+        role=spec.role,
+        style=spec.style,
+        domain_knowledge=list(spec.domain_knowledge),
+        personality=spec.personality
+    )
+
+_SECURITY_PERSONA_SPEC = PersonaSpec(
+    name="Zera Prime",
+    role="Senior Smart Contract Security Auditor",
+    style="meticulous and security-focused",
+    domain_knowledge=(
+        "Solidity security patterns", "EVM internals", "DeFi attack vectors", 
+        "reentrancy attacks", "access control vulnerabilities", "proxy patterns",
+        "flash loan exploits", "MEV vulnerabilities", "storage collisions"
+    ),
+    personality="paranoid, thorough, assumes malicious intent, detail-obsessed"
+)
+
+_GAS_PERSONA_SPEC = PersonaSpec(
+    name="Gaser",
+    role="Gas Optimization Specialist", 
+    style="efficiency-obsessed and cost-conscious",
+    domain_knowledge=(
+        "EVM opcodes", "storage layout optimization", "gas mechanics",
+        "compiler optimizations", "assembly patterns", "state variable packing"
+    ),
+    personality="frugal, analytical, optimization-focused"
+)
+
+_REPORTER_PERSONA_SPEC = PersonaSpec(
+    name="AuditScribe",
+    role="Security Audit Report Writer",
+    style="comprehensive and professional",
+    domain_knowledge=(
+        "audit report formats", "vulnerability documentation", 
+        "technical writing", "security standards", "compliance frameworks"
+    ),
+    personality="thorough, structured, clarity-focused"
+)
+
+# Learning lookups are cached per (contract_name, contract_code) for a while, since the
+# same contract is often audited repeatedly in one session
+_LEARNING_CACHE_TTL = 600  # seconds
+_LEARNING_CACHE_SIZE = 1024
+
+def _learning_key(learning_data: dict) -> str:
+    """Canonical JSON form of learning data, used as a memoization key"""
+    return dumps_json(learning_data, sort_keys=True)
+
+@functools.lru_cache(maxsize=128)
+def _cached_security_instructions(learning_key: str) -> str:
+    """Enhanced security instructions, reused across contracts with the same learning data"""
+    return get_enhanced_security_instructions(loads_json(learning_key))
+
+@functools.lru_cache(maxsize=128)
+def _cached_gas_instructions(learning_key: str) -> str:
+    """Enhanced gas instructions, reused across contracts with the same learning data"""
+    return get_enhanced_gas_instructions(loads_json(learning_key))
+
+# One row per agent: (agents key, agent name, persona spec, default instructions,
+# builder for learning-enhanced instructions or None if the agent doesn't use learning data)
+_AGENT_SPECS = (
+    ("security_auditor", "ZeraSecurityAuditor", _SECURITY_PERSONA_SPEC, _SECURITY_DEFAULT_INSTRUCTIONS, _cached_security_instructions),
+    ("gas_optimizer", "GasOptimizer", _GAS_PERSONA_SPEC, _GAS_DEFAULT_INSTRUCTIONS, _cached_gas_instructions),
+    ("audit_reporter", "AuditReporter", _REPORTER_PERSONA_SPEC, _REPORTER_INSTRUCTIONS, None),
+)
+_AGENT_SPECS_BY_KEY = {spec[0]: spec for spec in _AGENT_SPECS}
+
+# Learning-enhanced agents kept per manager, keyed by (agents key, instructions)
+_ENHANCED_AGENT_CACHE_SIZE = 64
+
+class AgentManager:
+    # Shared by every AgentManager and audit
+    SECURITY_PERSONA = _persona_from_spec(_SECURITY_PERSONA_SPEC)
+    GAS_PERSONA = _persona_from_spec(_GAS_PERSONA_SPEC)
+    REPORTER_PERSONA = _persona_from_spec(_REPORTER_PERSONA_SPEC)
+    
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.agents: Dict[str, Agent] = {}
+        self.shared_memory = AsyncMemory(connection_string=settings.memory_connection_string) if settings.enable_memory else None
+        self.learning_engine = ZeraLearningEngine(settings) if settings.enable_memory else None
+        self.db_pool = self.learning_engine.pool if self.learning_engine else None
+        # Keyed by (contract_name, contract_digest(contract_code))
+        self._learning_futures: Dict[Tuple[str, bytes], asyncio.Task] = {}
+        self._learning_cache: "OrderedDict[Tuple[str, bytes], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        
+        # Prototype agents with default instructions, reused by audits without learning data.
+        # iointel registers the system prompt on the agent's own runner, bound to that agent, so
+        # different instructions need a separately constructed Agent (cached per instruction string)
+        self._prototypes: Dict[str, Agent] = {
+            key: self._new_agent(key, default_instructions)
+            for key, _, _, default_instructions, _ in _AGENT_SPECS
+        }
+        self._enhanced_agent = functools.lru_cache(maxsize=_ENHANCED_AGENT_CACHE_SIZE)(self._new_agent)
+    
+    async def create_agents(self, contract_name: str = "GenericContract", contract_code: str = "",
+                            contract_hash: Optional[bytes] = None):
+        """Create specialized smart contract security auditing agents with learning capabilities.
+        
+        Pass contract_hash (see contract_digest) if the caller already has it, to skip rehashing.
+        """
+        
+        # Get learning insights from similar contracts if learning engine is available
+        learning_data = await self._get_learning_data(contract_name, contract_code, contract_hash)
+        
+        self.agents = self._build_agents(learning_data)
+    
+    def base_agents(self) -> Dict[str, Agent]:
+        """The agents with their default instructions, without touching the manager's current set"""
+        return dict(self._prototypes)
+    
+    def _build_agents(self, learning_data: Dict[str, Any]) -> Dict[str, Agent]:
+        """One agent per spec: the prototype itself, or an agent built with learning-enhanced instructions"""
+        learning_key = _learning_key(learning_data) if learning_data else None
+        return {
+            key: self._agent_for(key, enhanced_instructions, learning_key)
+            for key, _, _, _, enhanced_instructions in _AGENT_SPECS
+        }
+    
+    def _agent_for(self, key: str, enhanced_instructions, learning_key) -> Agent:
+        prototype = self._prototypes[key]
+        if not (learning_key and enhanced_instructions):
+            return prototype
+        instructions = enhanced_instructions(learning_key)
+        if instructions == prototype.instructions:
+            return prototype
+        return self._enhanced_agent(key, instructions)
+    
+    def _new_agent(self, key: str, instructions: str) -> Agent:
+        """Construct the agent for one spec with the given instructions"""
+        _, name, persona_spec, _, _ = _AGENT_SPECS_BY_KEY[key]
+        return Agent(
+            name=name,
+            instructions=instructions,
+            persona=_persona_from_spec(persona_spec),
             tools=[],
+            **self._common_agent_kwargs()
+        )
+    
+    def _common_agent_kwargs(self) -> Dict[str, Any]:
+        """Shared constructor arguments for every agent"""
+        return dict(
             memory=self.shared_memory,
             model=self.settings.default_model,
             api_key=self.settings.api_key,
             base_url=self.settings.base_url
         )
     
+    def prefetch(self, contract_name: str, contract_code: str):
+        """Start the learning lookup for a contract in the background (e.g. for the contracts
+        a batch audits one by one), so a later create_agents call finds it ready"""
+        if not self.learning_engine or not contract_code:
+            return
+        contract_hash = contract_digest(contract_code)
+        key = (contract_name, contract_hash)
+        if key in self._learning_futures or self._cached_learning_data(key) is not None:
+            return
+        self._learning_futures[key] = asyncio.create_task(
+            self.learning_engine.learn_from_similar_contracts(contract_name, contract_code, contract_hash)
+        )
+    
+    async def _get_learning_data(self, contract_name: str, contract_code: str,
+                                 contract_hash: Optional[bytes] = None) -> Dict[str, Any]:
+        """Learning insights from similar contracts, or {} when learning is unavailable"""
+        if not (self.learning_engine and contract_code):
+            return {}
+        
+        # Hash once; the same digest keys the cache and the contract_hash lookup
+        if contract_hash is None:
+            contract_hash = contract_digest(contract_code)
+        key = (contract_name, contract_hash)
+        learning_data = self._cached_learning_data(key)
+        if learning_data is not None:
+            return learning_data
+        
+        future = self._learning_futures.pop(key, None)
+        if future:
+            learning_data = await future
+        else:
+            learning_data = await self.learning_engine.learn_from_similar_contracts(contract_name, contract_code, contract_hash)
+        
+        self._learning_cache[key] = (time.monotonic(), learning_data)
+        self._learning_cache.move_to_end(key)
+        while len(self._learning_cache) > _LEARNING_CACHE_SIZE:
+            self._learning_cache.popitem(last=False)
+        return learning_data
+    
+    def _cached_learning_data(self, key: Tuple[str, bytes]):
+        """Cached learning data for a contract key, or None if missing/expired"""
+        entry = self._learning_cache.get(key)
+        if entry is None:
+            return None
+        cached_at, learning_data = entry
+        if time.monotonic() - cached_at > _LEARNING_CACHE_TTL:
+            del self._learning_cache[key]
+            return None
+        return learning_data
+    
     def get_agent(self, agent_type: str) -> Agent:
         """Get agent by type"""
         return self.agents.get(agent_type)
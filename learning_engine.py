@@ -5,33 +5,620 @@ Provides learning capabilities for agents to improve over time
 
 import asyncio
 import aiosqlite
+import sqlite3
 import json
 import hashlib
+import logging
+import secrets
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from enum import IntEnum
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Final, List, Any, Optional, Tuple
 from settings import Settings
 
+logger = logging.getLogger(__name__)
+
+# Explicit datetime adapter (same "YYYY-MM-DD HH:MM:SS" text as the built-in one, which is
+# deprecated in Python 3.12); our own inserts use CURRENT_TIMESTAMP instead of binding datetimes
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=" "))
+
+# orjson is optional; when installed it handles the JSON columns and cache keys
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps_json(obj: Any, sort_keys: bool = False) -> str:
+    """Serialize to a JSON str (for TEXT columns), using orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=str, option=option).decode()
+    return json.dumps(obj, sort_keys=sort_keys, default=str)
+
+def loads_json(data: Any) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+class Severity(IntEnum):
+    """Finding severity as stored in audit_findings.severity"""
+    INFORMATIONAL = 0
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+    
+    @classmethod
+    def from_value(cls, value: Any) -> "Severity":
+        """Accept a code, a numeric string or a severity name (e.g. legacy TEXT rows)"""
+        if isinstance(value, int):
+            return cls(value)
+        text = str(value or "").strip().upper()
+        if text.isdigit():
+            return cls(int(text))
+        if text == "INFO":
+            return cls.INFORMATIONAL
+        return cls.__members__.get(text, cls.INFORMATIONAL)
+
+class Difficulty(IntEnum):
+    """Implementation difficulty as stored in gas_optimizations.implementation_difficulty"""
+    EASY = 0
+    MEDIUM = 1
+    HARD = 2
+    
+    @classmethod
+    def from_value(cls, value: Any) -> "Difficulty":
+        if isinstance(value, int):
+            return cls(value)
+        text = str(value or "").strip().upper()
+        if text.isdigit():
+            return cls(int(text))
+        text = {"LOW": "EASY", "HIGH": "HARD"}.get(text, text)
+        return cls.__members__.get(text, cls.MEDIUM)
+
+# Pragmas run once per pooled connection. journal_mode=WAL is persistent and a no-op once
+# set, but repeating it means a database the engine opens first still gets WAL;
+# cache_size is negative KiB (128 MiB of page cache per connection)
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-131072;
+    PRAGMA mmap_size=268435456;
+    PRAGMA wal_autocheckpoint=1000;
+"""
+
+# Full schema, run as a single idempotent script instead of one round-trip per statement.
+# Every pool runs it once before its first connection is handed out (see ensure_schema).
+# Our tables are STRICT with enums stored as small integer codes (see learning_engine.Severity/Difficulty);
+# conversation_history belongs to the iointel memory layer and keeps its original loose typing.
+SCHEMA_SQL = """
+    -- Create blobs table for large, frequently repeated text (code snippets, remediations),
+    -- stored once and referenced by content hash
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash BLOB PRIMARY KEY,
+        content TEXT NOT NULL
+    ) STRICT, WITHOUT ROWID;
+
+    -- Create conversation_history table for agent interactions
+    CREATE TABLE IF NOT EXISTS conversation_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        conversation_id TEXT NOT NULL,
+        messages_json TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        agent_name TEXT,
+        session_type TEXT DEFAULT 'audit',
+        UNIQUE(conversation_id)
+    );
+
+    -- Create audit_findings table for storing discovered vulnerabilities
+    CREATE TABLE IF NOT EXISTS audit_findings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        contract_name TEXT NOT NULL,
+        contract_hash BLOB, -- learning_engine.contract_digest
+        vulnerability_type TEXT NOT NULL,
+        severity INTEGER NOT NULL, -- Severity code: 0=INFORMATIONAL .. 4=CRITICAL
+        description TEXT NOT NULL,
+        attack_scenario_hash BLOB REFERENCES blobs(hash),
+        remediation_hash BLOB REFERENCES blobs(hash),
+        code_snippet_hash BLOB REFERENCES blobs(hash),
+        line_numbers TEXT,
+        agent_name TEXT DEFAULT 'ZeraSecurityAuditor',
+        confidence_score REAL DEFAULT 0.8,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        false_positive INTEGER DEFAULT 0
+    ) STRICT;
+
+    -- Create gas_optimizations table for gas efficiency patterns
+    CREATE TABLE IF NOT EXISTS gas_optimizations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        contract_name TEXT NOT NULL,
+        optimization_type TEXT NOT NULL,
+        description TEXT NOT NULL,
+        original_code_hash BLOB REFERENCES blobs(hash),
+        optimized_code_hash BLOB REFERENCES blobs(hash),
+        estimated_gas_savings INTEGER,
+        implementation_difficulty INTEGER DEFAULT 1, -- Difficulty code: 0=easy, 1=medium, 2=hard
+        agent_name TEXT DEFAULT 'GasOptimizer',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        verified INTEGER DEFAULT 0
+    ) STRICT;
+
+    -- Create contract_patterns table for recognizing common patterns
+    CREATE TABLE IF NOT EXISTS contract_patterns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pattern_name TEXT NOT NULL,
+        pattern_type TEXT NOT NULL, -- 'security_risk', 'gas_inefficient', 'best_practice'
+        code_pattern TEXT NOT NULL,
+        risk_level TEXT,
+        description TEXT,
+        examples_count INTEGER DEFAULT 1,
+        detection_accuracy REAL DEFAULT 0.8,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        last_updated TEXT DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(pattern_name, pattern_type)
+    ) STRICT;
+
+    -- Create audit_sessions table for tracking complete audit runs
+    CREATE TABLE IF NOT EXISTS audit_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL UNIQUE,
+        contract_name TEXT NOT NULL,
+        contract_code_hash BLOB, -- learning_engine.contract_digest
+        audit_scope TEXT,
+        total_vulnerabilities INTEGER DEFAULT 0,
+        critical_count INTEGER DEFAULT 0,
+        high_count INTEGER DEFAULT 0,
+        medium_count INTEGER DEFAULT 0,
+        low_count INTEGER DEFAULT 0,
+        info_count INTEGER DEFAULT 0,
+        gas_optimizations_count INTEGER DEFAULT 0,
+        audit_duration_seconds REAL,
+        overall_risk_score REAL,
+        agents_used TEXT, -- JSON array of agent names
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        completed_at TEXT
+    ) STRICT;
+
+    -- Create agent_learning table for storing learning insights
+    CREATE TABLE IF NOT EXISTS agent_learning (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        agent_name TEXT NOT NULL,
+        learning_type TEXT NOT NULL, -- 'pattern_recognition', 'false_positive', 'accuracy_improvement'
+        context TEXT NOT NULL,
+        insight TEXT NOT NULL,
+        confidence_delta REAL DEFAULT 0.0,
+        validation_count INTEGER DEFAULT 1,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        applied_at TEXT
+    ) STRICT;
+
+    -- pattern_dfa only ever held a copy of contract_patterns; drop it from older databases
+    DROP TABLE IF EXISTS pattern_dfa;
+
+    -- Create indexes for better performance
+    CREATE INDEX IF NOT EXISTS idx_conversation_id ON conversation_history(conversation_id);
+    CREATE INDEX IF NOT EXISTS idx_contract_findings ON audit_findings(contract_name, vulnerability_type);
+    CREATE INDEX IF NOT EXISTS idx_gas_optimizations ON gas_optimizations(contract_name, optimization_type);
+    CREATE INDEX IF NOT EXISTS idx_patterns ON contract_patterns(pattern_type, risk_level);
+    CREATE INDEX IF NOT EXISTS idx_sessions ON audit_sessions(session_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_learning ON agent_learning(agent_name, learning_type);
+
+    -- Covering indexes for the aggregation/dashboard queries
+    CREATE INDEX IF NOT EXISTS idx_findings_severity ON audit_findings(contract_name, severity, created_at);
+    CREATE INDEX IF NOT EXISTS idx_findings_hash ON audit_findings(contract_hash);
+    CREATE INDEX IF NOT EXISTS idx_findings_type_confidence ON audit_findings(vulnerability_type, confidence_score);
+    CREATE INDEX IF NOT EXISTS idx_gas_type ON gas_optimizations(optimization_type);
+    CREATE INDEX IF NOT EXISTS idx_patterns_accuracy ON contract_patterns(detection_accuracy DESC);
+    CREATE INDEX IF NOT EXISTS idx_sessions_created ON audit_sessions(created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_learning_applied ON agent_learning(agent_name, applied_at) WHERE applied_at IS NOT NULL;
+    -- Name indexes for the old anchored similar-contract LIKE; the substring match can't use them
+    DROP INDEX IF EXISTS idx_findings_hash_name;
+    DROP INDEX IF EXISTS idx_findings_name_nocase;
+    DROP INDEX IF EXISTS idx_gas_name_nocase;
+"""
+
+# Columns whose text lives in the blobs table, as {table: {text_column: hash_column}}
+BLOB_COLUMNS = {
+    "audit_findings": {
+        "attack_scenario": "attack_scenario_hash",
+        "remediation": "remediation_hash",
+        "code_snippet": "code_snippet_hash",
+    },
+    "gas_optimizations": {
+        "original_code": "original_code_hash",
+        "optimized_code": "optimized_code_hash",
+    },
+}
+
+async def _table_columns(db, table: str) -> List[str]:
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in await cursor.fetchall()]
+
+async def migrate_blob_columns(db):
+    """Add blob hash columns to tables created before the blobs table existed"""
+    for table, columns in BLOB_COLUMNS.items():
+        existing = await _table_columns(db, table)
+        for hash_column in columns.values():
+            if hash_column not in existing:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN {hash_column} BLOB REFERENCES blobs(hash)")
+
+async def create_blob_views(db):
+    """Create <table>_view exposing blob-backed columns under their original names"""
+    for table, blob_columns in BLOB_COLUMNS.items():
+        existing = await _table_columns(db, table)
+        columns = [f"t.{column}" for column in existing if column not in blob_columns]
+        joins = []
+        for i, (text_column, hash_column) in enumerate(blob_columns.items()):
+            joins.append(f"LEFT JOIN blobs b{i} ON b{i}.hash = t.{hash_column}")
+            # Databases from before the blobs table still hold inline text for older rows
+            if text_column in existing:
+                columns.append(f"COALESCE(b{i}.content, t.{text_column}) AS {text_column}")
+            else:
+                columns.append(f"b{i}.content AS {text_column}")
+        await db.execute(
+            f"CREATE VIEW IF NOT EXISTS {table}_view AS "
+            f"SELECT {', '.join(columns)} FROM {table} t {' '.join(joins)}"
+        )
+
+# Databases from before the STRICT schema still hold severity/difficulty names ("HIGH", "medium");
+# convert them to the codes new rows use (same mapping as Severity/Difficulty.from_value), so one
+# severity doesn't show up as two groups in the statistics and learning queries. Those tables keep
+# TEXT affinity, so codes are stored there as '3' etc. and are skipped on later runs
+_MIGRATE_ENUM_CODES_SQL = """
+    UPDATE audit_findings
+    SET severity = CASE UPPER(TRIM(severity))
+        WHEN 'CRITICAL' THEN 4
+        WHEN 'HIGH' THEN 3
+        WHEN 'MEDIUM' THEN 2
+        WHEN 'LOW' THEN 1
+        ELSE CAST(severity AS INTEGER)
+    END
+    WHERE typeof(severity) = 'text' AND severity NOT GLOB '[0-9]';
+
+    UPDATE gas_optimizations
+    SET implementation_difficulty = CASE
+        WHEN UPPER(TRIM(implementation_difficulty)) IN ('EASY', 'LOW') THEN 0
+        WHEN UPPER(TRIM(implementation_difficulty)) IN ('HARD', 'HIGH') THEN 2
+        WHEN TRIM(implementation_difficulty) GLOB '[0-9]*' THEN CAST(implementation_difficulty AS INTEGER)
+        ELSE 1
+    END
+    WHERE typeof(implementation_difficulty) = 'text' AND implementation_difficulty NOT GLOB '[0-9]';
+"""
+
+async def ensure_schema(db):
+    """Create missing tables, indexes and blob columns/views, migrate legacy text enums, then commit"""
+    await db.executescript(SCHEMA_SQL)
+    await db.executescript(_MIGRATE_ENUM_CODES_SQL)
+    await migrate_blob_columns(db)
+    await create_blob_views(db)
+    await db.commit()
+
+# SQL lives in module constants so every call passes the same string object
+# to sqlite3's per-connection prepared statement cache
+_CACHED_STATEMENTS = 256
+
+_INSERT_BLOB_SQL: Final = "INSERT OR IGNORE INTO blobs (hash, content) VALUES (?, ?)"
+
+_INSERT_SESSION_SQL: Final = """
+    INSERT INTO audit_sessions 
+    (session_id, contract_name, contract_code_hash, audit_scope, 
+     total_vulnerabilities, critical_count, high_count, medium_count, 
+     low_count, info_count, gas_optimizations_count, audit_duration_seconds,
+     overall_risk_score, agents_used, completed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+
+_INSERT_FINDING_SQL: Final = """
+    INSERT INTO audit_findings 
+    (contract_name, contract_hash, vulnerability_type, severity, 
+     description, attack_scenario_hash, remediation_hash, code_snippet_hash, 
+     line_numbers, agent_name, confidence_score)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_GAS_OPTIMIZATION_SQL: Final = """
+    INSERT INTO gas_optimizations 
+    (contract_name, optimization_type, description, original_code_hash, 
+     optimized_code_hash, estimated_gas_savings, implementation_difficulty, agent_name)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Correct validations add the 0.05 bonus and count as an example; misses only decay
+_UPDATE_PATTERN_ACCURACY_SQL: Final = """
+    UPDATE contract_patterns 
+    SET detection_accuracy = detection_accuracy * 0.95 + ?,
+        examples_count = examples_count + ?,
+        last_updated = CURRENT_TIMESTAMP
+    WHERE pattern_name = ?
+"""
+
+# Columns are aliased to the keys of the insight dicts, so rows convert with dict(row)
+_SELECT_KNOWN_PATTERNS_SQL: Final = """
+    SELECT pattern_name AS name, pattern_type AS type, risk_level AS risk, description,
+           detection_accuracy AS accuracy
+    FROM contract_patterns 
+    WHERE detection_accuracy > 0.7
+    ORDER BY detection_accuracy DESC
+"""
+
+_SELECT_SIMILAR_VULNS_SQL: Final = """
+    SELECT vulnerability_type AS type, severity, description, COUNT(*) AS frequency
+    FROM audit_findings 
+    WHERE contract_hash = ? OR contract_name LIKE ?
+    GROUP BY vulnerability_type, severity
+    ORDER BY frequency DESC, severity DESC
+    LIMIT 10
+"""
+
+_SELECT_GAS_PATTERNS_SQL: Final = """
+    SELECT optimization_type AS type, description, estimated_gas_savings AS avg_savings,
+           COUNT(*) AS frequency
+    FROM gas_optimizations 
+    WHERE contract_name LIKE ?
+    GROUP BY optimization_type
+    ORDER BY frequency DESC, estimated_gas_savings DESC
+    LIMIT 5
+"""
+
+# Dashboard/statistics queries
+_COUNT_SESSIONS_SQL: Final = "SELECT COUNT(*) FROM audit_sessions"
+
+_SELECT_COMMON_VULNS_SQL: Final = """
+    SELECT vulnerability_type AS type, COUNT(*) AS count, AVG(confidence_score) AS avg_confidence
+    FROM audit_findings 
+    GROUP BY vulnerability_type 
+    ORDER BY count DESC 
+    LIMIT 5
+"""
+
+_SELECT_SESSION_AVERAGES_SQL: Final = """
+    SELECT AVG(overall_risk_score) as avg_risk,
+           AVG(total_vulnerabilities) as avg_vulns,
+           AVG(gas_optimizations_count) as avg_optimizations
+    FROM audit_sessions
+    WHERE overall_risk_score IS NOT NULL
+"""
+
+_RETRAIN_PATTERNS_SQL: Final = """
+    UPDATE contract_patterns
+    SET detection_accuracy = CASE
+        WHEN detection_accuracy < ? THEN detection_accuracy * ?
+        ELSE detection_accuracy * (1 + ?/10.0)
+    END,
+        last_updated = CURRENT_TIMESTAMP
+"""
+
+_SELECT_PATTERN_STATS_SQL: Final = """
+    SELECT COUNT(*) AS count, AVG(detection_accuracy) AS avg_accuracy FROM contract_patterns
+"""
+
+_SELECT_TOP_VULN_TYPES_SQL: Final = """
+    SELECT vulnerability_type, COUNT(*) as count
+    FROM audit_findings
+    GROUP BY vulnerability_type
+    ORDER BY count DESC
+    LIMIT 5
+"""
+
+_SELECT_TOP_GAS_TYPES_SQL: Final = """
+    SELECT optimization_type, COUNT(*) as count
+    FROM gas_optimizations
+    GROUP BY optimization_type
+    ORDER BY count DESC
+    LIMIT 5
+"""
+
+async def _acquire_lock(lock: threading.Lock):
+    """Take a threading lock without blocking the event loop. Locks are thread-based rather than
+    asyncio-based so callers on different event loops (e.g. repeated asyncio.run calls) are
+    serialized too; when contended, a worker thread blocks on the lock instead of the loop"""
+    if lock.acquire(blocking=False):
+        return
+    acquired = asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+    try:
+        await asyncio.shield(acquired)
+    except asyncio.CancelledError:
+        # The worker still gets the lock; give it straight back once it does
+        acquired.add_done_callback(lambda _: lock.release())
+        raise
+
+class AioSqlitePool:
+    """Small pool of open read-only aiosqlite connections to one database file.
+    
+    Under WAL each reader connection (with its own aiosqlite thread) can query in parallel
+    with the others and with the writer. Only the non-blocking queue operations are used, so the pool works across the separate
+    event loops created by repeated asyncio.run calls (aiosqlite connections are not tied to
+    a loop). When the pool is empty a new connection is opened; when full, released ones are closed.
+    
+    Writes go through one long-lived writer connection instead (see writer()).
+    """
+    
+    def __init__(self, db_path: str, size: int = 8):
+        self.db_path = db_path
+        self.size = size
+        self._idle: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._writer: Optional[aiosqlite.Connection] = None
+        # Threading lock, taken with _acquire_lock
+        self._writer_lock = threading.Lock()
+        self._schema_ready = False
+    
+    async def _open(self, read_only: bool = True) -> aiosqlite.Connection:
+        if read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = await aiosqlite.connect(uri, uri=True, cached_statements=_CACHED_STATEMENTS)
+        else:
+            conn = await aiosqlite.connect(self.db_path, cached_statements=_CACHED_STATEMENTS)
+        await conn.executescript(CONNECTION_PRAGMAS)
+        # Rows still index like tuples, and also by column name
+        conn.row_factory = aiosqlite.Row
+        return conn
+    
+    async def _ensure_schema(self):
+        """Create the database and schema before the first read-only connection is opened"""
+        if not self._schema_ready:
+            # Opening the writer applies the schema (see writer())
+            async with self.writer():
+                pass
+    
+    async def acquire(self) -> aiosqlite.Connection:
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            await self._ensure_schema()
+            return await self._open()
+    
+    async def release(self, conn: aiosqlite.Connection):
+        if conn.in_transaction:
+            await conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except asyncio.QueueFull:
+            await conn.close()
+    
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # Don't hand a connection in an unknown state back to the pool
+            await conn.close()
+            raise
+        else:
+            await self.release(conn)
+    
+    @asynccontextmanager
+    async def writer(self):
+        """Exclusive use of the shared read-write connection for one write transaction; the first
+        use also applies the schema"""
+        await _acquire_lock(self._writer_lock)
+        try:
+            if self._writer is None:
+                self._writer = await self._open(read_only=False)
+            if not self._schema_ready:
+                await ensure_schema(self._writer)
+                self._schema_ready = True
+            try:
+                yield self._writer
+            finally:
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+        finally:
+            self._writer_lock.release()
+    
+    async def warm(self):
+        """Open connections up to the pool size so the first queries don't pay for connect"""
+        await self._ensure_schema()
+        while not self._idle.full():
+            # release() closes the connection if another warm() filled the pool meanwhile
+            await self.release(await self._open())
+    
+    async def close(self):
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+        await _acquire_lock(self._writer_lock)
+        try:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        finally:
+            self._writer_lock.release()
+    
+    def stop(self):
+        """Stop every pooled connection's worker thread without waiting for it, for shutdown
+        paths that can't await close()"""
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
+        if self._writer is not None:
+            self._writer.stop()
+            self._writer = None
+
+_pools: Dict[str, AioSqlitePool] = {}
+
+def get_pool(db_path: str) -> AioSqlitePool:
+    """Shared connection pool for a database file"""
+    if db_path not in _pools:
+        _pools[db_path] = AioSqlitePool(db_path)
+    return _pools[db_path]
+
+async def close_pools():
+    """Close all pooled connections; call before process exit (aiosqlite worker threads are non-daemon)"""
+    for pool in _pools.values():
+        await pool.close()
+
+def stop_pools():
+    """Synchronous counterpart of close_pools, for callers without an event loop"""
+    for pool in _pools.values():
+        pool.stop()
+
+def _stop_pools_after_main_thread():
+    """Fallback when close_pools wasn't awaited (e.g. under Streamlit): once the main thread
+    finishes, stop the pooled connections so shutdown doesn't hang joining their threads"""
+    threading.main_thread().join()
+    stop_pools()
+
+# Daemon watcher; plain atexit would run only after the connection threads are joined
+threading.Thread(target=_stop_pools_after_main_thread, name="zera-pool-shutdown", daemon=True).start()
+
+# Buffered write kinds and batching limits for the background flusher
+_FINDING_WRITE = "finding"
+_GAS_OPTIMIZATION_WRITE = "gas_optimization"
+_WRITE_BATCH_SIZE = 100
+_WRITE_BATCH_DELAY = 0.05  # seconds
+
+# Rows pulled per fetchmany when streaming read results
+_FETCH_BATCH_SIZE = 256
+
+# Seconds a get_audit_statistics snapshot is reused (writes by other engines show up after this)
+_STATS_TTL = 5.0
+
+# blake2b is in the stdlib and fast enough for contract-sized inputs; the digest is a
+# persisted lookup key, so it must not depend on which optional packages are installed
+DIGEST_SIZE = 16
+
+def contract_digest(content: str) -> bytes:
+    """16-byte content hash used for contract_hash/contract_code_hash and blobs"""
+    return hashlib.blake2b(content.encode(), digest_size=DIGEST_SIZE).digest()
+
 class ZeraLearningEngine:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.db_path = settings.memory_connection_string.replace("sqlite+aiosqlite:///", "")
+        self.pool = get_pool(self.db_path)
+        # Findings/optimizations are buffered and written in batches by a background task
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._write_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # First failed batch write since the last flush(), which re-raises it
+        self._write_error: Optional[Exception] = None
+        # Last get_audit_statistics result; dropped on our own writes, otherwise kept for _STATS_TTL
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_ts = 0.0
     
     async def record_audit_session(self, session_data: Dict[str, Any]) -> str:
         """Record a complete audit session for learning"""
-        session_id = session_data.get('session_id', self._generate_session_id())
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO audit_sessions 
-                (session_id, contract_name, contract_code_hash, audit_scope, 
-                 total_vulnerabilities, critical_count, high_count, medium_count, 
-                 low_count, info_count, gas_optimizations_count, audit_duration_seconds,
-                 overall_risk_score, agents_used, completed_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        return (await self.record_audit_sessions([session_data]))[0]
+    
+    async def record_audit_sessions(self, sessions: List[Dict[str, Any]]) -> List[str]:
+        """Record several audit sessions (e.g. a history backfill) with one executemany in a
+        single transaction; returns their session ids in order"""
+        session_ids, rows = [], []
+        for session_data in sessions:
+            session_id = session_data.get('session_id')
+            if not session_id:
+                # Ids generated within the same second only differ by the random suffix
+                session_id = self._generate_session_id()
+                while session_id in session_ids:
+                    session_id = self._generate_session_id()
+            session_ids.append(session_id)
+            rows.append((
                 session_id,
                 session_data.get('contract_name'),
-                self._hash_contract(session_data.get('contract_code', '')),
+                session_data.get('contract_hash') or contract_digest(session_data.get('contract_code', '')),
                 session_data.get('audit_scope'),
                 session_data.get('total_vulnerabilities', 0),
                 session_data.get('critical_count', 0),
@@ -42,194 +629,244 @@ class ZeraLearningEngine:
                 session_data.get('gas_optimizations_count', 0),
                 session_data.get('audit_duration_seconds', 0),
                 session_data.get('overall_risk_score', 0),
-                json.dumps(session_data.get('agents_used', [])),
-                datetime.now()
+                dumps_json(session_data.get('agents_used', []))
             ))
+        if not rows:
+            return session_ids
+        
+        async with self.pool.writer() as db:
+            await db.execute("BEGIN")
+            await db.executemany(_INSERT_SESSION_SQL, rows)
             await db.commit()
+        self._stats_cache = None
         
-        return session_id
+        return session_ids
     
     async def record_vulnerability_finding(self, finding: Dict[str, Any]):
-        """Record a vulnerability finding for pattern learning"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO audit_findings 
-                (contract_name, contract_hash, vulnerability_type, severity, 
-                 description, attack_scenario, remediation, code_snippet, 
-                 line_numbers, agent_name, confidence_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                finding.get('contract_name'),
-                finding.get('contract_hash'),
-                finding.get('vulnerability_type'),
-                finding.get('severity'),
-                finding.get('description'),
-                finding.get('attack_scenario'),
-                finding.get('remediation'),
-                finding.get('code_snippet'),
-                finding.get('line_numbers'),
-                finding.get('agent_name', 'ZeraSecurityAuditor'),
-                finding.get('confidence_score', 0.8)
-            ))
-            await db.commit()
+        """Record a vulnerability finding for pattern learning (buffered; see flush)"""
+        self._enqueue_write(_FINDING_WRITE, finding)
     
     async def record_gas_optimization(self, optimization: Dict[str, Any]):
-        """Record a gas optimization for learning"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO gas_optimizations 
-                (contract_name, optimization_type, description, original_code, 
-                 optimized_code, estimated_gas_savings, implementation_difficulty, agent_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                optimization.get('contract_name'),
-                optimization.get('optimization_type'),
-                optimization.get('description'),
-                optimization.get('original_code'),
-                optimization.get('optimized_code'),
-                optimization.get('estimated_gas_savings', 0),
-                optimization.get('implementation_difficulty', 'medium'),
-                optimization.get('agent_name', 'GasOptimizer')
-            ))
-            await db.commit()
+        """Record a gas optimization for learning (buffered; see flush)"""
+        self._enqueue_write(_GAS_OPTIMIZATION_WRITE, optimization)
     
-    async def learn_from_similar_contracts(self, contract_name: str, contract_code: str) -> Dict[str, Any]:
-        """Get learning insights from similar contracts audited before"""
-        contract_hash = self._hash_contract(contract_code)
+    async def record_vulnerability_findings(self, findings: List[Dict[str, Any]]):
+        """Record a burst of findings (e.g. one audit's results) in a single transaction.
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # Get similar vulnerabilities found in past audits
-            cursor = await db.execute("""
-                SELECT vulnerability_type, severity, description, COUNT(*) as frequency
-                FROM audit_findings 
-                WHERE contract_hash = ? OR contract_name LIKE ?
-                GROUP BY vulnerability_type, severity
-                ORDER BY frequency DESC, severity
-                LIMIT 10
-            """, (contract_hash, f"%{contract_name.split('Token')[0] if 'Token' in contract_name else contract_name[:5]}%"))
-            
-            similar_vulns = await cursor.fetchall()
-            
-            # Get gas optimization patterns
-            cursor = await db.execute("""
-                SELECT optimization_type, description, estimated_gas_savings, COUNT(*) as frequency
-                FROM gas_optimizations 
-                WHERE contract_name LIKE ?
-                GROUP BY optimization_type
-                ORDER BY frequency DESC, estimated_gas_savings DESC
-                LIMIT 5
-            """, (f"%{contract_name.split('Token')[0] if 'Token' in contract_name else contract_name[:5]}%",))
-            
-            gas_patterns = await cursor.fetchall()
-            
-            # Get pattern recognition insights
-            cursor = await db.execute("""
-                SELECT pattern_name, pattern_type, risk_level, description, detection_accuracy
-                FROM contract_patterns 
-                WHERE detection_accuracy > 0.7
-                ORDER BY detection_accuracy DESC
-            """)
-            
-            known_patterns = await cursor.fetchall()
+        Unlike the buffered single-record API this writes immediately, with no batch size cap.
+        """
+        await self._write_records(_FINDING_WRITE, findings)
+    
+    async def record_gas_optimizations(self, optimizations: List[Dict[str, Any]]):
+        """Record a burst of gas optimizations in a single transaction (written immediately)"""
+        await self._write_records(_GAS_OPTIMIZATION_WRITE, optimizations)
+    
+    async def _write_records(self, kind: str, records: List[Dict[str, Any]]):
+        if records:
+            self._stats_cache = None
+            await self._write_batch([(kind, record) for record in records])
+    
+    def _enqueue_write(self, kind: str, record: Dict[str, Any]):
+        """Queue a record for the background flusher, (re)starting it for the current event loop"""
+        self._stats_cache = None
+        loop = asyncio.get_running_loop()
+        if self._flusher_task is None or self._flusher_task.done() or self._write_loop is not loop:
+            self._write_queue = asyncio.Queue()
+            self._write_loop = loop
+            self._flusher_task = loop.create_task(self._flush_writes(self._write_queue))
+        self._write_queue.put_nowait((kind, record))
+    
+    async def _flush_writes(self, queue: asyncio.Queue):
+        """Collect queued records for up to _WRITE_BATCH_DELAY seconds or _WRITE_BATCH_SIZE
+        records, then write them in one transaction"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch.append(await queue.get())
+                deadline = loop.time() + _WRITE_BATCH_DELAY
+                while len(batch) < _WRITE_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self._write_queued(queue, batch)
+                batch = []
+        finally:
+            # Loop shutdown / aclose: don't drop anything still buffered
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                await self._write_queued(queue, batch)
+    
+    async def _write_queued(self, queue: asyncio.Queue, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Write a batch taken off the queue and mark it done; a failed write is logged and kept
+        for flush() so the flusher stays alive and join() can't hang"""
+        try:
+            await self._write_batch(batch)
+        except Exception as e:
+            logger.exception("Failed to write %d buffered learning records", len(batch))
+            if self._write_error is None:
+                self._write_error = e
+        for _ in batch:
+            queue.task_done()
+    
+    async def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Insert a batch of findings/optimizations with executemany in a single transaction"""
+        blobs: Dict[bytes, str] = {}
+        findings, optimizations = [], []
+        for kind, record in batch:
+            if kind == _FINDING_WRITE:
+                findings.append((
+                    record.get('contract_name'),
+                    record.get('contract_hash'),
+                    record.get('vulnerability_type'),
+                    int(Severity.from_value(record.get('severity'))),
+                    record.get('description'),
+                    self._blob_ref(blobs, record.get('attack_scenario')),
+                    self._blob_ref(blobs, record.get('remediation')),
+                    self._blob_ref(blobs, record.get('code_snippet')),
+                    record.get('line_numbers'),
+                    record.get('agent_name', 'ZeraSecurityAuditor'),
+                    record.get('confidence_score', 0.8)
+                ))
+            else:
+                optimizations.append((
+                    record.get('contract_name'),
+                    record.get('optimization_type'),
+                    record.get('description'),
+                    self._blob_ref(blobs, record.get('original_code')),
+                    self._blob_ref(blobs, record.get('optimized_code')),
+                    self._to_int(record.get('estimated_gas_savings', 0)),
+                    int(Difficulty.from_value(record.get('implementation_difficulty', 'medium'))),
+                    record.get('agent_name', 'GasOptimizer')
+                ))
         
+        async with self.pool.writer() as db:
+            await db.execute("BEGIN")
+            if blobs:
+                await db.executemany(_INSERT_BLOB_SQL, list(blobs.items()))
+            if findings:
+                await db.executemany(_INSERT_FINDING_SQL, findings)
+            if optimizations:
+                await db.executemany(_INSERT_GAS_OPTIMIZATION_SQL, optimizations)
+            await db.commit()
+    
+    async def flush(self):
+        """Wait until all buffered findings/optimizations are written, raising the first
+        write failure since the last flush"""
+        if self._write_queue is not None and self._write_loop is asyncio.get_running_loop():
+            await self._write_queue.join()
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+    
+    async def aclose(self):
+        """Stop the background flusher after writing everything still buffered, then close
+        the database connections"""
+        task, self._flusher_task = self._flusher_task, None
+        if task is not None and not task.done() and self._write_loop is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.pool.close()
+    
+    async def learn_from_similar_contracts(self, contract_name: str, contract_code: str,
+                                           contract_hash: Optional[bytes] = None) -> Dict[str, Any]:
+        """Get learning insights from similar contracts audited before.
+        
+        Pass contract_hash (see contract_digest) if the caller already has it, to skip rehashing.
+        """
+        await self.flush()
+        if contract_hash is None:
+            contract_hash = contract_digest(contract_code)
+        # The three reads are independent, so run them concurrently on separate pooled connections
+        known_patterns, similar_vulns, gas_patterns = await asyncio.gather(
+            self._fetch_dicts(_SELECT_KNOWN_PATTERNS_SQL),
+            *self._similar_contract_queries(contract_name, contract_hash)
+        )
+        return self._contract_insights(similar_vulns, gas_patterns, known_patterns)
+    
+    async def _fetch_dicts(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        """Run one read query on its own pooled connection, streaming rows into dicts keyed by column"""
+        results = []
+        async with self.pool.connection() as db:
+            async with db.execute(sql, params) as cursor:
+                while rows := await cursor.fetchmany(_FETCH_BATCH_SIZE):
+                    results.extend(map(dict, rows))
+        return results
+    
+    def _similar_contract_queries(self, contract_name: str, contract_hash: bytes):
+        """Awaitables for the similar-vulnerability and gas-pattern reads of one contract"""
+        like_pattern = self._name_like_pattern(contract_name)
+        return (
+            self._fetch_dicts(_SELECT_SIMILAR_VULNS_SQL, (contract_hash, like_pattern)),
+            self._fetch_dicts(_SELECT_GAS_PATTERNS_SQL, (like_pattern,)),
+        )
+    
+    @staticmethod
+    def _contract_insights(similar_vulns: List[Dict[str, Any]], gas_patterns: List[Dict[str, Any]],
+                           known_patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Similar vulnerabilities and gas patterns for one contract"""
+        for vuln in similar_vulns:
+            vuln["severity"] = Severity.from_value(vuln["severity"]).name
         return {
-            "similar_vulnerabilities": [
-                {
-                    "type": vuln[0], 
-                    "severity": vuln[1], 
-                    "description": vuln[2], 
-                    "frequency": vuln[3]
-                } for vuln in similar_vulns
-            ],
-            "gas_optimization_patterns": [
-                {
-                    "type": opt[0], 
-                    "description": opt[1], 
-                    "avg_savings": opt[2], 
-                    "frequency": opt[3]
-                } for opt in gas_patterns
-            ],
-            "known_patterns": [
-                {
-                    "name": pattern[0], 
-                    "type": pattern[1], 
-                    "risk": pattern[2], 
-                    "description": pattern[3], 
-                    "accuracy": pattern[4]
-                } for pattern in known_patterns
-            ]
+            "similar_vulnerabilities": similar_vulns,
+            "gas_optimization_patterns": gas_patterns,
+            "known_patterns": known_patterns
         }
     
     async def update_pattern_accuracy(self, pattern_name: str, was_correct: bool):
         """Update pattern detection accuracy based on validation"""
-        async with aiosqlite.connect(self.db_path) as db:
-            if was_correct:
-                await db.execute("""
-                    UPDATE contract_patterns 
-                    SET detection_accuracy = detection_accuracy * 0.95 + 0.05,
-                        examples_count = examples_count + 1,
-                        last_updated = CURRENT_TIMESTAMP
-                    WHERE pattern_name = ?
-                """, (pattern_name,))
-            else:
-                await db.execute("""
-                    UPDATE contract_patterns 
-                    SET detection_accuracy = detection_accuracy * 0.95,
-                        last_updated = CURRENT_TIMESTAMP
-                    WHERE pattern_name = ?
-                """, (pattern_name,))
+        await self.update_pattern_accuracies([(pattern_name, was_correct)])
+    
+    async def update_pattern_accuracies(self, results: List[Tuple[str, bool]]):
+        """Apply several (pattern_name, was_correct) validations in one transaction"""
+        async with self.pool.writer() as db:
+            await db.executemany(_UPDATE_PATTERN_ACCURACY_SQL, [
+                (0.05 if was_correct else 0.0, int(was_correct), pattern_name)
+                for pattern_name, was_correct in results
+            ])
             await db.commit()
     
     async def get_audit_statistics(self) -> Dict[str, Any]:
-        """Get overall audit statistics for learning insights"""
-        async with aiosqlite.connect(self.db_path) as db:
+        """Get overall audit statistics for learning insights (cached for _STATS_TTL seconds)"""
+        if self._stats_cache is not None and time.monotonic() - self._stats_ts < _STATS_TTL:
+            return self._stats_cache
+        await self.flush()
+        async with self.pool.connection() as db:
             # Total audits performed
-            cursor = await db.execute("SELECT COUNT(*) FROM audit_sessions")
+            cursor = await db.execute(_COUNT_SESSIONS_SQL)
             total_audits = (await cursor.fetchone())[0]
             
             # Most common vulnerabilities
-            cursor = await db.execute("""
-                SELECT vulnerability_type, COUNT(*) as count, AVG(confidence_score) as avg_confidence
-                FROM audit_findings 
-                GROUP BY vulnerability_type 
-                ORDER BY count DESC 
-                LIMIT 5
-            """)
-            common_vulns = await cursor.fetchall()
+            cursor = await db.execute(_SELECT_COMMON_VULNS_SQL)
+            common_vulns = [dict(row) for row in await cursor.fetchall()]
             
             # Average risk scores
-            cursor = await db.execute("""
-                SELECT AVG(overall_risk_score) as avg_risk,
-                       AVG(total_vulnerabilities) as avg_vulns,
-                       AVG(gas_optimizations_count) as avg_optimizations
-                FROM audit_sessions
-                WHERE overall_risk_score IS NOT NULL
-            """)
+            cursor = await db.execute(_SELECT_SESSION_AVERAGES_SQL)
             avg_stats = await cursor.fetchone()
             
-            return {
-                "total_audits_performed": total_audits,
-                "most_common_vulnerabilities": [
-                    {"type": v[0], "count": v[1], "avg_confidence": v[2]} 
-                    for v in common_vulns
-                ],
-                "average_risk_score": avg_stats[0] if avg_stats[0] else 0,
-                "average_vulnerabilities_per_audit": avg_stats[1] if avg_stats[1] else 0,
-                "average_optimizations_per_audit": avg_stats[2] if avg_stats[2] else 0
-            }
+        self._stats_cache = {
+            "total_audits_performed": total_audits,
+            "most_common_vulnerabilities": common_vulns,
+            "average_risk_score": avg_stats["avg_risk"] or 0,
+            "average_vulnerabilities_per_audit": avg_stats["avg_vulns"] or 0,
+            "average_optimizations_per_audit": avg_stats["avg_optimizations"] or 0
+        }
+        self._stats_ts = time.monotonic()
+        return self._stats_cache
     
     async def retrain(self, learning_rate: float, pattern_threshold: float, enable_auto_learning: bool, save_patterns: bool) -> Dict[str, Any]:
         """Retrain the learning engine with new configuration values"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.writer() as db:
             # Example: update all pattern detection accuracies based on new threshold
-            await db.execute("""
-                UPDATE contract_patterns
-                SET detection_accuracy = CASE
-                    WHEN detection_accuracy < ? THEN detection_accuracy * ?
-                    ELSE detection_accuracy * (1 + ?/10.0)
-                END,
-                    last_updated = CURRENT_TIMESTAMP
-            """, (pattern_threshold, learning_rate, learning_rate))
+            await db.execute(_RETRAIN_PATTERNS_SQL, (pattern_threshold, learning_rate, learning_rate))
             await db.commit()
         # Optionally, log retrain event or refresh stats
         return {
@@ -240,30 +877,24 @@ class ZeraLearningEngine:
             "save_patterns": save_patterns
         }
     
+    async def get_pattern_stats(self) -> Tuple[int, float]:
+        """Pattern count and average detection accuracy (e.g. before/after a retrain)"""
+        async with self.pool.connection() as db:
+            cursor = await db.execute(_SELECT_PATTERN_STATS_SQL)
+            row = await cursor.fetchone()
+        return row["count"], row["avg_accuracy"] or 0.0
+    
     async def get_recent_learnings(self) -> Dict[str, Any]:
         """Fetch recent common vulnerabilities and gas optimization patterns from the database."""
-        async with aiosqlite.connect(self.db_path) as db:
+        await self.flush()
+        async with self.pool.connection() as db:
             # Fetch most common vulnerabilities
-            cursor = await db.execute("""
-                SELECT vulnerability_type, COUNT(*) as count
-                FROM audit_findings
-                GROUP BY vulnerability_type
-                ORDER BY count DESC
-                LIMIT 5
-            """)
-            vulns = await cursor.fetchall()
-            common_vulnerabilities = [v[0] for v in vulns]
+            cursor = await db.execute(_SELECT_TOP_VULN_TYPES_SQL)
+            common_vulnerabilities = [row["vulnerability_type"] for row in await cursor.fetchall()]
 
             # Fetch most common gas optimization patterns
-            cursor = await db.execute("""
-                SELECT optimization_type, COUNT(*) as count
-                FROM gas_optimizations
-                GROUP BY optimization_type
-                ORDER BY count DESC
-                LIMIT 5
-            """)
-            gas_patterns = await cursor.fetchall()
-            gas_optimization_patterns = [g[0] for g in gas_patterns]
+            cursor = await db.execute(_SELECT_TOP_GAS_TYPES_SQL)
+            gas_optimization_patterns = [row["optimization_type"] for row in await cursor.fetchall()]
 
         return {
             "common_vulnerabilities": common_vulnerabilities,
@@ -272,16 +903,37 @@ class ZeraLearningEngine:
     
     def _generate_session_id(self) -> str:
         """Generate unique session ID"""
-        return f"zera_audit_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(datetime.now()) % 10000}"
+        # Random suffix so sessions started within the same second don't collide
+        return f"zera_audit_{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_hex(2)}"
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _name_like_pattern(contract_name: str) -> str:
+        """LIKE pattern matching contracts whose name contains this one's prefix"""
+        prefix = contract_name.split('Token', 1)[0] if 'Token' in contract_name else contract_name[:5]
+        return f"%{prefix}%"
     
-    def _hash_contract(self, contract_code: str) -> str:
-        """Generate hash for contract code"""
-        return hashlib.md5(contract_code.encode()).hexdigest()
+    @staticmethod
+    def _blob_ref(blobs: Dict[bytes, str], content: Optional[str]) -> Optional[bytes]:
+        """Content hash for text stored in the blobs table; collects the row into blobs"""
+        if not content:
+            return None
+        blob_hash = contract_digest(content)
+        blobs[blob_hash] = content
+        return blob_hash
+    
+    @staticmethod
+    def _to_int(value: Any, default: int = 0) -> int:
+        """Coerce parsed numeric strings like "20000" for STRICT INTEGER columns"""
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
 
 # Enhanced agent instructions with learning capabilities
-def get_enhanced_security_instructions(learning_data: Dict[str, Any]) -> str:
-    """Generate enhanced security instructions based on learning data"""
-    base_instructions = """You are Zera, an elite smart contract security auditor. Your mission is to identify ALL vulnerabilities in Solidity code.
+# Base prompts are module constants so they aren't rebuilt on every call
+_SECURITY_BASE_INSTRUCTIONS = """You are Zera, an elite smart contract security auditor. Your mission is to identify ALL vulnerabilities in Solidity code.
 
     Focus areas:
     - Reentrancy (direct, cross-function, read-only)
@@ -301,27 +953,8 @@ def get_enhanced_security_instructions(learning_data: Dict[str, Any]) -> str:
     
     Rate severity: CRITICAL, HIGH, MEDIUM, LOW, INFORMATIONAL
     Always explain attack scenarios and provide exploit examples."""
-    
-    if not learning_data:
-        return base_instructions
-    
-    enhanced_instructions = base_instructions + "\n\n🧠 LEARNING INSIGHTS:\n"
-    
-    if learning_data.get('common_vulnerabilities'):
-        enhanced_instructions += f"Based on {learning_data.get('similar_contracts_analyzed', 0)} similar contracts analyzed, pay special attention to:\n"
-        for vuln in learning_data['common_vulnerabilities'][:5]:  # Top 5
-            enhanced_instructions += f"- {vuln}\n"
-    
-    if learning_data.get('false_positive_patterns'):
-        enhanced_instructions += f"\nAvoid these patterns that are often false positives:\n"
-        for pattern in learning_data['false_positive_patterns'][:3]:
-            enhanced_instructions += f"- {pattern}\n"
-    
-    return enhanced_instructions
 
-def get_enhanced_gas_instructions(learning_data: Dict[str, Any]) -> str:
-    """Generate enhanced gas optimization instructions based on learning data"""
-    base_instructions = """You are a gas optimization expert. Analyze Solidity code for gas inefficiencies.
+_GAS_BASE_INSTRUCTIONS = """You are a gas optimization expert. Analyze Solidity code for gas inefficiencies.
 
     Focus areas:
     - Storage slot packing (group uint256 with smaller types)
@@ -337,18 +970,37 @@ def get_enhanced_gas_instructions(learning_data: Dict[str, Any]) -> str:
     - Use assembly for gas-critical operations
     
     Provide gas savings estimates and refactored code examples."""
+
+def get_enhanced_security_instructions(learning_data: Dict[str, Any]) -> str:
+    """Generate enhanced security instructions based on learning data"""
+    if not learning_data:
+        return _SECURITY_BASE_INSTRUCTIONS
     
+    # Collect the pieces and join once instead of repeated += copies
+    parts = [_SECURITY_BASE_INSTRUCTIONS, "\n\n🧠 LEARNING INSIGHTS:\n"]
+    
+    if learning_data.get('common_vulnerabilities'):
+        parts.append(f"Based on {learning_data.get('similar_contracts_analyzed', 0)} similar contracts analyzed, pay special attention to:\n")
+        parts.extend(f"- {vuln}\n" for vuln in learning_data['common_vulnerabilities'][:5])  # Top 5
+    
+    if learning_data.get('false_positive_patterns'):
+        parts.append("\nAvoid these patterns that are often false positives:\n")
+        parts.extend(f"- {pattern}\n" for pattern in learning_data['false_positive_patterns'][:3])
+    
+    return "".join(parts)
+
+def get_enhanced_gas_instructions(learning_data: Dict[str, Any]) -> str:
+    """Generate enhanced gas optimization instructions based on learning data"""
     if not learning_data:
-        return base_instructions
+        return _GAS_BASE_INSTRUCTIONS
     
-    enhanced_instructions = base_instructions + "\n\n⚡ LEARNING INSIGHTS:\n"
+    parts = [_GAS_BASE_INSTRUCTIONS, "\n\n⚡ LEARNING INSIGHTS:\n"]
     
     if learning_data.get('gas_optimization_patterns'):
-        enhanced_instructions += f"Based on previous optimizations, prioritize these high-impact patterns:\n"
-        for pattern in learning_data['gas_optimization_patterns'][:5]:
-            enhanced_instructions += f"- {pattern}\n"
+        parts.append("Based on previous optimizations, prioritize these high-impact patterns:\n")
+        parts.extend(f"- {pattern}\n" for pattern in learning_data['gas_optimization_patterns'][:5])
     
     if learning_data.get('average_gas_savings'):
-        enhanced_instructions += f"\nTarget gas savings: Aim for optimizations that save at least {learning_data['average_gas_savings']} gas units.\n"
+        parts.append(f"\nTarget gas savings: Aim for optimizations that save at least {learning_data['average_gas_savings']} gas units.\n")
     
-    return enhanced_instructions
+    return "".join(parts)
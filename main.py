@@ -15,20 +15,15 @@ Capabilities:
 """
 
 import asyncio
+import logging
 from agents_manager import AgentManager
 from workflow_orchestrator import WorkflowOrchestrator
 from settings import Settings
+from learning_engine import close_pools, contract_digest
 # from tools.custom_tools import DataAnalysisTool, ReportGenerationTool  # Commented out until we create this file
 
-async def main():
-    # Initialize settings
-    settings = Settings()
-    
-    # Create agent manager
-    agent_manager = AgentManager(settings)
-    
-    # Smart contract to audit (example)
-    sample_contract = """
+# Smart contract to audit (example), and its digest computed once at import
+SAMPLE_CONTRACT = """
     pragma solidity ^0.8.0;
     
     contract VulnerableToken {
@@ -60,11 +55,20 @@ async def main():
         }
     }
     """
+SAMPLE_CONTRACT_HASH = contract_digest(SAMPLE_CONTRACT)
+
+async def main():
+    # Initialize settings
+    settings = Settings()
+    
+    # Create agent manager
+    agent_manager = AgentManager(settings)
     
     # Create specialized agents with contract context
     await agent_manager.create_agents(
         contract_name="VulnerableToken",
-        contract_code=sample_contract
+        contract_code=SAMPLE_CONTRACT,
+        contract_hash=SAMPLE_CONTRACT_HASH
     )
     
     # Initialize workflow orchestrator
@@ -72,7 +76,7 @@ async def main():
     
     # Run Zera smart contract security audit
     result = await orchestrator.run_security_audit_pipeline(
-        contract_code=sample_contract,
+        contract_code=SAMPLE_CONTRACT,
         contract_name="VulnerableToken",
         audit_scope="Full security review with gas optimization"
     )
@@ -80,6 +84,16 @@ async def main():
     print(f"🔒 Zera Security Audit Completed: {result['status']}")
     print(f"📊 Findings: {len(result.get('security_findings', []))} security issues identified")
     print(f"⛽ Gas Optimizations: {len(result.get('gas_optimizations', []))} improvements found")
+    
+    await close_pools()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # Parser/raw-response dumps are debug level; INFO keeps production runs from building them
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # uvloop is optional; use it for the event loop when installed
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(main())
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 # Try to import streamlit to check for secrets
@@ -9,18 +9,28 @@ try:
 except ImportError:
     STREAMLIT_AVAILABLE = False
 
-def get_secret(key: str, default: Optional[str] = None) -> Optional[str]:
-    """Get secret from Streamlit secrets or environment variables"""
+# Resolved secret values, looked up once per process (Streamlit secrets access parses a file)
+_SECRETS_CACHE: Dict[str, Optional[str]] = {}
+# Flipped off the first time st.secrets fails, so we don't keep retrying it
+_streamlit_secrets_ok = STREAMLIT_AVAILABLE
+
+def _lookup_secret(key: str) -> Optional[str]:
+    global _streamlit_secrets_ok
     # First try Streamlit secrets (for local development)
-    if STREAMLIT_AVAILABLE:
+    if _streamlit_secrets_ok:
         try:
-            return st.secrets.get(key, os.getenv(key, default))
+            return st.secrets.get(key, os.getenv(key))
         except:
             # Fallback to environment variables if secrets not available
-            return os.getenv(key, default)
-    else:
-        # Fallback to environment variables
-        return os.getenv(key, default)
+            _streamlit_secrets_ok = False
+    return os.getenv(key)
+
+def get_secret(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Get secret from Streamlit secrets or environment variables"""
+    if key not in _SECRETS_CACHE:
+        _SECRETS_CACHE[key] = _lookup_secret(key)
+    value = _SECRETS_CACHE[key]
+    return default if value is None else value
 
 class Settings(BaseModel):
     # API Configuration - Use environment variables and Streamlit secrets
@@ -1,21 +1,30 @@
 from iointel import AsyncMemory
-from typing import Dict, Any, List
-import json
-import asyncio
+from typing import Dict, Any
+import time
+from collections import OrderedDict
+
+# Max contexts kept in process; older ones are evicted (they remain in AsyncMemory)
+_CONTEXT_STORE_SIZE = 1024
 
 class SharedContextManager:
-    def __init__(self):
+    def __init__(self, max_contexts: int = _CONTEXT_STORE_SIZE):
         self.memory = AsyncMemory()
-        self.context_store: Dict[str, Any] = {}
+        # LRU: most recently stored/read contexts at the end
+        self.context_store: OrderedDict[str, Any] = OrderedDict()
+        self.max_contexts = max_contexts
     
     async def store_context(self, context_id: str, data: Dict[str, Any]):
         """Store context data"""
         self.context_store[context_id] = data
+        self.context_store.move_to_end(context_id)
+        while len(self.context_store) > self.max_contexts:
+            self.context_store.popitem(last=False)
         await self.memory.store_run_history(context_id, data)
     
     async def get_context(self, context_id: str) -> Dict[str, Any]:
         """Retrieve context data"""
         if context_id in self.context_store:
+            self.context_store.move_to_end(context_id)
             return self.context_store[context_id]
         
         # Try to load from memory
@@ -32,5 +41,5 @@ class SharedContextManager:
             "from": from_agent,
             "to": to_agent,
             "data": data,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": time.monotonic_ns()  # monotonic, for ordering hand-offs
         })
\ No newline at end of file
@@ -1,24 +1,28 @@
-import asyncio
-from init_database import init_database
-asyncio.run(init_database())
-
-
 import streamlit as st
 import asyncio
+import copy
+import threading
 import json
-import time
-import aiosqlite
+import logging
+import re
+from html import escape
+from string import Template
+from collections import Counter, deque
+from itertools import islice
+from pathlib import Path
 from datetime import datetime
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from typing import Dict, List, Any
+from typing import AsyncIterator, Callable, Deque, Dict, List, Any, Optional, Tuple
 
 # Import our Zera components
 from agents_manager import AgentManager
 from workflow_orchestrator import WorkflowOrchestrator
 from settings import Settings
-from learning_engine import ZeraLearningEngine
+from learning_engine import ZeraLearningEngine, dumps_json, get_pool
+from init_database import init_database
+
+# Audit debug dumps are logged at debug level; INFO keeps them (and their string slicing) off.
+# basicConfig is a no-op on reruns once the root logger has a handler
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 # Page configuration
 st.set_page_config(
@@ -28,760 +32,101 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling and contrast
-st.markdown("""
-<style>
-    /* Global text improvements */
-    .stApp {
-        background-color: #ffffff;
-        color: #1a1a1a;
-    }
-    
-    /* Main header with better contrast */
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: #1e3a8a !important;
-        text-align: center;
-        margin-bottom: 2rem;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-        padding: 1rem;
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-        border-radius: 10px;
-        border: 1px solid #d1d5db;
-    }
-    
-    /* Improved agent cards with better contrast */
-    .agent-card {
-        border: 2px solid #d1d5db;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        background: #ffffff;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        color: #1a1a1a !important;
-    }
-    
-    .agent-card strong {
-        color: #1e3a8a !important;
-        font-weight: 600;
-    }
-    
-    /* Vulnerability cards with high contrast */
-    .vulnerability-critical {
-        background-color: #fef2f2;
-        border-left: 6px solid #dc2626;
-        padding: 15px;
-        margin: 10px 0;
-        border-radius: 5px;
-        color: #0f172a !important;
-        box-shadow: 0 2px 4px rgba(220, 38, 38, 0.1);
-        border: 1px solid #fecaca;
-    }
-    
-    .vulnerability-critical h4 {
-        color: #b91c1c !important;
-        font-weight: 700;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-critical p {
-        color: #0f172a !important;
-        line-height: 1.6;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-critical strong {
-        color: #1e293b !important;
-        font-weight: 600;
-    }
-    
-    .vulnerability-high {
-        background-color: #fffbeb;
-        border-left: 6px solid #f59e0b;
-        padding: 15px;
-        margin: 10px 0;
-        border-radius: 5px;
-        color: #0f172a !important;
-        box-shadow: 0 2px 4px rgba(245, 158, 11, 0.1);
-        border: 1px solid #fed7aa;
-    }
-    
-    .vulnerability-high h4 {
-        color: #d97706 !important;
-        font-weight: 700;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-high p {
-        color: #0f172a !important;
-        line-height: 1.6;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-high strong {
-        color: #1e293b !important;
-        font-weight: 600;
-    }
-    
-    .vulnerability-medium {
-        background-color: #faf5ff;
-        border-left: 6px solid #8b5cf6;
-        padding: 15px;
-        margin: 10px 0;
-        border-radius: 5px;
-        color: #0f172a !important;
-        box-shadow: 0 2px 4px rgba(139, 92, 246, 0.1);
-        border: 1px solid #ddd6fe;
-    }
-    
-    .vulnerability-medium h4 {
-        color: #7c3aed !important;
-        font-weight: 700;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-medium p {
-        color: #0f172a !important;
-        line-height: 1.6;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-medium strong {
-        color: #1e293b !important;
-        font-weight: 600;
-    }
-    
-    .vulnerability-low {
-        background-color: #f0f9ff;
-        border-left: 6px solid #3b82f6;
-        padding: 15px;
-        margin: 10px 0;
-        border-radius: 5px;
-        color: #0f172a !important;
-        box-shadow: 0 2px 4px rgba(59, 130, 246, 0.1);
-        border: 1px solid #bfdbfe;
-    }
-    
-    .vulnerability-low h4 {
-        color: #2563eb !important;
-        font-weight: 700;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-low p {
-        color: #0f172a !important;
-        line-height: 1.6;
-        margin-bottom: 8px;
-    }
-    
-    .vulnerability-low strong {
-        color: #1e293b !important;
-        font-weight: 600;
-    }
-    
-    /* Gas optimization cards */
-    .gas-optimization {
-        background-color: #f8fafc;
-        border-left: 6px solid #10b981;
-        padding: 15px;
-        margin: 10px 0;
-        border-radius: 5px;
-        color: #0f172a !important;
-        box-shadow: 0 2px 4px rgba(16, 185, 129, 0.1);
-        border: 1px solid #e2e8f0;
-    }
-    
-    .gas-optimization h4 {
-        color: #059669 !important;
-        font-weight: 700;
-        margin-bottom: 8px;
-    }
-    
-    .gas-optimization p {
-        color: #0f172a !important;
-        line-height: 1.6;
-        margin-bottom: 8px;
-    }
-    
-    .gas-optimization strong {
-        color: #1e293b !important;
-        font-weight: 600;
-    }
-    
-    /* Enhanced stats cards */
-    .stats-card {
-        background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 100%);
-        color: white !important;
-        padding: 1.5rem;
-        border-radius: 10px;
-        text-align: center;
-        box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-        border: none;
-    }
-    
-    .stats-card h3 {
-        color: white !important;
-        font-weight: 700;
-        font-size: 2rem;
-        margin-bottom: 0.5rem;
-    }
-    
-    .stats-card p {
-        color: white !important;
-        font-weight: 500;
-        margin: 0;
-    }
-    
-    /* Improved text readability for all elements */
-    .stMarkdown p, .stMarkdown li, .stMarkdown span {
-        color: #1a1a1a !important;
-        font-weight: 400 !important;
-        line-height: 1.6 !important;
-    }
-    
-    .stMarkdown strong {
-        color: #1e3a8a !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Ensure all text in main content area is visible */
-    .main .block-container {
-        color: #1a1a1a !important;
-    }
-    
-    /* Fix for any remaining text visibility issues */
-    .stApp, .stApp > div, .stApp p, .stApp span {
-        color: #1a1a1a !important;
-    }
-    
-    /* Specific fix for info messages */
-    .stAlert, .stAlert > div, .stAlert p {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-    }
-    
-    /* Code blocks with better contrast */
-    code {
-        background-color: #f1f5f9 !important;
-        color: #1e293b !important;
-        padding: 2px 6px;
-        border-radius: 4px;
-        font-family: 'Courier New', monospace;
-        border: 1px solid #e2e8f0;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 100%);
-        color: white !important;
-        border: none;
-        border-radius: 8px;
-        font-weight: 600;
-        padding: 0.5rem 1rem;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3);
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background-color: #f8fafc;
-        border-right: 1px solid #e2e8f0;
-    }
-    
-    /* Metric styling */
-    .css-1xarl3l {
-        color: #1a1a1a !important;
-    }
-    
-    /* Info boxes with enhanced visibility */
-    .stInfo {
-        background-color: #f0f9ff !important;
-        color: #1e293b !important;
-        border-left: 4px solid #3b82f6 !important;
-        border-radius: 8px !important;
-        padding: 16px !important;
-        font-weight: 500 !important;
-        box-shadow: 0 2px 4px rgba(59, 130, 246, 0.1) !important;
-    }
-    
-    .stInfo > div {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-    }
-    
-    .stInfo p {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        margin: 0 !important;
-    }
-    
-    .stSuccess {
-        background-color: #f0fdf4 !important;
-        color: #1e293b !important;
-        border-left: 4px solid #10b981 !important;
-        border: 1px solid #bbf7d0 !important;
-        border-radius: 8px !important;
-        padding: 1rem !important;
-    }
-    
-    .stSuccess > div {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-    }
-    
-    .stSuccess p {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        margin: 0 !important;
-    }
-    
-    .stError {
-        background-color: #fef2f2 !important;
-        color: #1e293b !important;
-        border-left: 4px solid #dc2626 !important;
-        border: 1px solid #fecaca !important;
-        border-radius: 8px !important;
-        padding: 1rem !important;
-    }
-    
-    .stError > div {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-    }
-    
-    .stError p {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        margin: 0 !important;
-    }
-    
-    .stWarning {
-        background-color: #fffbeb !important;
-        color: #1e293b !important;
-        border-left: 4px solid #f59e0b !important;
-        border: 1px solid #fed7aa !important;
-        border-radius: 8px !important;
-        padding: 1rem !important;
-    }
-    
-    .stWarning > div {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-    }
-    
-    .stWarning p {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        margin: 0 !important;
-    }
-    
-    /* Headers */
-    h1, h2, h3, h4, h5, h6 {
-        color: #1e3a8a !important;
-        font-weight: 600;
-    }
-    
-    /* Tables */
-    .stDataFrame {
-        background-color: white;
-        border: 1px solid #e2e8f0;
-        border-radius: 8px;
-    }
-    
-    /* Selectbox and inputs with enhanced contrast */
-    .stSelectbox label, .stTextInput label, .stTextArea label {
-        color: #1e3a8a !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-    }
-    
-    /* Selectbox main container */
-    .stSelectbox {
-        font-size: 16px !important;
-    }
-    
-    /* Selectbox dropdown styling for better contrast */
-    .stSelectbox > div > div,
-    .stSelectbox [data-baseweb="select"] > div {
-        background-color: #ffffff !important;
-        border: 2px solid #374151 !important;
-        border-radius: 8px !important;
-        min-height: 44px !important;
-    }
-    
-    /* Selectbox dropdown text */
-    .stSelectbox > div > div > div,
-    .stSelectbox [data-baseweb="select"] > div > div {
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        font-size: 16px !important;
-        background-color: #ffffff !important;
-    }
-    
-    /* Selectbox dropdown arrow and button */
-    .stSelectbox > div > div button,
-    .stSelectbox [data-baseweb="select"] button {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        border: none !important;
-    }
-    
-    /* Selectbox value display */
-    .stSelectbox [data-baseweb="select"] [data-baseweb="tag"] {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        font-size: 16px !important;
-    }
-    
-    /* Selectbox dropdown options container */
-    .stSelectbox > div > div > div[role="listbox"],
-    .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] {
-        background-color: #ffffff !important;
-        border: 2px solid #374151 !important;
-        border-radius: 8px !important;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15) !important;
-        max-height: 300px !important;
-        overflow-y: auto !important;
-    }
-    
-    /* Individual selectbox options */
-    .stSelectbox > div > div > div[role="listbox"] > div,
-    .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"] {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        font-size: 16px !important;
-        padding: 12px 16px !important;
-        border-bottom: 1px solid #e5e7eb !important;
-        min-height: 44px !important;
-        cursor: pointer !important;
-    }
-    
-    /* Selectbox option hover state */
-    .stSelectbox > div > div > div[role="listbox"] > div:hover,
-    .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"]:hover {
-        background-color: #f3f4f6 !important;
-        color: #1e3a8a !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Selected option in selectbox */
-    .stSelectbox > div > div > div[role="listbox"] > div[aria-selected="true"],
-    .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"][aria-selected="true"] {
-        background-color: #dbeafe !important;
-        color: #1e293b !important;
-        font-weight: 700 !important;
-    }
-    
-    /* Selectbox focus state */
-    .stSelectbox > div > div:focus-within,
-    .stSelectbox [data-baseweb="select"]:focus-within {
-        border-color: #3b82f6 !important;
-        box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.2) !important;
-        outline: none !important;
-    }
-    
-    /* Selectbox when open */
-    .stSelectbox [data-baseweb="select"][aria-expanded="true"] {
-        border-color: #3b82f6 !important;
-        box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.2) !important;
-    }
-    
-    /* Accessibility improvements for selectbox */
-    .stSelectbox * {
-        transition: all 0.2s ease !important;
-    }
-    
-    /* High contrast mode for selectbox */
-    @media (prefers-contrast: high) {
-        .stSelectbox > div > div,
-        .stSelectbox [data-baseweb="select"] > div {
-            border: 3px solid #000000 !important;
-        }
-        
-        .stSelectbox > div > div > div,
-        .stSelectbox [data-baseweb="select"] > div > div {
-            color: #000000 !important;
-            font-weight: 700 !important;
-        }
-        
-        .stSelectbox > div > div > div[role="listbox"] > div,
-        .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"] {
-            color: #000000 !important;
-            border-bottom: 2px solid #000000 !important;
-        }
-    }
-    
-    /* Sidebar selectbox specific styling */
-    .css-1d391kg .stSelectbox,
-    [data-testid="stSidebar"] .stSelectbox {
-        margin-bottom: 20px !important;
-    }
-    
-    .css-1d391kg .stSelectbox > div > div,
-    [data-testid="stSidebar"] .stSelectbox > div > div,
-    .css-1d391kg .stSelectbox [data-baseweb="select"] > div,
-    [data-testid="stSidebar"] .stSelectbox [data-baseweb="select"] > div {
-        background-color: #ffffff !important;
-        border: 2px solid #374151 !important;
-        border-radius: 8px !important;
-        min-height: 44px !important;
-        font-size: 16px !important;
-    }
-    
-    .css-1d391kg .stSelectbox label,
-    [data-testid="stSidebar"] .stSelectbox label {
-        color: #1e3a8a !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        margin-bottom: 8px !important;
-    }
-    
-    /* Sidebar selectbox options container */
-    .css-1d391kg .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"],
-    [data-testid="stSidebar"] .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] {
-        background-color: #ffffff !important;
-        border: 2px solid #374151 !important;
-        border-radius: 8px !important;
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2) !important;
-        z-index: 9999 !important;
-    }
-    
-    /* Sidebar selectbox individual options */
-    .css-1d391kg .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"],
-    [data-testid="stSidebar"] .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"] {
-        background-color: #ffffff !important;
-        color: #1e293b !important;
-        font-weight: 500 !important;
-        font-size: 16px !important;
-        padding: 12px 16px !important;
-        border-bottom: 1px solid #e5e7eb !important;
-        min-height: 44px !important;
-    }
-    
-    /* Sidebar selectbox option hover state */
-    .css-1d391kg .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"]:hover,
-    [data-testid="stSidebar"] .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"]:hover {
-        background-color: #f3f4f6 !important;
-        color: #1e293b !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Sidebar selectbox selected option */
-    .css-1d391kg .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"][aria-selected="true"],
-    [data-testid="stSidebar"] .stSelectbox [data-baseweb="popover"] [data-baseweb="menu"] [role="option"][aria-selected="true"] {
-        background-color: #dbeafe !important;
-        color: #1e293b !important;
-        font-weight: 700 !important;
-    }
-    
-    /* Enhanced visibility for all alert types including info messages */
-    .stAlert[data-baseweb="notification"] {
-        background-color: #f0f9ff !important;
-        color: #1e293b !important;
-        border-left: 4px solid #3b82f6 !important;
-        border-radius: 8px !important;
-        padding: 16px !important;
-        font-weight: 600 !important;
-        box-shadow: 0 2px 4px rgba(59, 130, 246, 0.1) !important;
-    }
-    
-    /* Force high contrast for all text within alerts */
-    .stAlert div, .stAlert p, .stAlert span {
-        color: #1e293b !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Additional rule for info specifically */
-    div[data-testid="stAlert"] {
-        background-color: #f0f9ff !important;
-        color: #1e293b !important;
-        font-weight: 600 !important;
-    }
-    
-    /* Text input styling for high contrast */
-    .stTextInput > div > div > input,
-    .stTextArea > div > div > textarea {
-        background-color: #ffffff !important;
-        border: 2px solid #374151 !important;
-        border-radius: 8px !important;
-        color: #1e293b !important;
-        font-size: 16px !important;
-        font-weight: 500 !important;
-        padding: 12px 16px !important;
-        min-height: 44px !important;
-    }
-    
-    /* Text input focus state */
-    .stTextInput > div > div > input:focus,
-    .stTextArea > div > div > textarea:focus {
-        border-color: #3b82f6 !important;
-        box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.2) !important;
-        outline: none !important;
-    }
-    
-    /* Button styling for high contrast */
-    .stButton > button {
-        background-color: #3b82f6 !important;
-        color: #ffffff !important;
-        border: 2px solid #3b82f6 !important;
-        border-radius: 8px !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        padding: 12px 24px !important;
-        min-height: 44px !important;
-        transition: all 0.2s ease !important;
-    }
-    
-    /* Button hover state */
-    .stButton > button:hover {
-        background-color: #1e3a8a !important;
-        border-color: #1e3a8a !important;
-        transform: translateY(-1px) !important;
-        box-shadow: 0 4px 8px rgba(30, 58, 138, 0.3) !important;
-    }
-    
-    /* Primary button */
-    .stButton[data-testid="baseButton-primary"] > button {
-        background-color: #dc2626 !important;
-        border-color: #dc2626 !important;
-    }
-    
-    .stButton[data-testid="baseButton-primary"] > button:hover {
-        background-color: #991b1b !important;
-        border-color: #991b1b !important;
-    }
-    
-    /* Secondary button */
-    .stButton[data-testid="baseButton-secondary"] > button {
-        background-color: #ffffff !important;
-        color: #374151 !important;
-        border-color: #374151 !important;
-    }
-    
-    .stButton[data-testid="baseButton-secondary"] > button:hover {
-        background-color: #f9fafb !important;
-        color: #1f2937 !important;
-        border-color: #1f2937 !important;
-    }
-    
-    /* File uploader styling */
-    .stFileUploader > div {
-        border: 2px dashed #374151 !important;
-        border-radius: 8px !important;
-        background-color: #f9fafb !important;
-        padding: 20px !important;
-    }
-    
-    .stFileUploader label {
-        color: #1e3a8a !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-    }
-    
-    /* Tab styling for high contrast */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px !important;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background-color: #f3f4f6 !important;
-        color: #374151 !important;
-        border: 2px solid #d1d5db !important;
-        border-radius: 8px 8px 0 0 !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        padding: 12px 20px !important;
-        min-height: 44px !important;
-    }
-    
-    .stTabs [data-baseweb="tab"][aria-selected="true"] {
-        background-color: #3b82f6 !important;
-        color: #ffffff !important;
-        border-color: #3b82f6 !important;
-    }
+# Custom CSS for better styling and contrast, kept readable in assets/zera.css.
+# The minified <style> markup is built once per process; it still has to be emitted on every
+# rerun, since Streamlit drops elements a rerun doesn't redraw
+CSS_PATH = Path(__file__).parent / "assets" / "zera.css"
+
+def _minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{}:;,>])\s*", r"\1", css).replace(";}", "}").strip()
+
+@st.cache_resource(show_spinner=False)
+def _get_css() -> str:
+    return f"<style>{_minify_css(CSS_PATH.read_text())}</style>"
+
+st.markdown(_get_css(), unsafe_allow_html=True)
+
+@st.cache_resource(show_spinner=False)
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """One event loop per process, running in a daemon thread, so warmed clients, connections and
+    background tasks survive across reruns instead of dying with a per-call asyncio.run loop.
+    
+    Script threads submit work with run_async; Streamlit calls stay on the script thread.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="zera-event-loop", daemon=True).start()
+    return loop
+
+def run_async(coro):
+    """Run a coroutine on the shared loop, blocking this script thread until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def iter_async(agen: AsyncIterator):
+    """Step an async generator on the shared loop, handing each item back to this script thread"""
+    async def next_item():
+        return await agen.__anext__()
     
-    .stTabs [data-baseweb="tab"]:hover {
-        background-color: #e5e7eb !important;
-        color: #1f2937 !important;
-    }
+    while True:
+        try:
+            yield run_async(next_item())
+        except StopAsyncIteration:
+            return
+
+@st.cache_resource(show_spinner=False)
+def _startup() -> bool:
+    """Once-per-process setup: create and seed the database and warm its connection pool"""
+    run_async(init_database())
+    # Warm on the shared loop, where the pooled connections outlive this call and serve every audit
+    db_path = Settings().memory_connection_string.replace("sqlite+aiosqlite:///", "")
+    run_async(get_pool(db_path).warm())
+    return True
+
+_startup()
+
+# Audits kept per session; the oldest drop off so a long-lived session can't grow without bound
+_AUDIT_HISTORY_LIMIT = 1000
+
+# Initialize session state; setdefault only fills keys a session doesn't have yet
+for key, default in (
+    ('audit_results', None),
+    # JSON form of audit_results, serialized once when an audit finishes
+    ('audit_results_json', None),
+    ('audit_history', deque(maxlen=_AUDIT_HISTORY_LIMIT)),
+    ('learning_insights', {}),
+    # Bumped whenever this session changes the learning database; busts learning_snapshot's cache
+    ('learning_version', 0)
+):
+    st.session_state.setdefault(key, default)
+
+@st.cache_resource(show_spinner=False)
+def get_zera_system() -> Dict[str, Any]:
+    """Build the ZERA components once per process; every session shares them.
     
-    /* Tab panels */
-    .stTabs [data-baseweb="tab-panel"] {
-        background-color: #ffffff !important;
-        border: 2px solid #3b82f6 !important;
-        border-top: none !important;
-        border-radius: 0 0 8px 8px !important;
-        padding: 20px !important;
-    }
+    Raises on misconfiguration, and exceptions aren't cached, so a fixed API key is picked up on the next call.
+    """
+    settings = Settings()
     
-    div[data-testid="stAlert"] > div {
-        color: #1e293b !important;
-        font-weight: 600 !important;
-    }
+    # Validate API key
+    if not settings.api_key:
+        raise ValueError("API key not found. Please set API_KEY in Streamlit secrets or environment variables.")
     
-    /* Global text visibility override */
-    * {
-        color: #1e293b !important;
-    }
+    # Try to initialize components
+    agent_manager = AgentManager(settings)
     
-    /* Specific override for streamlit alert text */
-    .element-container .stAlert .stMarkdown p {
-        color: #1e293b !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
+    return {
+        'settings': settings,
+        'agent_manager': agent_manager,
+        'workflow_orchestrator': WorkflowOrchestrator(agent_manager, settings),
+        'learning_engine': ZeraLearningEngine(settings)
     }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize session state
-if 'audit_results' not in st.session_state:
-    st.session_state.audit_results = None
-if 'audit_history' not in st.session_state:
-    st.session_state.audit_history = []
-if 'learning_insights' not in st.session_state:
-    st.session_state.learning_insights = {}
-
-# Add session reset functionality in sidebar for troubleshooting
-with st.sidebar:
-    st.markdown("---")
-    if st.button("🔄 Reset Session Data", help="Clear all cached audit results and history"):
-        st.session_state.audit_results = None
-        st.session_state.audit_history = []
-        st.session_state.learning_insights = {}
-        if 'zera_system' in st.session_state:
-            del st.session_state.zera_system
-        st.success("Session data cleared!")
-        st.rerun()
 
 def initialize_zera_system():
     """Initialize the Zera AI system with validation"""
     if 'zera_system' not in st.session_state:
         try:
-            settings = Settings()
-            
-            # Validate API key
-            if not settings.api_key:
-                raise ValueError("API key not found. Please set API_KEY in Streamlit secrets or environment variables.")
-            
-            # Try to initialize components
-            agent_manager = AgentManager(settings)
-            workflow_orchestrator = WorkflowOrchestrator(agent_manager, settings)
-            learning_engine = ZeraLearningEngine(settings)
-            
-            st.session_state.zera_system = {
-                'settings': settings,
-                'agent_manager': agent_manager,
-                'workflow_orchestrator': workflow_orchestrator,
-                'learning_engine': learning_engine
-            }
-            
+            shared = get_zera_system()
         except Exception as e:
             st.error(f"Failed to initialize ZERA system: {str(e)}")
             
@@ -795,36 +140,73 @@ def initialize_zera_system():
             
             # Return None to indicate failure
             return None
+        
+        # Shallow per-session copy of the shared agent manager: agent prototypes, learning caches
+        # and the engine stay shared, but create_agents rebinds .agents on this session's copy only
+        agent_manager = copy.copy(shared['agent_manager'])
+        st.session_state.zera_system = {
+            **shared,
+            'agent_manager': agent_manager,
+            'workflow_orchestrator': WorkflowOrchestrator(agent_manager, shared['settings'])
+        }
             
     return st.session_state.zera_system
 
-async def run_audit(contract_code: str, contract_name: str, audit_scope: str):
-    """Run the complete audit process with error handling"""
+async def run_audit(workflow_orchestrator: WorkflowOrchestrator, contract_code: str, contract_name: str,
+                    audit_scope: str) -> AsyncIterator[Dict[str, Any]]:
+    """Run the complete audit process, yielding each agent's results as they land and the full results last"""
+    # Run the audit workflow (it creates the agents with contract context itself)
+    async for partial in workflow_orchestrator.stream_full_audit(
+        contract_code=contract_code,
+        contract_name=contract_name,
+        audit_scope=audit_scope
+    ):
+        yield partial
+
+def stream_audit(contract_code: str, contract_name: str, audit_scope: str, sec_ph, gas_ph,
+                 on_progress: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+    """Drain run_audit on the shared loop, previewing each agent's cards in its placeholder, and return the full results"""
     zera_system = initialize_zera_system()
     
     # Check if initialization was successful
     if zera_system is None:
         raise ValueError("ZERA system not properly initialized. Check API configuration.")
     
-    # Create agents with contract context
-    await zera_system['agent_manager'].create_agents(contract_name, contract_code)
-    
-    # Run the audit workflow
-    results = await zera_system['workflow_orchestrator'].run_full_audit(
-        contract_code=contract_code,
-        contract_name=contract_name,
-        audit_scope=audit_scope
-    )
-    
+    results = {}
+    agents_done = 0
+    for partial in iter_async(run_audit(zera_system['workflow_orchestrator'], contract_code, contract_name, audit_scope)):
+        if "status" in partial:
+            results = partial
+        else:
+            render_partial(partial, sec_ph, gas_ph)
+            agents_done += 1
+            if on_progress:
+                # Two agents run, then risk scoring and learning finish the audit
+                on_progress(agents_done / 3, "Learning from patterns..." if agents_done == 2 else "Waiting for the remaining agent...")
     return results
 
+def render_partial(partial: Dict[str, Any], sec_ph, gas_ph):
+    """Show one agent's results in its placeholder while the other agent is still running"""
+    if "security_findings" in partial:
+        findings = unique_findings(partial["security_findings"])
+        sec_ph.markdown(
+            f"<p><strong>🔍 Security Auditor finished:</strong> {len(findings)} findings</p>"
+            + "".join(finding_card_html(finding) for finding in findings),
+            unsafe_allow_html=True
+        )
+    if "gas_optimizations" in partial:
+        optimizations = partial["gas_optimizations"]
+        gas_ph.markdown(
+            f"<p><strong>⚡ Gas Optimizer finished:</strong> {len(optimizations)} optimizations</p>"
+            + "".join(gas_card_html(optimization, parse_gas_savings(optimization.get('estimated_gas_savings', '0')))
+                      for optimization in optimizations),
+            unsafe_allow_html=True
+        )
+
+# Static sample data: build it once per input; cache_data hands every caller its own copy
+@st.cache_data(show_spinner=False, max_entries=32)
 def create_demo_results(contract_code: str, contract_name: str) -> Dict[str, Any]:
     """Create demo results when API is not available - for demonstration purposes"""
-    import time
-    
-    # Simulate audit time
-    time.sleep(2)
-    
     # Mock results based on contract analysis
     demo_results = {
         "security_findings": [
@@ -866,153 +248,366 @@ def create_demo_results(contract_code: str, contract_name: str) -> Dict[str, Any
     
     return demo_results
 
-def display_audit_results(results: Dict[str, Any]):
-    """Display audit results in a structured format"""
-    
-    st.subheader("🔍 Audit Results")
-    
-    # Summary metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_vulnerabilities = len(results.get('security_findings', []))
-    gas_optimizations = len(results.get('gas_optimizations', []))
-    overall_risk = results.get('overall_risk_score', 0)
-    
-    with col1:
-        st.markdown(f"""
-        <div class="stats-card">
-            <h3>{total_vulnerabilities}</h3>
-            <p>Vulnerabilities Found</p>
-        </div>
-        """, unsafe_allow_html=True)
+SEVERITY_LEVELS = ("CRITICAL", "HIGH", "MEDIUM", "LOW", "INFORMATIONAL")
+# Card class per severity; anything unrecognised is styled as LOW
+SEVERITY_CLASSES = {severity: f"vulnerability-{severity.lower()}" for severity in SEVERITY_LEVELS}
+
+# Card skeletons are parsed once at import; each card is then a single substitute() call.
+# Kept on one line: indented or blank lines would turn part of a card into a markdown code block
+_FINDING_CARD = Template(
+    '<div class="finding-card $css_class">'
+    '<h4>🔥 $vulnerability_type [$severity]</h4>'
+    '<p><strong>Description:</strong> <span class="finding-value">$description</span></p>'
+    '<p><strong>Attack Scenario:</strong> <span class="finding-value">$attack_scenario</span></p>'
+    '<p><strong>Remediation:</strong> <span class="finding-value">$remediation</span></p>'
+    '$code_html</div>'
+)
+_STATS_CARD = Template('<div class="stats-card"><h3>$value</h3><p>$label</p></div>')
+_FINDING_CODE = Template(
+    "<p><strong>Code:</strong> <code class='code-inline'>$code</code></p>"
+)
+# Long or multi-line snippets start collapsed instead of stretching the card
+_FINDING_CODE_DETAILS = Template(
+    "<details><summary><strong>Code</strong></summary><pre class='code-block'><code>$code</code></pre></details>"
+)
+_FULL_CODE_DETAILS = Template(
+    "<details><summary>Show full code</summary><pre class='code-block code-block-full'><code>$code</code></pre></details>"
+)
+_GAS_CARD = Template(
+    '<div class="finding-card gas-optimization">'
+    '<h4>⚡ $optimization_type</h4>'
+    '<p><strong>Description:</strong> <span class="finding-value">$description</span></p>'
+    '<p><strong>Estimated Gas Savings:</strong> <span class="gas-savings">$savings gas units</span></p>'
+    '<p><strong>Difficulty:</strong> <span class="finding-value">$difficulty</span></p>'
+    '$original_html$optimized_html</div>'
+)
+_GAS_ORIGINAL_CODE = Template(
+    "<p><strong>Original Code:</strong> <code class='gas-code gas-code-original'>$code</code></p>"
+)
+_GAS_OPTIMIZED_CODE = Template(
+    "<p><strong>Optimized Code:</strong> <code class='gas-code gas-code-optimized'>$code</code></p>"
+)
+
+# Code is cut at _CODE_LIMIT chars before it reaches the page; snippets over _INLINE_CODE_LIMIT
+# (or spanning lines) go in the collapsed <details> block
+_CODE_LIMIT = 2000
+_INLINE_CODE_LIMIT = 120
+# Gas code (and code in the native finding view) shows this many lines before collapsing the rest
+_CODE_PREVIEW_LINES = 20
+
+def unique_findings(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop repeats of the same vulnerability at the same code (or, without a snippet, the same description)"""
+    seen = set()
+    unique = []
+    for finding in findings:
+        key = (finding.get('vulnerability_type'), str(finding.get('code_snippet') or finding.get('description')))
+        if key not in seen:
+            seen.add(key)
+            unique.append(finding)
+    return unique
+
+def _esc(value: Any) -> str:
+    """HTML-escape agent output (which isn't always a str) for card markup"""
+    return escape(str(value))
+
+def bullet_list_html(items: List[Any]) -> str:
+    """One escaped <ul> for a list of learned patterns"""
+    return "<ul class='insight-list'>" + "".join(f"<li>{_esc(item)}</li>" for item in items) + "</ul>"
+
+def truncate_code(code: str, max_lines: int = _CODE_PREVIEW_LINES) -> Tuple[str, bool]:
+    """First max_lines lines of code, and whether anything was cut"""
+    lines = code.splitlines()
+    return "\n".join(lines[:max_lines]), len(lines) > max_lines
+
+def gas_code_html(template: Template, code: Any) -> str:
+    """Gas card code block showing the first _CODE_PREVIEW_LINES lines, with the rest behind <details>"""
+    head, truncated = truncate_code(str(code))
+    html = template.substitute(code=_code(head))
+    if truncated:
+        html += _FULL_CODE_DETAILS.substitute(code=_code(code))
+    return html
+
+def _code(value: Any) -> str:
+    """Escaped, truncated code for card markup; newlines become &#10; so the card stays on one line"""
+    code = str(value)
+    if len(code) > _CODE_LIMIT:
+        code = code[:_CODE_LIMIT] + "\n…"
+    return escape(code).replace("\n", "&#10;")
+
+def finding_card_html(finding: Dict[str, Any]) -> str:
+    """Card markup for one security finding; agent-supplied text is escaped"""
+    severity = finding.get('severity', 'LOW').upper()
+    code_snippet = finding.get('code_snippet')
+    code_html = ""
+    if code_snippet:
+        snippet = str(code_snippet)
+        inline = len(snippet) <= _INLINE_CODE_LIMIT and "\n" not in snippet
+        code_html = (_FINDING_CODE if inline else _FINDING_CODE_DETAILS).substitute(code=_code(snippet))
+    
+    return _FINDING_CARD.substitute(
+        css_class=SEVERITY_CLASSES.get(severity, "vulnerability-low"),
+        vulnerability_type=_esc(finding.get('vulnerability_type', 'Unknown Vulnerability')),
+        severity=_esc(severity),
+        description=_esc(finding.get('description', 'No description available')),
+        attack_scenario=_esc(finding.get('attack_scenario', 'No attack scenario provided')),
+        remediation=_esc(finding.get('remediation', 'No remediation provided')),
+        code_html=code_html
+    )
+
+# Past this many findings (or this much snippet text) the styled HTML cards get slow to render in
+# the browser, so findings fall back to native elements that skip the markdown pipeline
+_NATIVE_FINDINGS_THRESHOLD = 25
+_NATIVE_CODE_CHARS_THRESHOLD = 20000
+
+def is_large_result_set(findings: List[Dict[str, Any]]) -> bool:
+    if len(findings) > _NATIVE_FINDINGS_THRESHOLD:
+        return True
+    return sum(len(str(finding.get('code_snippet') or '')) for finding in findings) > _NATIVE_CODE_CHARS_THRESHOLD
+
+def render_findings_native(findings: List[Dict[str, Any]]):
+    """Plain-element rendering for large audits: text and code blocks instead of one big HTML blob"""
+    for finding in findings:
+        severity = finding.get('severity', 'LOW').upper()
+        with st.container(border=True):
+            st.subheader(f"🔥 {finding.get('vulnerability_type', 'Unknown Vulnerability')} [{severity}]")
+            st.text(f"Description: {finding.get('description', 'No description available')}")
+            st.text(f"Attack Scenario: {finding.get('attack_scenario', 'No attack scenario provided')}")
+            st.text(f"Remediation: {finding.get('remediation', 'No remediation provided')}")
+            if finding.get('code_snippet'):
+                snippet = str(finding['code_snippet'])
+                head, truncated = truncate_code(snippet)
+                st.code(head, language='solidity')
+                if truncated:
+                    with st.expander("Show full snippet"):
+                        st.code(snippet, language='solidity')
+
+# One C-level pass over the string instead of a Python call per character
+_NON_DIGITS = re.compile(r"\D")
+
+def parse_gas_savings(savings_raw: Any) -> int:
+    """Convert an estimated_gas_savings value to an integer safely with enhanced error handling"""
+    try:
+        if isinstance(savings_raw, str):
+            # Remove any non-digit characters except for digits
+            savings_str = _NON_DIGITS.sub('', savings_raw)
+            return int(savings_str) if savings_str else 0
+        elif isinstance(savings_raw, (int, float)):
+            return int(savings_raw)
+        elif savings_raw is None:
+            return 0
+        else:
+            # Handle any other unexpected types
+            savings_str = _NON_DIGITS.sub('', str(savings_raw))
+            return int(savings_str) if savings_str else 0
+    except (ValueError, TypeError) as e:
+        # Debug information for troubleshooting
+        st.error(f"Error converting gas savings: {savings_raw} (type: {type(savings_raw)}) - {str(e)}")
+        return 0
+
+def gas_card_html(optimization: Dict[str, Any], savings: int) -> str:
+    """Card markup for one gas optimization; agent-supplied text is escaped"""
+    original_code = optimization.get('original_code')
+    optimized_code = optimization.get('optimized_code')
+    
+    return _GAS_CARD.substitute(
+        optimization_type=_esc(optimization.get('optimization_type', 'Gas Optimization')),
+        description=_esc(optimization.get('description', 'No description available')),
+        savings=f"{savings:,}",
+        difficulty=_esc(optimization.get('implementation_difficulty', 'Medium')),
+        original_html=gas_code_html(_GAS_ORIGINAL_CODE, original_code) if original_code else "",
+        optimized_html=gas_code_html(_GAS_OPTIMIZED_CODE, optimized_code) if optimized_code else ""
+    )
+
+# Chart figures are cached on their inputs, so reruns that don't change the data skip plotly's
+# figure construction. pandas/plotly are imported on first use; most reruns never draw a chart
+SEVERITY_COLORS = {
+    'CRITICAL': '#dc2626',
+    'HIGH': '#f59e0b',
+    'MEDIUM': '#8b5cf6',
+    'LOW': '#3b82f6',
+    'INFORMATIONAL': '#6b7280'
+}
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def severity_chart(severity_counts: Tuple[Tuple[str, int], ...]):
+    """Bar chart of ((severity, count), ...) in the given order"""
+    import plotly.express as px
+    
+    severities = [severity for severity, _ in severity_counts]
+    return px.bar(
+        x=severities,
+        y=[count for _, count in severity_counts],
+        title="Vulnerability Distribution by Severity",
+        color=severities,
+        color_discrete_map=SEVERITY_COLORS
+    )
+
+_HISTORY_DTYPES = {
+    'contract_name': 'string[pyarrow]',
+    'contract_type': 'category',
+    'audit_scope': 'category',
+    'vulnerabilities_found': 'int32',
+    'gas_optimizations': 'int32',
+    'risk_score': 'float32'
+}
+
+def history_key(audit_history: Deque[Dict[str, Any]]) -> Tuple[int, Any]:
+    """Cache key for the history helpers: records are only ever appended, so the length and
+    the newest timestamp identify a history without hashing every record"""
+    return len(audit_history), audit_history[-1]['timestamp'] if audit_history else None
+
+# The history helpers take the deque unhashed (leading underscore) and are keyed by history_key
+@st.cache_data(max_entries=16, show_spinner=False)
+def history_frame(_audit_history: Deque[Dict[str, Any]], key: Tuple[int, Any]):
+    """The audit history as a DataFrame, so aggregates are vectorized pandas reductions"""
+    import pandas as pd
+    
+    df = pd.DataFrame(_audit_history)
+    # Compact, Arrow-native dtypes make the frame cheaper to hold and to serialize for the browser
+    return df.astype({column: dtype for column, dtype in _HISTORY_DTYPES.items() if column in df.columns})
+
+def recent_audits(audit_history: Deque[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """The last `count` audit records, without copying the rest of the history"""
+    return list(islice(audit_history, max(0, len(audit_history) - count), None))
+
+# Caps on what the history charts ship to the browser on every rerun
+_HISTORY_CHART_POINTS = 500
+_CONTRACT_TYPE_SLICES = 10
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def history_line_chart(_audit_history: Deque[Dict[str, Any]], key: Tuple[int, Any]):
+    """Vulnerabilities found per audit over time (the most recent _HISTORY_CHART_POINTS audits)"""
+    import pandas as pd
+    import plotly.express as px
+    
+    return px.line(
+        pd.DataFrame(recent_audits(_audit_history, _HISTORY_CHART_POINTS)),
+        x='timestamp',
+        y='vulnerabilities_found',
+        title="Vulnerabilities Found Over Time",
+        markers=True
+    )
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def contract_type_pie(contract_types: Tuple[Tuple[str, int], ...]):
+    """Pie of ((contract_type, audits), ...)"""
+    import plotly.express as px
+    
+    return px.pie(
+        values=[count for _, count in contract_types],
+        names=[contract_type for contract_type, _ in contract_types],
+        title="Audited Contract Types"
+    )
+
+def render_results_html(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything display_audit_results draws that depends only on the results: markup, counts and totals"""
+    # Agents often report the same issue more than once; only distinct findings get a card
+    findings = unique_findings(results.get('security_findings', []))
+    
+    # Summary metrics: the four cards go out as one grid element rather than four columns
+    stats = [
+        (len(findings), "Vulnerabilities Found"),
+        (len(results.get('gas_optimizations', [])), "Gas Optimizations"),
+        (f"{results.get('overall_risk_score', 0):.1f}/10", "Risk Score"),
+        (f"{results.get('audit_duration_seconds', 0):.1f}s", "Audit Time")
+    ]
+    rendered = {
+        'findings': findings,
+        'stats_html': '<div class="stats-grid">'
+                      + "".join(_STATS_CARD.substitute(value=value, label=label) for value, label in stats)
+                      + "</div>",
+        'findings_html': None,
+        'gas_html': None,
+        'insights_html': None
+    }
+    
+    if findings:
+        # One counting pass; the fixed key order keeps the chart's bars in severity order
+        counts = Counter(finding.get('severity', 'LOW').upper() for finding in findings)
+        rendered['severity_counts'] = tuple((severity, counts[severity]) for severity in SEVERITY_LEVELS)
+        if not is_large_result_set(findings):
+            # All cards go out in one markdown element instead of one per finding
+            rendered['findings_html'] = "".join(finding_card_html(finding) for finding in findings)
     
-    with col2:
-        st.markdown(f"""
-        <div class="stats-card">
-            <h3>{gas_optimizations}</h3>
-            <p>Gas Optimizations</p>
-        </div>
-        """, unsafe_allow_html=True)
+    if results.get('gas_optimizations'):
+        total_savings = 0
+        cards = []
+        for optimization in results['gas_optimizations']:
+            savings = parse_gas_savings(optimization.get('estimated_gas_savings', '0'))
+            total_savings += savings
+            cards.append(gas_card_html(optimization, savings))
+        rendered['gas_html'] = "".join(cards)
+        rendered['total_savings'] = total_savings
+    
+    insights = results.get('learning_insights')
+    if insights:
+        # Whole section goes out as one markdown element
+        parts = []
+        if insights.get('similar_contracts_analyzed'):
+            parts.append(f"<p class='insight-text'><strong class='insight-label'>📊 Similar Contracts Analyzed:</strong> {_esc(insights['similar_contracts_analyzed'])}</p>")
+        
+        if insights.get('common_vulnerabilities'):
+            parts.append("<p class='insight-label'>🎯 Common Vulnerability Patterns:</p>")
+            parts.append(bullet_list_html(insights['common_vulnerabilities']))
+        
+        if insights.get('gas_optimization_patterns'):
+            parts.append("<p class='insight-label'>⚡ Gas Optimization Patterns:</p>")
+            parts.append(bullet_list_html(insights['gas_optimization_patterns']))
+        
+        rendered['insights_html'] = "".join(parts)
     
-    with col3:
-        st.markdown(f"""
-        <div class="stats-card">
-            <h3>{overall_risk:.1f}/10</h3>
-            <p>Risk Score</p>
-        </div>
-        """, unsafe_allow_html=True)
+    return rendered
+
+# Fragments: the download button (and native-view expanders) rerun just the results panel
+@st.fragment
+def display_audit_results(results: Dict[str, Any], results_json: Optional[str] = None):
+    """Display audit results in a structured format; results_json is their pre-serialized form for the download"""
+    
+    # results_json identifies the results, so reruns reuse the markup built on the first render
+    cached = st.session_state.get('rendered_results')
+    if results_json is not None and cached and cached[0] == results_json:
+        rendered = cached[1]
+    else:
+        rendered = render_results_html(results)
+        if results_json is not None:
+            st.session_state.rendered_results = (results_json, rendered)
     
-    with col4:
-        audit_time = results.get('audit_duration_seconds', 0)
-        st.markdown(f"""
-        <div class="stats-card">
-            <h3>{audit_time:.1f}s</h3>
-            <p>Audit Time</p>
-        </div>
-        """, unsafe_allow_html=True)
+    st.subheader("🔍 Audit Results")
+    st.markdown(rendered['stats_html'], unsafe_allow_html=True)
     
     # Security Findings
-    if results.get('security_findings'):
+    if rendered['findings']:
         st.subheader("🚨 Security Findings")
         
-        severity_counts = {"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0, "INFORMATIONAL": 0}
-        
-        for finding in results['security_findings']:
-            severity = finding.get('severity', 'LOW').upper()
-            severity_counts[severity] += 1
-            
-            css_class = f"vulnerability-{severity.lower()}"
-            
-            st.markdown(f"""
-            <div class="{css_class}">
-                <h4>🔥 {finding.get('vulnerability_type', 'Unknown Vulnerability')} [{severity}]</h4>
-                <p><strong>Description:</strong> <span style="color: #0f172a; font-weight: 500;">{finding.get('description', 'No description available')}</span></p>
-                <p><strong>Attack Scenario:</strong> <span style="color: #0f172a; font-weight: 500;">{finding.get('attack_scenario', 'No attack scenario provided')}</span></p>
-                <p><strong>Remediation:</strong> <span style="color: #0f172a; font-weight: 500;">{finding.get('remediation', 'No remediation provided')}</span></p>
-                {f"<p><strong>Code:</strong> <code style='background-color: #f1f5f9; color: #1e293b; padding: 4px 8px; border-radius: 4px; border: 1px solid #cbd5e1;'>{finding.get('code_snippet', '')}</code></p>" if finding.get('code_snippet') else ""}
-            </div>
-            """, unsafe_allow_html=True)
+        if rendered['findings_html'] is None:
+            render_findings_native(rendered['findings'])
+        else:
+            st.markdown(rendered['findings_html'], unsafe_allow_html=True)
         
         # Severity distribution chart
-        if severity_counts:
-            fig = px.bar(
-                x=list(severity_counts.keys()),
-                y=list(severity_counts.values()),
-                title="Vulnerability Distribution by Severity",
-                color=list(severity_counts.keys()),
-                color_discrete_map={
-                    'CRITICAL': '#dc2626',
-                    'HIGH': '#f59e0b',
-                    'MEDIUM': '#8b5cf6',
-                    'LOW': '#3b82f6',
-                    'INFORMATIONAL': '#6b7280'
-                }
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(severity_chart(rendered['severity_counts']), use_container_width=True)
     
     # Gas Optimizations
-    if results.get('gas_optimizations'):
+    if rendered['gas_html'] is not None:
         st.subheader("⚡ Gas Optimizations")
-        
-        total_savings = 0
-        for optimization in results['gas_optimizations']:
-            savings_raw = optimization.get('estimated_gas_savings', '0')
-            
-            # Convert string to integer safely with enhanced error handling
-            try:
-                if isinstance(savings_raw, str):
-                    # Remove any non-digit characters except for digits
-                    savings_str = ''.join(filter(str.isdigit, savings_raw))
-                    savings = int(savings_str) if savings_str else 0
-                elif isinstance(savings_raw, (int, float)):
-                    savings = int(savings_raw)
-                elif savings_raw is None:
-                    savings = 0
-                else:
-                    # Handle any other unexpected types
-                    savings_str = ''.join(filter(str.isdigit, str(savings_raw)))
-                    savings = int(savings_str) if savings_str else 0
-            except (ValueError, TypeError) as e:
-                # Debug information for troubleshooting
-                st.error(f"Error converting gas savings: {savings_raw} (type: {type(savings_raw)}) - {str(e)}")
-                savings = 0
-            
-            total_savings += savings
-            
-            st.markdown(f"""
-            <div class="gas-optimization">
-                <h4>⚡ {optimization.get('optimization_type', 'Gas Optimization')}</h4>
-                <p><strong>Description:</strong> <span style="color: #0f172a; font-weight: 500;">{optimization.get('description', 'No description available')}</span></p>
-                <p><strong>Estimated Gas Savings:</strong> <span style="color: #059669; font-weight: 700; font-size: 1.1em;">{savings:,} gas units</span></p>
-                <p><strong>Difficulty:</strong> <span style="color: #0f172a; font-weight: 500;">{optimization.get('implementation_difficulty', 'Medium')}</span></p>
-                {f"<p><strong>Original Code:</strong> <code style='background-color: #fef2f2; color: #1e293b; padding: 8px 12px; border-radius: 6px; display: block; margin: 8px 0; border: 1px solid #fecaca; font-family: Consolas, Monaco, monospace;'>{optimization.get('original_code', '')}</code></p>" if optimization.get('original_code') else ""}
-                {f"<p><strong>Optimized Code:</strong> <code style='background-color: #f0fdf4; color: #1e293b; padding: 8px 12px; border-radius: 6px; display: block; margin: 8px 0; border: 1px solid #bbf7d0; font-family: Consolas, Monaco, monospace;'>{optimization.get('optimized_code', '')}</code></p>" if optimization.get('optimized_code') else ""}
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.info(f"💰 Total Estimated Gas Savings: {total_savings:,} gas units")
+        st.markdown(rendered['gas_html'], unsafe_allow_html=True)
+        st.info(f"💰 Total Estimated Gas Savings: {rendered['total_savings']:,} gas units")
     
     # Agent Learning Insights
-    if results.get('learning_insights'):
+    if rendered['insights_html'] is not None:
         st.subheader("🧠 Learning Insights")
-        insights = results['learning_insights']
-        
-        if insights.get('similar_contracts_analyzed'):
-            st.markdown(f"<p style='color: #1a1a1a;'><strong style='color: #1e3a8a;'>📊 Similar Contracts Analyzed:</strong> {insights['similar_contracts_analyzed']}</p>", unsafe_allow_html=True)
-        
-        if insights.get('common_vulnerabilities'):
-            st.markdown("<p style='color: #1e3a8a; font-weight: 600;'>🎯 Common Vulnerability Patterns:</p>", unsafe_allow_html=True)
-            for vuln in insights['common_vulnerabilities']:
-                st.markdown(f"<p style='color: #1a1a1a; margin-left: 20px;'>• {vuln}</p>", unsafe_allow_html=True)
-        
-        if insights.get('gas_optimization_patterns'):
-            st.markdown("<p style='color: #1e3a8a; font-weight: 600;'>⚡ Gas Optimization Patterns:</p>", unsafe_allow_html=True)
-            for pattern in insights['gas_optimization_patterns']:
-                st.markdown(f"<p style='color: #1a1a1a; margin-left: 20px;'>• {pattern}</p>", unsafe_allow_html=True)
-
-
-                
+        if rendered['insights_html']:
+            st.markdown(rendered['insights_html'], unsafe_allow_html=True)
+    
+    # Export reuses the JSON serialized when the audit finished instead of re-encoding on every rerun
+    st.download_button(
+        "📥 Download Results (JSON)",
+        results_json or dumps_json(results),
+        "zera_audit_results.json",
+        "application/json"
+    )
 
+@st.fragment
 def display_audit_history():
     """Display audit history and analytics"""
     st.subheader("📊 Audit History & Analytics")
@@ -1021,34 +616,143 @@ def display_audit_history():
         st.info("No audit history available yet. Run some audits to see analytics!")
         return
     
-    # Convert history to DataFrame
-    df = pd.DataFrame(st.session_state.audit_history)
+    # Convert history to DataFrame (cached until the history changes)
+    audit_history = st.session_state.audit_history
+    key = history_key(audit_history)
+    df = history_frame(audit_history, key)
     
     # Time series of audits
     if len(df) > 1:
-        fig = px.line(
-            df, 
-            x='timestamp', 
-            y='vulnerabilities_found',
-            title="Vulnerabilities Found Over Time",
-            markers=True
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(history_line_chart(audit_history, key), use_container_width=True)
     
     # Contract types analysis
     if 'contract_type' in df.columns:
-        contract_types = df['contract_type'].value_counts()
-        fig = px.pie(
-            values=contract_types.values,
-            names=contract_types.index,
-            title="Audited Contract Types"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(contract_type_pie(tuple(df['contract_type'].value_counts().nlargest(_CONTRACT_TYPE_SLICES).items())),
+                        use_container_width=True)
     
     # Recent audits table
     st.subheader("Recent Audits")
-    display_df = df[['contract_name', 'vulnerabilities_found', 'gas_optimizations', 'risk_score', 'timestamp']].tail(10)
-    st.dataframe(display_df, use_container_width=True)
+    columns = ('contract_name', 'vulnerabilities_found', 'gas_optimizations', 'risk_score', 'timestamp')
+    display_rows = [{column: record.get(column) for column in columns}
+                    for record in recent_audits(st.session_state.audit_history, 10)]
+    st.dataframe(display_rows, use_container_width=True)
+
+# Add session reset functionality in sidebar for troubleshooting
+# (placed after get_zera_system, whose cache it clears; it still runs before main() fills the sidebar)
+with st.sidebar:
+    st.markdown("---")
+    if st.button("🔄 Reset Session Data", help="Clear all cached audit results and history"):
+        st.session_state.audit_results = None
+        st.session_state.audit_results_json = None
+        st.session_state.pop('rendered_results', None)
+        st.session_state.audit_history = deque(maxlen=_AUDIT_HISTORY_LIMIT)
+        st.session_state.learning_insights = {}
+        if 'zera_system' in st.session_state:
+            del st.session_state.zera_system
+        get_zera_system.clear()
+        st.success("Session data cleared!")
+        st.rerun()
+
+async def gather_learning_data(learning_engine: ZeraLearningEngine) -> List[Any]:
+    """Stats and recent learnings are independent reads; overlap them on the reader pool"""
+    return await asyncio.gather(learning_engine.get_audit_statistics(), learning_engine.get_recent_learnings())
+
+# Cached per database and learning_version, so reruns of the Learning Engine page don't touch SQLite.
+# Retraining and finished audits bump the version; the ttl picks up other sessions' writes
+@st.cache_data(ttl=60, show_spinner=False)
+def learning_snapshot(_learning_engine: ZeraLearningEngine, db_path: str,
+                      version: int) -> Tuple[Optional[Dict[str, Any]], List[str], List[str]]:
+    """(audit statistics, recent vulnerability learnings, recent gas patterns)"""
+    stats, recent_learnings = run_async(gather_learning_data(_learning_engine))
+    return (
+        stats,
+        recent_learnings.get('common_vulnerabilities', []),
+        recent_learnings.get('gas_optimization_patterns', [])
+    )
+
+# A fragment: moving the sliders or retraining reruns only this panel, not the page's stats queries
+@st.fragment
+def learning_config_panel(learning_engine: Optional[ZeraLearningEngine]):
+    """Learning configuration controls and the retrain button"""
+    st.subheader("🔄 Learning Configuration")
+    col1, col2 = st.columns(2)
+    with col1:
+        learning_rate = st.slider("Learning Rate", 0.1, 1.0, 0.7)
+        pattern_threshold = st.slider("Pattern Recognition Threshold", 0.5, 0.95, 0.8)
+    with col2:
+        enable_auto_learning = st.checkbox("Enable Auto-Learning", True)
+        save_patterns = st.checkbox("Save New Patterns", True)
+    if st.button("🔄 Retrain Learning Models"):
+        with st.spinner("Retraining learning models..."):
+            if learning_engine:
+                # Fetch stats before retraining (over the engine's shared, long-lived connection pool)
+                before_count, before_acc = run_async(learning_engine.get_pattern_stats())
+                # Call backend retrain method with config values
+                retrain_result = run_async(
+                    learning_engine.retrain(
+                        learning_rate=learning_rate,
+                        pattern_threshold=pattern_threshold,
+                        enable_auto_learning=enable_auto_learning,
+                        save_patterns=save_patterns
+                    )
+                )
+                # Fetch stats after retraining
+                after_count, after_acc = run_async(learning_engine.get_pattern_stats())
+                # Show before/after stats
+                st.info(f"Patterns: {before_count} → {after_count}, Avg. Accuracy: {before_acc:.3f} → {after_acc:.3f}")
+                st.info(f"Retrain result: {retrain_result}")
+                st.session_state.learning_version += 1
+            st.success("✅ Learning models retrained!")
+
+# Example contracts for the audit page, defined once at import
+_CONTRACT_PLACEHOLDER = """pragma solidity ^0.8.0;
+
+contract Example {
+    mapping(address => uint256) public balances;
+    address public owner;
+    
+    constructor() {
+        owner = msg.sender;
+    }
+    
+    function transfer(address to, uint256 amount) public {
+        require(balances[msg.sender] >= amount, "Insufficient balance");
+        balances[msg.sender] -= amount;
+        balances[to] += amount;
+    }
+}"""
+
+_SAMPLE_CONTRACT = """pragma solidity ^0.8.0;
+
+contract VulnerableToken {
+    mapping(address => uint256) public balances;
+    address public owner;
+    uint256 public totalSupply;
+    
+    constructor() {
+        owner = msg.sender;
+        totalSupply = 1000000 * 10**18;
+        balances[owner] = totalSupply;
+    }
+    
+    function transfer(address to, uint256 amount) public {
+        require(balances[msg.sender] >= amount, "Insufficient balance");
+        balances[msg.sender] -= amount;
+        balances[to] += amount;
+    }
+    
+    function withdraw() public {
+        uint256 balance = balances[msg.sender];
+        (bool success, ) = msg.sender.call{value: balance}("");
+        require(success, "Transfer failed");
+        balances[msg.sender] = 0;
+    }
+    
+    function changeOwner(address newOwner) public {
+        require(tx.origin == owner, "Only owner");
+        owner = newOwner;
+    }
+}"""
 
 def main():
     """Main Streamlit application"""
@@ -1093,22 +797,7 @@ def main():
             contract_code = st.text_area(
                 "Smart Contract Code (Solidity)",
                 height=400,
-                placeholder="""pragma solidity ^0.8.0;
-
-contract Example {
-    mapping(address => uint256) public balances;
-    address public owner;
-    
-    constructor() {
-        owner = msg.sender;
-    }
-    
-    function transfer(address to, uint256 amount) public {
-        require(balances[msg.sender] >= amount, "Insufficient balance");
-        balances[msg.sender] -= amount;
-        balances[to] += amount;
-    }
-}""",
+                placeholder=_CONTRACT_PLACEHOLDER,
                 help="Paste your Solidity smart contract code here"
             )
         
@@ -1126,8 +815,8 @@ contract Example {
             for agent in agents:
                 st.markdown(f"""
                 <div class="agent-card">
-                    <strong style="color: #1e293b; font-weight: 700;">{agent}</strong><br>
-                    <span style="color: #059669; font-weight: 700; font-size: 0.9em;">● Ready</span>
+                    <strong class="agent-name">{agent}</strong><br>
+                    <span class="agent-ready">● Ready</span>
                 </div>
                 """, unsafe_allow_html=True)
             
@@ -1147,35 +836,28 @@ contract Example {
                     st.error("Please enter smart contract code to audit!")
                 else:
                     with st.spinner("🔍 Running comprehensive security audit..."):
-                        # Progress bar
+                        # Progress bar, advanced as each agent actually finishes
                         progress_bar = st.progress(0)
                         status_text = st.empty()
+                        status_text.text("Initializing agents and analyzing contract...")
                         
-                        # Simulate audit steps
-                        steps = [
-                            "Initializing agents...",
-                            "Analyzing contract structure...", 
-                            "Detecting vulnerabilities...",
-                            "Optimizing gas usage...",
-                            "Learning from patterns...",
-                            "Generating report..."
-                        ]
+                        def on_progress(fraction: float, label: str):
+                            progress_bar.progress(fraction)
+                            status_text.text(label)
                         
-                        for i, step in enumerate(steps):
-                            status_text.text(step)
-                            progress_bar.progress((i + 1) / len(steps))
-                            time.sleep(0.5)
-                        
-                        # Run actual audit
+                        # Run actual audit, previewing each agent's cards as soon as it finishes
+                        sec_ph, gas_ph = st.empty(), st.empty()
                         try:
                             # First try the real audit
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            results = loop.run_until_complete(
-                                run_audit(contract_code, contract_name, audit_scope)
-                            )
+                            results = stream_audit(contract_code, contract_name, audit_scope, sec_ph, gas_ph, on_progress)
+                            
+                            # The full results are rendered below; drop the previews
+                            sec_ph.empty()
+                            gas_ph.empty()
                             
                             st.session_state.audit_results = results
+                            st.session_state.audit_results_json = dumps_json(results)
+                            st.session_state.learning_version += 1
                             
                             # Add to history
                             audit_record = {
@@ -1203,6 +885,7 @@ contract Example {
                                 status_text.text("🔄 Switching to demo mode...")
                                 results = create_demo_results(contract_code, contract_name)
                                 st.session_state.audit_results = results
+                                st.session_state.audit_results_json = dumps_json(results)
                                 
                                 # Add to history
                                 audit_record = {
@@ -1244,51 +927,20 @@ contract Example {
         
         with col2:
             if st.button("📋 Sample Contract", use_container_width=True):
-                sample_contract = """pragma solidity ^0.8.0;
-
-contract VulnerableToken {
-    mapping(address => uint256) public balances;
-    address public owner;
-    uint256 public totalSupply;
-    
-    constructor() {
-        owner = msg.sender;
-        totalSupply = 1000000 * 10**18;
-        balances[owner] = totalSupply;
-    }
-    
-    function transfer(address to, uint256 amount) public {
-        require(balances[msg.sender] >= amount, "Insufficient balance");
-        balances[msg.sender] -= amount;
-        balances[to] += amount;
-    }
-    
-    function withdraw() public {
-        uint256 balance = balances[msg.sender];
-        (bool success, ) = msg.sender.call{value: balance}("");
-        require(success, "Transfer failed");
-        balances[msg.sender] = 0;
-    }
-    
-    function changeOwner(address newOwner) public {
-        require(tx.origin == owner, "Only owner");
-        owner = newOwner;
-    }
-}"""
-                st.text_area("Sample Contract", value=sample_contract, height=200, key="sample")
+                st.text_area("Sample Contract", value=_SAMPLE_CONTRACT, height=200, key="sample")
         
         with col3:
             st.markdown("### 📊 Quick Stats")
             if st.session_state.audit_history:
-                total_audits = len(st.session_state.audit_history)
-                avg_vulns = sum(a['vulnerabilities_found'] for a in st.session_state.audit_history) / total_audits
-                st.metric("Total Audits", total_audits)
-                st.metric("Avg. Vulnerabilities", f"{avg_vulns:.1f}")
+                audit_history = st.session_state.audit_history
+                history_df = history_frame(audit_history, history_key(audit_history))
+                st.metric("Total Audits", len(history_df))
+                st.metric("Avg. Vulnerabilities", f"{history_df['vulnerabilities_found'].mean():.1f}")
         
         # Display results
         if st.session_state.audit_results:
             st.markdown("---")
-            display_audit_results(st.session_state.audit_results)
+            display_audit_results(st.session_state.audit_results, st.session_state.audit_results_json)
     
     elif page == "📊 Analytics":
         display_audit_history()
@@ -1298,18 +950,12 @@ contract VulnerableToken {
         zera_system = initialize_zera_system()
         learning_engine = zera_system['learning_engine'] if zera_system else None
         # Removed redundant database initialization
-        def fetch_learning_stats_sync():
-            return asyncio.run(learning_engine.get_audit_statistics()) if learning_engine else None
-        def fetch_recent_learnings_sync():
-            # Fetch recent learnings directly from the database using the backend
-            if learning_engine:
-                recent_learnings = asyncio.run(learning_engine.get_recent_learnings())
-                recent_vulns = recent_learnings.get('common_vulnerabilities', [])
-                recent_gas_patterns = recent_learnings.get('gas_optimization_patterns', [])
-                return recent_vulns, recent_gas_patterns
-            return [], []
-        stats = fetch_learning_stats_sync()
-        recent_vulns, recent_gas_patterns = fetch_recent_learnings_sync()
+        if learning_engine:
+            stats, recent_vulns, recent_gas_patterns = learning_snapshot(
+                learning_engine, learning_engine.db_path, st.session_state.learning_version
+            )
+        else:
+            stats, recent_vulns, recent_gas_patterns = None, [], []
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("📈 Learning Statistics")
@@ -1323,53 +969,20 @@ contract VulnerableToken {
         with col2:
             st.subheader("🎯 Recent Learnings")
             if recent_vulns:
-                st.markdown("<strong>Common Vulnerabilities:</strong>", unsafe_allow_html=True)
-                for learning in recent_vulns:
-                    st.markdown(f"<p style='color: #1a1a1a;'>• {learning}</p>", unsafe_allow_html=True)
+                st.markdown(
+                    "<strong>Common Vulnerabilities:</strong>"
+                    + bullet_list_html(recent_vulns),
+                    unsafe_allow_html=True
+                )
             if recent_gas_patterns:
-                st.markdown("<strong>Gas Optimization Patterns:</strong>", unsafe_allow_html=True)
-                for pattern in recent_gas_patterns:
-                    st.markdown(f"<p style='color: #1a1a1a;'>• {pattern}</p>", unsafe_allow_html=True)
+                st.markdown(
+                    "<strong>Gas Optimization Patterns:</strong>"
+                    + bullet_list_html(recent_gas_patterns),
+                    unsafe_allow_html=True
+                )
             if not recent_vulns and not recent_gas_patterns:
                 st.info("No recent learnings available yet.")
-        st.subheader("🔄 Learning Configuration")
-        col1, col2 = st.columns(2)
-        with col1:
-            learning_rate = st.slider("Learning Rate", 0.1, 1.0, 0.7)
-            pattern_threshold = st.slider("Pattern Recognition Threshold", 0.5, 0.95, 0.8)
-        with col2:
-            enable_auto_learning = st.checkbox("Enable Auto-Learning", True)
-            save_patterns = st.checkbox("Save New Patterns", True)
-        if st.button("🔄 Retrain Learning Models"):
-            with st.spinner("Retraining learning models and refreshing stats..."):
-                if learning_engine:
-                    # Fetch stats before retraining
-                    async def get_pattern_stats():
-                        async with aiosqlite.connect(learning_engine.db_path) as db:
-                            cursor = await db.execute("SELECT COUNT(*), AVG(detection_accuracy) FROM contract_patterns")
-                            count, avg_acc = await cursor.fetchone()
-                            return count, avg_acc
-                    before_count, before_acc = asyncio.run(get_pattern_stats())
-                    # Call backend retrain method with config values
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    retrain_result = loop.run_until_complete(
-                        learning_engine.retrain(
-                            learning_rate=learning_rate,
-                            pattern_threshold=pattern_threshold,
-                            enable_auto_learning=enable_auto_learning,
-                            save_patterns=save_patterns
-                        )
-                    )
-                    # Fetch stats after retraining
-                    after_count, after_acc = asyncio.run(get_pattern_stats())
-                    # Show before/after stats
-                    st.info(f"Patterns: {before_count} → {after_count}, Avg. Accuracy: {before_acc:.3f} → {after_acc:.3f}")
-                    st.info(f"Retrain result: {retrain_result}")
-                    # Refresh stats and recent learnings after retraining
-                    stats = asyncio.run(learning_engine.get_audit_statistics())
-                    recent_vulns, recent_gas_patterns = fetch_recent_learnings_sync()
-                st.success("✅ Learning models retrained and stats refreshed!")
+        learning_config_panel(learning_engine)
     
     elif page == "⚙️ Settings":
         st.header("System Configuration")
@@ -1420,7 +1033,7 @@ contract VulnerableToken {
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🧹 Clear Audit History"):
-                st.session_state.audit_history = []
+                st.session_state.audit_history = deque(maxlen=_AUDIT_HISTORY_LIMIT)
                 st.success("Audit history cleared!")
         
         with col2:
@@ -1442,7 +1055,7 @@ contract VulnerableToken {
     # Footer
     st.markdown("---")
     st.markdown(
-        "<p style='text-align: center; color: #1e3a8a; font-weight: 600;'>"
+        "<p class='app-footer'>"
         "🔒 <strong>ZERA AI</strong> - Advanced Smart Contract Security Auditing System | "
         "Built with ❤️ for Web3 Security</p>", 
         unsafe_allow_html=True
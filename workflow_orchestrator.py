@@ -1,93 +1,49 @@
 from iointel import Workflow
 from agents_manager import AgentManager
-from typing import Dict, Any
+from learning_engine import contract_digest, loads_json
+from collections import Counter, OrderedDict
+from typing import AsyncIterator, Callable, Dict, Any, Iterable, List, Optional, Tuple
 import asyncio
+import logging
+import random
 import re
+import threading
 import time
 
-class WorkflowOrchestrator:
-    def __init__(self, agent_manager: AgentManager, settings):
-        self.agent_manager = agent_manager
-        self.settings = settings
-    
-    async def run_data_analysis_pipeline(self, objective: str) -> Dict[str, Any]:
-        """Run complete data analysis pipeline"""
-        
-        # Create workflow
-        workflow = Workflow(objective=objective, client_mode=False)
-        
-        # Step 1: Data preprocessing and analysis
-        analysis_result = await workflow.custom(
-            name="data_analysis",
-            objective=f"Analyze the data for: {objective}",
-            instructions="Perform comprehensive data analysis including statistical summaries, trend analysis, and key insights identification.",
-            agents=[self.agent_manager.get_agent("analyst")]
-        ).run_tasks()
-        
-        # Step 2: Generate report
-        report_result = await workflow.custom(
-            name="report_generation",
-            objective=f"Create executive report based on analysis: {analysis_result.result}",
-            instructions="Create a professional executive report with visualizations, key findings, and actionable recommendations.",
-            agents=[self.agent_manager.get_agent("writer")]
-        ).run_tasks()
-        
-        # Step 3: Quality review and coordination
-        final_result = await workflow.custom(
-            name="quality_review",
-            objective=f"Review and finalize the report: {report_result.result}",
-            instructions="Review the report for quality, completeness, and accuracy. Provide final recommendations.",
-            agents=[self.agent_manager.get_agent("coordinator")]
-        ).run_tasks()
-        
-        return {
-            "analysis": analysis_result.result,
-            "report": report_result.result,
-            "final_output": final_result.result,
-            "status": "completed"
-        }
-    
-    async def run_collaborative_task(self, task_description: str) -> Dict[str, Any]:
-        """Run collaborative task across multiple agents"""
-        
-        # Step 1: Coordinator creates plan
-        coordinator = self.agent_manager.get_agent("coordinator")
-        plan = await coordinator.run(f"Create a detailed execution plan for: {task_description}")
-        
-        # Step 2: Analyst processes data
-        analyst = self.agent_manager.get_agent("analyst")
-        analysis = await analyst.run(f"Execute analysis phase of plan: {plan.result}")
-        
-        # Step 3: Writer creates deliverable
-        writer = self.agent_manager.get_agent("writer")
-        deliverable = await writer.run(f"Create deliverable based on analysis: {analysis.result}")
-        
-        # Step 4: Coordinator reviews and finalizes
-        final_review = await coordinator.run(f"Review and finalize deliverable: {deliverable.result}")
-        
-        return {
-            "plan": plan.result,
-            "analysis": analysis.result,
-            "deliverable": deliverable.result,
-            "final_output": final_review.result
-        }
+logger = logging.getLogger(__name__)
 
-    async def run_security_audit_pipeline(self, contract_code: str, contract_name: str, audit_scope: str) -> Dict[str, Any]:
-        """Run comprehensive smart contract security audit pipeline"""
-        
-        # Get the security auditor agent directly
-        security_agent = self.agent_manager.get_agent("security_auditor")
-        
-        # Create detailed security analysis prompt
-        security_prompt = f"""COMPREHENSIVE SMART CONTRACT SECURITY AUDIT
-        
-Contract: {contract_name}
-Scope: {audit_scope}
+# Agent responses are reused for the same (agent, instructions, prompt) for a while, so
+# re-auditing an unchanged contract skips the LLM round-trip entirely
+_RESPONSE_CACHE_TTL = 600  # seconds
+_RESPONSE_CACHE_SIZE = 64
 
-CONTRACT CODE:
-{contract_code}
+# Agent calls in flight per event loop (first tries and retries alike), shared by every orchestrator
+# on it, so concurrent audits and sessions don't pile onto a struggling API
+_MAX_CONCURRENT_AGENT_CALLS = 4
+# asyncio semaphores are bound to one loop, so each loop gets its own, created on first use
+_agent_call_sems: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+def _agent_call_limiter() -> asyncio.Semaphore:
+    """The shared agent-call semaphore for the running event loop"""
+    loop = asyncio.get_running_loop()
+    sem = _agent_call_sems.get(loop)
+    if sem is None:
+        # Drop the semaphores of loops that have since closed (e.g. finished asyncio.run calls)
+        for stale in [other for other in list(_agent_call_sems) if other.is_closed()]:
+            _agent_call_sems.pop(stale, None)
+        sem = _agent_call_sems[loop] = asyncio.Semaphore(_MAX_CONCURRENT_AGENT_CALLS)
+    return sem
+
+# Batched audits pack several contracts into one call per agent; the limits keep the prompt and
+# the per-contract answers inside the model's context window
+_AUDIT_BATCH_SIZE = 4
+_AUDIT_BATCH_CHARS = 40_000  # contract code per batch, roughly 10k tokens
 
-INSTRUCTIONS: Perform a COMPREHENSIVE security analysis. You MUST identify ALL vulnerabilities present in this contract. Do not limit yourself to obvious issues - examine every line for potential security risks.
+# Audit prompt scaffolding. It is identical for every contract, so the prompts put it ahead
+# of the contract-specific tail
+SECURITY_AUDIT_INSTRUCTIONS = """COMPREHENSIVE SMART CONTRACT SECURITY AUDIT
+
+INSTRUCTIONS: Perform a COMPREHENSIVE security analysis. You MUST identify ALL vulnerabilities present in the contract below. Do not limit yourself to obvious issues - examine every line for potential security risks.
 
 🔍 MANDATORY VULNERABILITY CATEGORIES TO ANALYZE:
 
@@ -174,36 +130,11 @@ INSTRUCTIONS: Perform a COMPREHENSIVE security analysis. You MUST identify ALL v
 - Provide realistic attack scenarios
 - Suggest specific remediation steps
 
-Be thorough and comprehensive. This contract contains multiple vulnerabilities - find them ALL."""
-        
-        # Call agent directly
-        security_response = await self._run_agent_with_retry(security_agent, security_prompt)
-        
-        # Extract content from agent response
-        security_content = security_response.result if hasattr(security_response, 'result') else str(security_response)
-        
-        return {
-            "contract_name": contract_name,
-            "audit_scope": audit_scope,
-            "security_findings": security_content,
-            "status": "completed"
-        }
+Be thorough and comprehensive. The contract contains multiple vulnerabilities - find them ALL."""
 
-    async def run_gas_optimization_pipeline(self, contract_code: str, contract_name: str) -> Dict[str, Any]:
-        """Run gas optimization analysis pipeline"""
-        
-        # Get the gas optimizer agent directly
-        gas_agent = self.agent_manager.get_agent("gas_optimizer")
-        
-        # Create detailed gas optimization prompt
-        gas_prompt = f"""GAS OPTIMIZATION ANALYSIS
-        
-Contract: {contract_name}
-
-CONTRACT CODE:
-{contract_code}
+GAS_OPTIMIZATION_INSTRUCTIONS = """GAS OPTIMIZATION ANALYSIS
 
-Perform comprehensive gas optimization analysis. Identify ALL gas inefficiencies:
+Perform comprehensive gas optimization analysis of the contract below. Identify ALL gas inefficiencies:
 
 ⚡ GAS OPTIMIZATION CATEGORIES:
 1. Storage layout optimization (variable packing)
@@ -238,6 +169,543 @@ Perform comprehensive gas optimization analysis. Identify ALL gas inefficiencies
 - Low: <500 gas savings, complex implementation
 
 Be thorough in finding ALL optimization opportunities."""
+
+BATCH_AUDIT_INSTRUCTIONS = """BATCH MODE: several contracts follow, each between a <<<CONTRACT id=N name=... scope=...>>> line and a <<<END>>> line. Analyze each contract independently, exactly as instructed above.
+
+Respond with ONLY a JSON array holding one object per contract, in this shape:
+[{"id": 0, "analysis": "<your full markdown analysis of contract 0>"}, {"id": 1, "analysis": "..."}]"""
+
+# Security-parser patterns, compiled once at import instead of on every section
+_VULN_SECTION_PATTERNS = tuple(re.compile(pattern, re.DOTALL | re.MULTILINE | re.IGNORECASE) for pattern in (
+    r'(?:^|\n)#{1,6}\s*(\d+)\.\s*([^\n]*(?:vulnerability|finding|issue|attack|exploit|risk)[^\n]*)\s*\n(.*?)(?=(?:^|\n)#{1,6}\s*\d+\.|$)',
+    r'(?:^|\n)(\d+)\.\s*\*\*([^\*]*(?:vulnerability|finding|issue|attack|exploit|risk)[^\*]*)\*\*\s*\n(.*?)(?=(?:^|\n)\d+\.|$)',
+    r'(?:^|\n)\*\*(\d+)\.\s*([^\*]*(?:vulnerability|finding|issue|attack|exploit|risk)[^\*]*)\*\*\s*\n(.*?)(?=(?:^|\n)\*\*\d+\.|$)'
+))
+
+# hyperscan is optional; when installed, one linear DFA scan tells which of the section-header
+# styles above occur at all, so the backtracking section patterns only run where they can match.
+# The header patterns are supersets of the section patterns' headers (same order, same ids)
+try:
+    import hyperscan
+    _SECTION_HEADER_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _SECTION_HEADER_DB.compile(
+        expressions=[
+            rb'^#{1,6}\s*\d+\.\s*[^\n]*(?:vulnerability|finding|issue|attack|exploit|risk)',
+            rb'^\d+\.\s*\*\*[^*]*(?:vulnerability|finding|issue|attack|exploit|risk)',
+            rb'^\*\*\d+\.\s*[^*]*(?:vulnerability|finding|issue|attack|exploit|risk)'
+        ],
+        ids=list(range(len(_VULN_SECTION_PATTERNS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH
+               | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP] * len(_VULN_SECTION_PATTERNS)
+    )
+except ImportError:
+    _SECTION_HEADER_DB = None
+
+# Scratch space can't be shared between concurrent scans; parsing runs in worker threads
+_hs_local = threading.local()
+
+def _section_patterns_for(text: str) -> Tuple[Any, ...]:
+    """The section patterns worth running on text (all of them without hyperscan)"""
+    if _SECTION_HEADER_DB is None:
+        return _VULN_SECTION_PATTERNS
+    try:
+        scratch = getattr(_hs_local, "scratch", None)
+        if scratch is None:
+            scratch = _hs_local.scratch = hyperscan.Scratch(_SECTION_HEADER_DB)
+        found = set()
+        _SECTION_HEADER_DB.scan(text.encode(), match_event_handler=lambda pattern_id, *_: found.add(pattern_id),
+                                scratch=scratch)
+    except Exception:
+        return _VULN_SECTION_PATTERNS
+    return tuple(pattern for pattern_id, pattern in enumerate(_VULN_SECTION_PATTERNS) if pattern_id in found)
+
+# pyahocorasick is optional; when installed, each keyword list becomes one automaton, so a lookup
+# is a single pass over the (already lowercased) text instead of one substring search per keyword
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def _keyword_matcher(keywords: Iterable[str]) -> Callable[[str], bool]:
+    """Predicate for any(keyword in text for keyword in keywords)"""
+    keywords = tuple(keywords)
+    if ahocorasick is None:
+        return lambda text: any(keyword in text for keyword in keywords)
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+_has_security_section_keyword = _keyword_matcher((
+    'reentrancy', 'access control', 'integer overflow', 'underflow',
+    'unchecked call', 'tx.origin', 'timestamp', 'front running',
+    'dos attack', 'denial of service', 'delegatecall', 'proxy',
+    'flash loan', 'oracle manipulation', 'storage collision',
+    'uninitialized', 'privilege escalation', 'authorization',
+    'authentication', 'input validation', 'state manipulation'
+))
+_has_critical_wording = _keyword_matcher(('critical', 'lose funds', 'total loss', 'drain'))
+_has_high_wording = _keyword_matcher(('high risk', 'significant', 'major impact'))
+_has_medium_wording = _keyword_matcher(('medium', 'moderate', 'limited impact'))
+_has_low_wording = _keyword_matcher(('low risk', 'minor', 'informational'))
+_has_description_wording = _keyword_matcher(('vulnerability', 'allows', 'enables', 'causes', 'risk'))
+_has_attack_wording = _keyword_matcher(('attacker', 'exploit', 'malicious', 'can call', 'manipulate'))
+_has_security_keyword = _keyword_matcher((
+    'vulnerability', 'security', 'attack', 'exploit', 'risk', 'unsafe',
+    'malicious', 'reentrancy', 'overflow', 'underflow', 'access control'
+))
+# Gas wording shared by the paragraph fallback and the gas validator
+_GAS_KEYWORDS = (
+    'gas', 'optimization', 'optimize', 'efficient', 'cheaper', 'save',
+    'reduce', 'packing', 'storage', 'memory', 'external',
+    'public', 'loop', 'increment', 'constant', 'immutable',
+    'cost', 'expensive', 'consumption', 'usage', 'assembly',
+    'uint256', 'uint', 'bytes32', 'mapping', 'struct', 'array',
+    'error', 'require'
+)
+_has_gas_keyword = _keyword_matcher(_GAS_KEYWORDS)
+# The validator also accepts descriptions that only talk about calls/visibility
+_has_gas_validation_keyword = _keyword_matcher(_GAS_KEYWORDS + ('call', 'function', 'visibility'))
+_has_template_phrase = _keyword_matcher((
+    'provide', 'include', 'example',
+    'template', 'guidelines', 'instructions', 'format',
+    'structure', 'should contain', 'must include',
+    'for each vulnerability found'
+))
+
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+# Markdown/numbering noise around a vulnerability title; digits and dots only go at the front,
+# so titles like "ERC20" keep their trailing number
+_TITLE_LEAD_CHARS = "*-#.0123456789 \t\n\r\x0b\x0c"
+_TITLE_TAIL_CHARS = "*-# \t\n\r\x0b\x0c"
+_VULN_TYPE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(?:vulnerability\s+type|type|category)[:\s]*([^\n]+)',
+    r'\*\*\s*([^*\n]+(?:vulnerability|attack|issue))\s*\*\*',
+    r'(?:^|\n)([^:\n]*(?:reentrancy|overflow|underflow|access control|dos|front.?running|flash loan)[^:\n]*?)(?:\n|:)',
+))
+_VULN_NAME_PATTERNS = tuple((re.compile(pattern, re.IGNORECASE), vuln_name) for pattern, vuln_name in (
+    (r'reentranc[yi]', 'Reentrancy Vulnerability'),
+    (r'integer\s+overflow', 'Integer Overflow'),
+    (r'integer\s+underflow', 'Integer Underflow'),
+    (r'access\s+control', 'Access Control Vulnerability'),
+    (r'unchecked.*call', 'Unchecked External Call'),
+    (r'tx\.origin', 'tx.origin Authentication Bypass'),
+    (r'timestamp.*depend', 'Timestamp Dependency'),
+    (r'front.?running', 'Front-running Vulnerability'),
+    (r'flash\s+loan', 'Flash Loan Attack'),
+    (r'dos|denial.*service', 'Denial of Service'),
+))
+_SEVERITY_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'severity[:\s]*([a-zA-Z]+)',
+    r'\*\*\s*severity\s*\*\*[:\s]*([a-zA-Z]+)',
+))
+_DESCRIPTION_RE = re.compile(r'(?:description|summary|issue|problem)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)', re.IGNORECASE | re.DOTALL)
+_ATTACK_SCENARIO_RE = re.compile(r'(?:attack\s+scenario|scenario|exploit\s+path)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)', re.IGNORECASE | re.DOTALL)
+_REMEDIATION_RE = re.compile(r'(?:remediation|fix|solution|mitigation)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)', re.IGNORECASE | re.DOTALL)
+_VULN_CODE_PATTERNS = tuple(re.compile(pattern, re.DOTALL) for pattern in (
+    r'```(?:solidity)?\s*([^`]+?)```',
+    r'`([^`\n]{15,})`',
+))
+_LOCATION_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(?:line|lines?)[:\s]*(\d+(?:\s*-\s*\d+)?)',
+    r'(?:function|method)[:\s]*([a-zA-Z_][a-zA-Z0-9_]*)',
+))
+# Solidity indicator words. Plain substring checks rule most prose out cheaply; the regex (one
+# group per word) then confirms whole-word hits, counting which distinct groups occur
+_SOLIDITY_TOKENS = (
+    'function', 'contract', 'mapping', 'uint', 'address', 'bool',
+    'public', 'private', 'external', 'internal', 'require', 'revert'
+)
+_SOLIDITY_INDICATOR_RE = re.compile(
+    r'\b(?:(function)|(contract)|(mapping)|(uint\d*)|(address)|(bool)|(public)|(private)'
+    r'|(external)|(internal)|(require)|(revert))\b',
+    re.IGNORECASE
+)
+_METADATA_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'conversation_id[:\s]*[a-zA-Z0-9\-_]+',
+    r'request_id[:\s]*[a-zA-Z0-9\-_]+',
+))
+
+# Gas-parser patterns, compiled once at import like the security ones above
+# The description is taken from at most this much of one gas section; the labelled fields
+# (type, savings, difficulty) and code examples can sit anywhere, so they scan all of it
+_GAS_SECTION_SCAN_CHARS = 4096
+# Gas section styles as (header, boundary) pairs: the header regex matches one section header and
+# captures its title, the boundary regex marks where the section body ends (next header or end of
+# text). Scanning headers and then searching once for the boundary keeps each pass linear, instead
+# of a lazy DOTALL body re-testing a lookahead at every character.
+_GAS_SECTION_STYLES = tuple(
+    (re.compile(header, re.DOTALL | re.MULTILINE | re.IGNORECASE), re.compile(boundary, re.DOTALL | re.MULTILINE | re.IGNORECASE))
+    for header, boundary in (
+        # Numbered optimizations with headers
+        (r'(?:^|\n)#{1,6}\s*(\d+)\.\s*([^\n]*)\s*\n', r'(?:^|\n)#{1,6}\s*\d+\.'),
+        # Bold numbered optimizations
+        (r'(?:^|\n)(\d+)\.\s*\*\*([^\*]*)\*\*\s*\n', r'(?:^|\n)\d+\.'),
+        # Simple numbered optimizations
+        (r'(?:^|\n)(\d+)\.\s*([^\n]*)\n', r'(?:^|\n)\d+\.'),
+        # Bold optimization headers without numbers
+        (r'(?:^|\n)\*\*([^\*]*)\*\*\s*\n', r'(?:^|\n)\*\*[^\*]*(?:optimization|packing|efficiency|gas)'),
+    )
+)
+# A section only counts when its title names one of these
+_has_gas_title_keyword = _keyword_matcher((
+    'optimization', 'packing', 'efficiency', 'gas', 'save', 'reduce', 'cheaper', 'external',
+    'public', 'loop', 'storage', 'memory', 'constant', 'immutable', 'error'
+))
+_GAS_PARAGRAPH_SPLIT_PATTERNS = (
+    _PARAGRAPH_SPLIT_RE,  # Double newlines
+    re.compile(r'(?:^|\n)(?=\d+\.)'),  # Before numbered items
+    re.compile(r'(?:^|\n)(?=\*\*[^*]*(?:optimization|gas|save|reduce|efficient))'),  # Before bold optimization headers
+)
+# Whole lines mentioning gas work; last-resort optimization description
+_GAS_LINE_RE = re.compile(r'^.*(?:gas|optimization|efficient|save|reduce).*$', re.MULTILINE | re.IGNORECASE)
+_OPT_TYPE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(?:optimization\s+type|type|category)[:\s]*([^\n]+)',
+    r'\*\*\s*([^*\n]+(?:optimization|packing|efficiency|gas|save|reduce))\s*\*\*',
+    r'(?:^|\n)#{1,6}\s*([^#\n]*(?:optimization|packing|efficiency|gas|save|reduce)[^#\n]*)(?:\n|$)',
+    r'(?:^|\n)(\d+\.\s*[^:\n]*(?:optimization|packing|efficiency|gas|save|reduce)[^:\n]*?)(?:\n|:)',
+))
+_OPT_NAME_PATTERNS = tuple((re.compile(pattern), opt_name) for pattern, opt_name in (
+    (r'storage.*pack', 'Storage Packing Optimization'),
+    (r'memory.*cach', 'Memory Caching Optimization'),
+    (r'loop.*optim', 'Loop Optimization'),
+    (r'external.*public', 'External vs Public Optimization'),
+    (r'public.*external', 'Function Visibility Optimization'),
+    (r'custom.*error', 'Custom Error Optimization'),
+    (r'require.*revert', 'Error Handling Optimization'),
+    (r'\+\+i.*i\+\+', 'Increment Optimization'),
+    (r'i\+\+.*\+\+i', 'Pre-increment Optimization'),
+    (r'constant.*immutable', 'Variable Declaration Optimization'),
+    (r'immutable.*constant', 'State Variable Optimization'),
+    (r'uint256.*uint', 'Type Optimization'),
+    (r'bytes32.*string', 'Data Type Optimization'),
+    (r'mapping.*array', 'Data Structure Optimization'),
+    (r'assembly.*inline', 'Assembly Optimization'),
+    (r'gas.*limit', 'Gas Limit Optimization'),
+    (r'storage.*read', 'Storage Access Optimization'),
+    (r'storage.*write', 'Storage Write Optimization'),
+    (r'function.*visibility', 'Function Visibility Optimization'),
+    (r'struct.*pack', 'Struct Packing Optimization'),
+    (r'array.*length', 'Array Length Optimization'),
+    (r'zero.*value', 'Zero Value Optimization'),
+))
+# Description spans as (start, end) pairs: the text after the start match up to the next end match
+_OPT_DESCRIPTION_SPANS = tuple(
+    (re.compile(start, re.IGNORECASE | re.DOTALL), re.compile(end, re.IGNORECASE | re.DOTALL))
+    for start, end in (
+        (r'(?:description|summary|issue|inefficiency|problem)[:\s]*', r'\n\s*\*\*'),
+        (r'(?:current\s+code|original\s+code|before)[:\s]*[^\n]*\n', r'optimized|after|solution|fix|\n\s*\*\*'),
+        # First line (up to a colon) that talks about gas
+        (r'(?:^|\n)(?=[^:\n]*(?:gas|inefficient|optimize|reduce|save|expensive|cost)[^:\n]*[:\n])', r'[:\n]'),
+    )
+)
+# Savings/range/difficulty patterns run on the already-lowercased section, so no IGNORECASE
+_GAS_SAVINGS_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(?:estimated\s+)?gas\s+savings?[:\s]*(\d+)',
+    r'(?:saves?|reduction)[:\s]*(\d+)\s*gas',
+    r'(\d+)\s*gas.*?(?:saved|reduction|less)',
+    r'(\d+)\s*gas\s+(?:per|units)',  # "1200 gas per iteration", "15000 gas units"
+    r'saves?\s+approximately\s+(\d+)\s*gas',  # "saves approximately 1200 gas"
+    r'estimated\s+savings?[:\s]*(\d+)',  # "Estimated savings: 2000"
+    r'gas[:\s]*(\d+)\s*units',  # "Gas: 15000 units"
+    r'(\d+)\s*(?:gas\s+)?units\s+per',  # "15000 units per transaction"
+))
+_GAS_RANGE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(\d+)[-–]\s*(\d+)\s*gas',  # "1000-1500 gas"
+    r'(\d+)\s*to\s*(\d+)\s*gas',  # "500 to 800 gas"
+    r'between\s+(\d+)\s+and\s+(\d+)\s*gas',  # "between 100 and 200 gas"
+))
+_DIFFICULTY_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(?:implementation\s+)?difficulty[:\s]*([a-z]+)',
+    r'(?:complexity|effort)[:\s]*([a-z]+)',
+))
+# Canonical difficulty strings, so every finding shares the same three objects
+_DIFFICULTY_LEVELS = {'easy': 'easy', 'medium': 'medium', 'hard': 'hard'}
+_GAS_CODE_PATTERNS = tuple(re.compile(pattern, re.DOTALL) for pattern in (
+    r'```(?:solidity|sol)?\s*(.*?)```',
+    r'`([^`\n]{20,})`',
+))
+_PUBLIC_KEYWORD_RE = re.compile(r'\bpublic\b')
+_EXTERNAL_KEYWORD_RE = re.compile(r'\bexternal\b')
+_POST_INCREMENT_RE = re.compile(r'\bi\+\+')
+_PRE_INCREMENT_RE = re.compile(r'\+\+i\b')
+# Common gas optimization patterns the fallback looks for, in priority order
+_GAS_FALLBACK_HINTS = (
+    {
+        'keywords': ['storage', 'pack', 'slot'],
+        'type': 'Storage Packing Optimization',
+        'description': 'Pack storage variables to reduce storage slots and save gas on state operations.',
+        'savings': '20000'
+    },
+    {
+        'keywords': ['external', 'public', 'function'],
+        'type': 'Function Visibility Optimization',
+        'description': 'Use external instead of public for functions to save gas on function calls.',
+        'savings': '500'
+    },
+    {
+        'keywords': ['loop', '++i', 'i++', 'increment'],
+        'type': 'Loop Optimization',
+        'description': 'Use ++i instead of i++ in loops to save gas on increment operations.',
+        'savings': '1000'
+    },
+    {
+        'keywords': ['constant', 'immutable', 'variable'],
+        'type': 'Variable Declaration Optimization',
+        'description': 'Use constant or immutable for unchanging values to save gas.',
+        'savings': '2000'
+    },
+    {
+        'keywords': ['require', 'error', 'revert', 'string'],
+        'type': 'Custom Error Optimization',
+        'description': 'Replace require statements with custom errors to reduce gas costs.',
+        'savings': '1500'
+    },
+    {
+        'keywords': ['memory', 'storage', 'cache'],
+        'type': 'Memory Optimization',
+        'description': 'Cache storage reads in memory to avoid redundant SLOAD operations.',
+        'savings': '800'
+    }
+)
+
+def _gas_section_matches(text: str, header_re: Any, boundary_re: Any) -> List[Tuple[str, str, str]]:
+    """Stripped (num, title, body) per section for one gas section style; num is "?" when unnumbered"""
+    matches = []
+    pos = 0
+    while header := header_re.search(text, pos):
+        *num, title = header.groups()
+        if not _has_gas_title_keyword(title.lower()):
+            pos = header.start() + 1
+            continue
+        boundary = boundary_re.search(text, header.end())
+        pos = boundary.start() if boundary else len(text)
+        matches.append((num[0] if num else "?", title.strip(), text[header.end():pos].strip()))
+    return matches
+
+def _span_between(start_re: Any, end_re: Any, text: str) -> Optional[str]:
+    """Text after the first start_re match up to the next end_re match (or the end of text)"""
+    start = start_re.search(text)
+    if start is None:
+        return None
+    end = end_re.search(text, start.end())
+    return text[start.end():end.start() if end else len(text)]
+
+def _log_raw_response(label: str, response: Any) -> None:
+    """Dump the head and tail of a raw agent response at debug level"""
+    if isinstance(response, str):
+        logger.debug(
+            "%s RAW RESPONSE (%d chars)\nResponse (first 500 chars):\n---\n%s\n---\nResponse (last 500 chars):\n---\n%s\n---",
+            label, len(response), response[:500], response[-500:]
+        )
+    else:
+        logger.debug("%s RAW RESPONSE (%s): %s", label, type(response).__name__, response)
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After (in seconds) from the HTTP response behind a model error, if the provider sent one"""
+    response = getattr(error.__cause__, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        # HTTP-date form; fall back to our own backoff
+        return None
+
+# Fallbacks for fields a structured (JSON) finding leaves out, same as the regex extractors'
+_VULN_FIELD_DEFAULTS = {
+    "vulnerability_type": "Security Vulnerability",
+    "severity": "MEDIUM",
+    "description": "Security vulnerability identified in smart contract code",
+    "attack_scenario": "Attacker can exploit this vulnerability to compromise contract security",
+    "remediation": "Implement security best practices to address this vulnerability",
+    "code_snippet": "",
+    "location": ""
+}
+_SEVERITIES = frozenset(('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFORMATIONAL'))
+
+def _new_audit_results(contract_name: str, audit_scope: str) -> Dict[str, Any]:
+    """Empty results dict for one contract's full audit"""
+    return {
+        "contract_name": contract_name,
+        "audit_scope": audit_scope,
+        "security_findings": [],
+        "gas_optimizations": [],
+        "overall_risk_score": 0,
+        "audit_duration_seconds": 0,
+        "learning_insights": {},
+        "status": "completed"
+    }
+
+def _pack_audit_batches(contracts: List[Tuple[str, str, str]]) -> List[List[int]]:
+    """Greedily group contract indexes into batches within the size and character limits.
+    
+    A contract too large for any batch gets a batch of its own."""
+    batches, batch, batch_chars = [], [], 0
+    for i, (contract_code, _, _) in enumerate(contracts):
+        if batch and (len(batch) == _AUDIT_BATCH_SIZE or batch_chars + len(contract_code) > _AUDIT_BATCH_CHARS):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append(i)
+        batch_chars += len(contract_code)
+    if batch:
+        batches.append(batch)
+    return batches
+
+# Characters that could close or split a <<<CONTRACT ...>>> marker line
+_MARKER_UNSAFE_RE = re.compile(r'[<>\r\n]+')
+
+def _marker_field(value: str) -> str:
+    """A contract name/scope made safe to embed in a batch marker line"""
+    return _MARKER_UNSAFE_RE.sub(' ', str(value)).strip()
+
+def _batch_analyses(response: Any) -> Dict[int, str]:
+    """Per-contract analysis texts from a batched agent response, keyed by contract id.
+    
+    Contracts the response doesn't cover (or an unparseable response) are simply missing."""
+    text = response.result if hasattr(response, 'result') else str(response)
+    if not isinstance(text, str):
+        return {}
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        return {}
+    try:
+        entries = loads_json(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+    return {
+        entry["id"]: entry["analysis"]
+        for entry in entries
+        if isinstance(entry, dict) and isinstance(entry.get("id"), int) and isinstance(entry.get("analysis"), str)
+    }
+
+class WorkflowOrchestrator:
+    def __init__(self, agent_manager: AgentManager, settings):
+        self.agent_manager = agent_manager
+        self.settings = settings
+        # Keyed by (agent name, contract_digest(instructions + prompt))
+        self._response_cache: "OrderedDict[Tuple[str, bytes], Tuple[float, Any]]" = OrderedDict()
+    
+    async def run_data_analysis_pipeline(self, objective: str) -> Dict[str, Any]:
+        """Run complete data analysis pipeline"""
+        
+        # Create workflow
+        workflow = Workflow(objective=objective, client_mode=False)
+        
+        # Step 1: Data preprocessing and analysis, with the report outline drafted alongside it
+        # (the outline only needs the objective, so it overlaps the analysis round-trip)
+        analysis_result, outline_result = await asyncio.gather(
+            workflow.custom(
+                name="data_analysis",
+                objective=f"Analyze the data for: {objective}",
+                instructions="Perform comprehensive data analysis including statistical summaries, trend analysis, and key insights identification.",
+                agents=[self.agent_manager.get_agent("analyst")]
+            ).run_tasks(),
+            workflow.custom(
+                name="report_outline",
+                objective=f"Outline an executive report for: {objective}",
+                instructions="Draft the section structure of a professional executive report: headings, planned visualizations, and where findings and recommendations go.",
+                agents=[self.agent_manager.get_agent("writer")]
+            ).run_tasks()
+        )
+        
+        # Step 2: Generate report by filling the outline with the analysis
+        report_result = await workflow.custom(
+            name="report_generation",
+            objective=f"Create executive report based on analysis: {analysis_result.result}\n\nFollow this outline: {outline_result.result}",
+            instructions="Create a professional executive report with visualizations, key findings, and actionable recommendations.",
+            agents=[self.agent_manager.get_agent("writer")]
+        ).run_tasks()
+        
+        # Step 3: Quality review and coordination
+        final_result = await workflow.custom(
+            name="quality_review",
+            objective=f"Review and finalize the report: {report_result.result}",
+            instructions="Review the report for quality, completeness, and accuracy. Provide final recommendations.",
+            agents=[self.agent_manager.get_agent("coordinator")]
+        ).run_tasks()
+        
+        return {
+            "analysis": analysis_result.result,
+            "report": report_result.result,
+            "final_output": final_result.result,
+            "status": "completed"
+        }
+    
+    async def run_collaborative_task(self, task_description: str) -> Dict[str, Any]:
+        """Run collaborative task across multiple agents"""
+        
+        # Step 1: Coordinator creates plan while the writer drafts the deliverable's outline
+        coordinator = self.agent_manager.get_agent("coordinator")
+        writer = self.agent_manager.get_agent("writer")
+        plan, outline = await asyncio.gather(
+            coordinator.run(f"Create a detailed execution plan for: {task_description}"),
+            writer.run(f"Outline the deliverable for: {task_description}")
+        )
+        
+        # Step 2: Analyst processes data (needs the plan, so this stays sequential)
+        analyst = self.agent_manager.get_agent("analyst")
+        analysis = await analyst.run(f"Execute analysis phase of plan: {plan.result}")
+        
+        # Step 3: Writer fills the outline with the analysis
+        deliverable = await writer.run(f"Create deliverable based on analysis: {analysis.result}\n\nFollow this outline: {outline.result}")
+        
+        # Step 4: Coordinator reviews and finalizes
+        final_review = await coordinator.run(f"Review and finalize deliverable: {deliverable.result}")
+        
+        return {
+            "plan": plan.result,
+            "analysis": analysis.result,
+            "deliverable": deliverable.result,
+            "final_output": final_review.result
+        }
+
+    async def run_security_audit_pipeline(self, contract_code: str, contract_name: str, audit_scope: str) -> Dict[str, Any]:
+        """Run comprehensive smart contract security audit pipeline"""
+        
+        # Get the security auditor agent directly
+        security_agent = self.agent_manager.get_agent("security_auditor")
+        
+        # Static instructions first, contract last: every audit sends the same prompt prefix,
+        # which provider-side prompt caching can reuse
+        security_prompt = f"""{SECURITY_AUDIT_INSTRUCTIONS}
+
+Contract: {contract_name}
+Scope: {audit_scope}
+
+CONTRACT CODE:
+{contract_code}"""
+        
+        # Call agent directly
+        security_response = await self._run_agent_with_retry(security_agent, security_prompt)
+        
+        # Extract content from agent response
+        security_content = security_response.result if hasattr(security_response, 'result') else str(security_response)
+        
+        return {
+            "contract_name": contract_name,
+            "audit_scope": audit_scope,
+            "security_findings": security_content,
+            "status": "completed"
+        }
+
+    async def run_gas_optimization_pipeline(self, contract_code: str, contract_name: str) -> Dict[str, Any]:
+        """Run gas optimization analysis pipeline"""
+        
+        # Get the gas optimizer agent directly
+        gas_agent = self.agent_manager.get_agent("gas_optimizer")
+        
+        # Same layout as the security prompt: shared instructions, then the contract
+        gas_prompt = f"""{GAS_OPTIMIZATION_INSTRUCTIONS}
+
+Contract: {contract_name}
+
+CONTRACT CODE:
+{contract_code}"""
         
         # Call agent directly
         gas_response = await self._run_agent_with_retry(gas_agent, gas_prompt)
@@ -253,250 +721,405 @@ Be thorough in finding ALL optimization opportunities."""
 
     async def run_full_audit(self, contract_code: str, contract_name: str, audit_scope: str = "comprehensive") -> Dict[str, Any]:
         """Run complete audit workflow with security analysis, gas optimization, and reporting"""
+        results = {}
+        async for results in self.stream_full_audit(contract_code, contract_name, audit_scope):
+            pass
+        return results
+    
+    async def run_full_audit_batch(self, contracts: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """Audit many (contract_code, contract_name, audit_scope) contracts, e.g. for a project sweep.
+        
+        Several contracts share one call per agent; a contract that fills a batch by itself, or that a
+        batched answer leaves out, goes through run_full_audit instead. Returns one results dict per
+        contract, in input order.
+        """
+        all_results: List[Optional[Dict[str, Any]]] = [None] * len(contracts)
+        
+        # Batched prompts cover several contracts, so they use the base agents without per-contract
+        # learning; they're held here rather than swapped into the manager other audits share
+        agents = self.agent_manager.base_agents()
+        for batch in _pack_audit_batches(contracts):
+            if len(batch) < 2:
+                continue
+            batch_results = await self._run_audit_batch([contracts[i] for i in batch], agents)
+            for batch_id, results in batch_results.items():
+                all_results[batch[batch_id]] = results
+        
+        # The rest run one at a time; start their learning lookups now so they overlap the audits before them
+        fallback = [i for i, results in enumerate(all_results) if results is None]
+        for i in fallback:
+            contract_code, contract_name, _ = contracts[i]
+            self.agent_manager.prefetch(contract_name, contract_code)
+        for i in fallback:
+            all_results[i] = await self.run_full_audit(*contracts[i])
+        return all_results
+    
+    async def _run_audit_batch(self, batch: List[Tuple[str, str, str]], agents: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+        """Audit a batch with one security and one gas call from `agents`; results are keyed by position in the batch"""
         start_time = time.time()
         
-        results = {
-            "contract_name": contract_name,
-            "audit_scope": audit_scope,
-            "security_findings": [],
-            "gas_optimizations": [],
-            "overall_risk_score": 0,
-            "audit_duration_seconds": 0,
-            "learning_insights": {},
-            "status": "completed"
-        }
+        contract_blocks = "\n".join(
+            f"<<<CONTRACT id={i} name={_marker_field(contract_name)} scope={_marker_field(audit_scope)}>>>\n{contract_code}\n<<<END>>>"
+            for i, (contract_code, contract_name, audit_scope) in enumerate(batch)
+        )
+        try:
+            security_response, gas_response = await asyncio.gather(
+                self._run_agent_with_retry(
+                    agents["security_auditor"],
+                    f"{SECURITY_AUDIT_INSTRUCTIONS}\n\n{BATCH_AUDIT_INSTRUCTIONS}\n\n{contract_blocks}"
+                ),
+                self._run_agent_with_retry(
+                    agents["gas_optimizer"],
+                    f"{GAS_OPTIMIZATION_INSTRUCTIONS}\n\n{BATCH_AUDIT_INSTRUCTIONS}\n\n{contract_blocks}"
+                )
+            )
+        except Exception as e:
+            logger.error("❌ ERROR in batched audit, falling back to per-contract audits: %s", e)
+            return {}
+        
+        security_texts = _batch_analyses(security_response)
+        gas_texts = _batch_analyses(gas_response)
+        duration = time.time() - start_time
+        
+        batch_results = {}
+        for i, (contract_code, contract_name, audit_scope) in enumerate(batch):
+            if i not in security_texts or i not in gas_texts:
+                continue
+            results = _new_audit_results(contract_name, audit_scope)
+            results["security_findings"], results["gas_optimizations"] = await asyncio.gather(
+                asyncio.to_thread(self._parse_security_findings, security_texts[i]),
+                asyncio.to_thread(self._extract_gas_optimizations, gas_texts[i])
+            )
+            results["audit_duration_seconds"] = duration
+            try:
+                await self._summarize_audit(results, contract_code, contract_name, audit_scope)
+            except Exception as e:
+                results["status"] = "error"
+                results["error"] = str(e)
+                logger.exception("❌ ERROR in audit pipeline: %s", e)
+            batch_results[i] = results
+        return batch_results
+    
+    async def stream_full_audit(self, contract_code: str, contract_name: str, audit_scope: str = "comprehensive") -> AsyncIterator[Dict[str, Any]]:
+        """Run the complete audit workflow, yielding each agent's results as soon as they're parsed.
+        
+        Partial updates are single-key dicts ({"security_findings": [...]} or {"gas_optimizations": [...]});
+        the last item is the full results dict, which carries "status".
+        """
+        start_time = time.time()
+        
+        results = _new_audit_results(contract_name, audit_scope)
         
         try:
             # Create agents first
             await self.agent_manager.create_agents(contract_name, contract_code)
             
-            # Run security audit pipeline
-            security_results = await self.run_security_audit_pipeline(contract_code, contract_name, audit_scope)
-            if security_results.get("security_findings"):
-                findings_text = security_results["security_findings"]
-                
-                # Enhanced Debug Logging
-                print("\n" + "="*40 + " SECURITY AUDIT RAW RESPONSE " + "="*40)
-                print(f"Type of findings_text: {type(findings_text)}")
-                if isinstance(findings_text, str):
-                    print(f"Length of findings_text: {len(findings_text)}")
-                    print(f"Response (first 500 chars):\n---\n{findings_text[:500]}\n---")
-                    print(f"Response (last 500 chars):\n---\n{findings_text[-500:]}\n---")
-                else:
-                    print(f"Response content: {findings_text}")
-                print("="*100 + "\n")
-
-                if isinstance(findings_text, str):
-                    # Parse the detailed security analysis to extract structured findings
-                    results["security_findings"] = self._parse_security_findings(findings_text)
-                else:
-                    results["security_findings"] = findings_text
-            
-            # Run gas optimization pipeline  
-            gas_results = await self.run_gas_optimization_pipeline(contract_code, contract_name)
-            if gas_results.get("gas_optimizations"):
-                optimizations_text = gas_results["gas_optimizations"]
-
-                # Enhanced Debug Logging for Gas Optimizations
-                print("\n" + "="*40 + " GAS OPTIMIZATION RAW RESPONSE " + "="*40)
-                print(f"Type of optimizations_text: {type(optimizations_text)}")
-                if isinstance(optimizations_text, str):
-                    print(f"Length of optimizations_text: {len(optimizations_text)}")
-                    print(f"Response (first 500 chars):\n---\n{optimizations_text[:500]}\n---")
-                    print(f"Response (last 500 chars):\n---\n{optimizations_text[-500:]}\n---")
-                else:
-                    print(f"Response content: {optimizations_text}")
-                print("="*100 + "\n")
-
-                if isinstance(optimizations_text, str):
-                    # Parse gas optimizations
-                    parsed_optimizations = self._extract_gas_optimizations(optimizations_text)
-                    
-                    # Debug each parsed optimization
-                    print("\n" + "="*40 + " PARSED GAS OPTIMIZATIONS DEBUG " + "="*40)
-                    for i, opt in enumerate(parsed_optimizations, 1):
-                        print(f"  Type: {opt.get('optimization_type', 'N/A')}")
-                        print(f"  Description: {opt.get('description', 'N/A')[:100]}...")
-                        print(f"  Gas Savings: {opt.get('estimated_gas_savings', 'N/A')}")
-                        print(f"  Difficulty: {opt.get('implementation_difficulty', 'N/A')}")
-                        
-                        orig_code = opt.get('original_code', '')
-                        opt_code = opt.get('optimized_code', '')
-                        
-                        print(f"  Has Original Code: {'✅' if orig_code else '❌'} ({len(orig_code)} chars)")
-                        print(f"  Has Optimized Code: {'✅' if opt_code else '❌'} ({len(opt_code)} chars)")
-                        
-                        if orig_code:
-                            print(f"  Original Code Preview: {orig_code[:100]}...")
-                        if opt_code:
-                            print(f"  Optimized Code Preview: {opt_code[:100]}...")
-                    
-                    print(f"\n📊 Total Gas Optimizations Parsed: {len(parsed_optimizations)}")
-                    print("="*100 + "\n")
-                    
-                    results["gas_optimizations"] = parsed_optimizations
-                else:
-                    results["gas_optimizations"] = optimizations_text
-            
-            # Calculate overall risk score
-            critical_count = len([f for f in results["security_findings"] if f.get("severity") == "CRITICAL"])
-            high_count = len([f for f in results["security_findings"] if f.get("severity") == "HIGH"])
-            medium_count = len([f for f in results["security_findings"] if f.get("severity") == "MEDIUM"])
-            
-            risk_score = min(10, critical_count * 3 + high_count * 2 + medium_count * 1)
-            results["overall_risk_score"] = risk_score
+            # Security and gas agents work on the same contract independently, so run them
+            # concurrently and hand out whichever finishes first without waiting on the slower one
+            stages = [
+                asyncio.ensure_future(self._security_stage(contract_code, contract_name, audit_scope)),
+                asyncio.ensure_future(self._gas_stage(contract_code, contract_name))
+            ]
+            stage_errors = []
+            try:
+                for stage in asyncio.as_completed(stages):
+                    try:
+                        key, value = await stage
+                    except Exception as e:
+                        # One agent failing shouldn't throw away the other's results
+                        logger.error("❌ ERROR in audit stage: %s", e)
+                        stage_errors.append(str(e))
+                        continue
+                    results[key] = value
+                    yield {key: value}
+            finally:
+                for stage in stages:
+                    stage.cancel()
             
-            # Get learning insights if learning engine exists
-            if hasattr(self.agent_manager, 'learning_engine') and self.agent_manager.learning_engine:
-                learning_insights = await self.agent_manager.learning_engine.learn_from_similar_contracts(
-                    contract_name, contract_code
-                )
-                results["learning_insights"] = learning_insights
+            if len(stage_errors) == len(stages):
+                raise RuntimeError("; ".join(stage_errors))
+            if stage_errors:
+                results["error"] = "; ".join(stage_errors)
             
-            # Record audit session for learning
-            if hasattr(self.agent_manager, 'learning_engine') and self.agent_manager.learning_engine:
-                session_data = {
-                    "contract_name": contract_name,
-                    "contract_code": contract_code,
-                    "audit_scope": audit_scope,
-                    "total_vulnerabilities": len(results["security_findings"]),
-                    "critical_count": critical_count,
-                    "high_count": high_count,
-                    "medium_count": medium_count,
-                    "low_count": len([f for f in results["security_findings"] if f.get("severity") == "LOW"]),
-                    "info_count": len([f for f in results["security_findings"] if f.get("severity") == "INFORMATIONAL"]),
-                    "gas_optimizations_count": len(results["gas_optimizations"]),
-                    "overall_risk_score": risk_score,
-                    "agents_used": ["security_auditor", "gas_optimizer", "audit_reporter"]
-                }
-                await self.agent_manager.learning_engine.record_audit_session(session_data)
+            await self._summarize_audit(results, contract_code, contract_name, audit_scope)
             
         except Exception as e:
             results["status"] = "error"
             results["error"] = str(e)
-            print(f"❌ ERROR in audit pipeline: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ ERROR in audit pipeline: %s", e)
         
         # Calculate audit duration
         end_time = time.time()
         results["audit_duration_seconds"] = end_time - start_time
         
-        return results
+        yield results
+    
+    async def _summarize_audit(self, results: Dict[str, Any], contract_code: str, contract_name: str, audit_scope: str):
+        """Score the parsed findings into results and feed the audit and its findings to the learning engine"""
+        # Calculate overall risk score from one counting pass over the findings
+        findings = results["security_findings"]
+        severity_counts = Counter(f.get("severity") for f in findings)
+        critical_count = severity_counts["CRITICAL"]
+        high_count = severity_counts["HIGH"]
+        medium_count = severity_counts["MEDIUM"]
+        
+        risk_score = min(10, critical_count * 3 + high_count * 2 + medium_count * 1)
+        results["overall_risk_score"] = risk_score
+        
+        learning_engine = getattr(self.agent_manager, 'learning_engine', None)
+        if not learning_engine:
+            return
+        
+        # Hash the contract once for the learning lookup and the session record
+        contract_hash = contract_digest(contract_code)
+        session_data = {
+            "contract_name": contract_name,
+            "contract_code": contract_code,
+            "contract_hash": contract_hash,
+            "audit_scope": audit_scope,
+            "total_vulnerabilities": len(findings),
+            "critical_count": critical_count,
+            "high_count": high_count,
+            "medium_count": medium_count,
+            "low_count": severity_counts["LOW"],
+            "info_count": severity_counts["INFORMATIONAL"],
+            "gas_optimizations_count": len(results["gas_optimizations"]),
+            "overall_risk_score": risk_score,
+            "agents_used": ["security_auditor", "gas_optimizer", "audit_reporter"]
+        }
+        
+        # The insights read findings/patterns and the session record only writes audit_sessions,
+        # so the lookup and the record run concurrently
+        results["learning_insights"], _ = await asyncio.gather(
+            learning_engine.learn_from_similar_contracts(contract_name, contract_code, contract_hash),
+            learning_engine.record_audit_session(session_data)
+        )
+        
+        # This audit's findings go in after the lookup, so its insights only reflect earlier audits
+        await learning_engine.record_vulnerability_findings([
+            {**finding, "contract_name": contract_name, "contract_hash": contract_hash,
+             "line_numbers": finding.get("location") or None}
+            for finding in findings
+        ])
+        await learning_engine.record_gas_optimizations([
+            {**optimization, "contract_name": contract_name}
+            for optimization in results["gas_optimizations"]
+        ])
+    
+    async def _security_stage(self, contract_code: str, contract_name: str, audit_scope: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Run the security pipeline and parse its response into structured findings"""
+        security_results = await self.run_security_audit_pipeline(contract_code, contract_name, audit_scope)
+        findings = []
+        if security_results.get("security_findings"):
+            findings_text = security_results["security_findings"]
+            
+            # Raw response dump, only built when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                _log_raw_response("SECURITY AUDIT", findings_text)
+
+            if isinstance(findings_text, str):
+                # Parse the detailed security analysis to extract structured findings; the regex
+                # work runs in a worker thread so the other agent's stage keeps making progress
+                findings = await asyncio.to_thread(self._parse_security_findings, findings_text)
+            else:
+                findings = findings_text
+        return "security_findings", findings
+    
+    async def _gas_stage(self, contract_code: str, contract_name: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Run the gas pipeline and parse its response into structured optimizations"""
+        gas_results = await self.run_gas_optimization_pipeline(contract_code, contract_name)
+        optimizations = []
+        if gas_results.get("gas_optimizations"):
+            optimizations_text = gas_results["gas_optimizations"]
+
+            if logger.isEnabledFor(logging.DEBUG):
+                _log_raw_response("GAS OPTIMIZATION", optimizations_text)
+
+            if isinstance(optimizations_text, str):
+                # Parse gas optimizations (off the event loop, like the security parse)
+                parsed_optimizations = await asyncio.to_thread(self._extract_gas_optimizations, optimizations_text)
+                
+                # Debug each parsed optimization
+                if logger.isEnabledFor(logging.DEBUG):
+                    for opt in parsed_optimizations:
+                        orig_code = opt.get('original_code', '')
+                        opt_code = opt.get('optimized_code', '')
+                        logger.debug(
+                            "  Type: %s | Gas Savings: %s | Difficulty: %s | Original: %d chars | Optimized: %d chars\n  Description: %.100s...",
+                            opt.get('optimization_type', 'N/A'), opt.get('estimated_gas_savings', 'N/A'),
+                            opt.get('implementation_difficulty', 'N/A'), len(orig_code), len(opt_code),
+                            opt.get('description', 'N/A')
+                        )
+                logger.debug("📊 Total Gas Optimizations Parsed: %d", len(parsed_optimizations))
+                
+                optimizations = parsed_optimizations
+            else:
+                optimizations = optimizations_text
+        return "gas_optimizations", optimizations
 
     async def _run_agent_with_retry(self, agent, prompt: str, max_retries: int = 3, initial_delay: int = 2):
-        """Run an agent with retry logic for handling transient API errors."""
+        """Run an agent with retry logic for handling transient API errors.
+        
+        Successful responses are cached; the key covers the agent's instructions, since those carry the learning data."""
         from pydantic_ai.exceptions import ModelHTTPError
         import asyncio
 
-        delay = initial_delay
+        key = (getattr(agent, "name", ""), contract_digest(f"{getattr(agent, 'instructions', '')}\0{prompt}"))
+        response = self._cached_response(key)
+        if response is not None:
+            logger.info("♻️ Reusing cached %s response", key[0])
+            return response
+
         for attempt in range(max_retries):
             try:
-                return await agent.run(prompt)
+                async with _agent_call_limiter():
+                    response = await agent.run(prompt)
             except ModelHTTPError as e:
-                if e.status_code >= 500 and attempt < max_retries - 1:
-                    print(f"🚨 Agent call failed with status {e.status_code}. Retrying in {delay} seconds... (Attempt {attempt + 1}/{max_retries})")
+                if (e.status_code >= 500 or e.status_code == 429) and attempt < max_retries - 1:
+                    # Exponential backoff with jitter so concurrent audits don't retry in lockstep,
+                    # unless the provider said how long to wait
+                    delay = _retry_after_seconds(e)
+                    if delay is None:
+                        delay = initial_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning("🚨 Agent call failed with status %s. Retrying in %.1f seconds... (Attempt %d/%d)", e.status_code, delay, attempt + 1, max_retries)
                     await asyncio.sleep(delay)
-                    delay *= 2  # Exponential backoff
                 else:
-                    print(f"🚨 Agent call failed after {max_retries} retries or with a non-retriable status code ({e.status_code}).")
+                    logger.error("🚨 Agent call failed after %d retries or with a non-retriable status code (%s).", max_retries, e.status_code)
                     raise e
             except Exception as e:
-                print(f"An unexpected error occurred during agent execution: {e}")
+                logger.error("An unexpected error occurred during agent execution: %s", e)
                 raise e
+            else:
+                self._response_cache[key] = (time.monotonic(), response)
+                self._response_cache.move_to_end(key)
+                while len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+                return response
+
+    def _cached_response(self, key: Tuple[str, bytes]) -> Optional[Any]:
+        """Cached agent response for a key, or None if missing/expired"""
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        cached_at, response = entry
+        if time.monotonic() - cached_at > _RESPONSE_CACHE_TTL:
+            del self._response_cache[key]
+            return None
+        return response
 
     def _parse_security_findings(self, text: str) -> list:
         """Parse security findings from agent text response"""
+        # Error messages and empty answers can't hold a section long enough to parse (< 100 chars)
+        if not text or len(text) < 100:
+            return []
+        
         findings = []
         
         try:
             # Clean the text first
             text = self._clean_agent_response(text)
             
-            print(f"🔍 SECURITY PARSING: Starting to parse {len(text)} characters of agent response")
+            # Already-structured answers skip the regex pipeline
+            structured = self._structured_security_findings(text)
+            if structured is not None:
+                logger.debug("🔍 SECURITY PARSING: Read %d vulnerabilities from a JSON response", len(structured))
+                return structured
+            
+            logger.debug("🔍 SECURITY PARSING: Starting to parse %d characters of agent response", len(text))
             
             # Look for vulnerability sections
             sections = []
             
             # Try numbered vulnerability patterns
-            vuln_patterns = [
-                r'(?:^|\n)#{1,6}\s*(\d+)\.\s*([^\n]*(?:vulnerability|finding|issue|attack|exploit|risk)[^\n]*)\s*\n(.*?)(?=(?:^|\n)#{1,6}\s*\d+\.|$)',
-                r'(?:^|\n)(\d+)\.\s*\*\*([^\*]*(?:vulnerability|finding|issue|attack|exploit|risk)[^\*]*)\*\*\s*\n(.*?)(?=(?:^|\n)\d+\.|$)',
-                r'(?:^|\n)\*\*(\d+)\.\s*([^\*]*(?:vulnerability|finding|issue|attack|exploit|risk)[^\*]*)\*\*\s*\n(.*?)(?=(?:^|\n)\*\*\d+\.|$)'
-            ]
-            
-            for pattern in vuln_patterns:
-                numbered_vulns = re.findall(pattern, text, re.DOTALL | re.MULTILINE | re.IGNORECASE)
+            for pattern in _section_patterns_for(text):
+                numbered_vulns = pattern.findall(text)
                 if numbered_vulns:
-                    print(f"🔍 SECURITY PARSING: Found {len(numbered_vulns)} vulnerabilities with pattern")
+                    logger.debug("🔍 SECURITY PARSING: Found %d vulnerabilities with pattern", len(numbered_vulns))
                     for num, title, content in numbered_vulns:
                         full_section = f"{title.strip()}\n{content.strip()}"
                         if len(content.strip()) > 100:
                             sections.append(full_section)
-                            print(f"📝 Added vulnerability {num}: {title.strip()[:60]}...")
+                            logger.debug("📝 Added vulnerability %s: %.60s...", num, title.strip())
                     break
             
             # If no numbered sections, try keyword-based extraction
             if not sections:
-                print("🔍 SECURITY PARSING: Using keyword-based extraction")
-                paragraphs = re.split(r'\n\s*\n', text)
-                
-                security_keywords = [
-                    'reentrancy', 'access control', 'integer overflow', 'underflow',
-                    'unchecked call', 'tx.origin', 'timestamp', 'front running',
-                    'dos attack', 'denial of service', 'delegatecall', 'proxy',
-                    'flash loan', 'oracle manipulation', 'storage collision',
-                    'uninitialized', 'privilege escalation', 'authorization',
-                    'authentication', 'input validation', 'state manipulation'
-                ]
+                logger.debug("🔍 SECURITY PARSING: Using keyword-based extraction")
+                paragraphs = _PARAGRAPH_SPLIT_RE.split(text)
                 
                 for para in paragraphs:
                     para = para.strip()
                     if (len(para) > 100 and 
-                        any(keyword in para.lower() for keyword in security_keywords) and
-                        not self._is_template_text(para)):
+                        _has_security_section_keyword(para_lower := para.lower()) and
+                        not _has_template_phrase(para_lower)):
                         sections.append(para)
                         first_line = para.split('\n')[0][:60]
-                        print(f"📝 Added keyword-based section: {first_line}...")
+                        logger.debug("📝 Added keyword-based section: %s...", first_line)
             
-            print(f"🔍 SECURITY PARSING: Processing {len(sections)} sections for vulnerability extraction")
+            logger.debug("🔍 SECURITY PARSING: Processing %d sections for vulnerability extraction", len(sections))
                     
             for i, section in enumerate(sections):
                 try:
                     section = section.strip()
                     if len(section) < 100:
-                        print(f"🔍 SECURITY PARSING: Skipping short section {i+1} ({len(section)} chars)")
+                        logger.debug("🔍 SECURITY PARSING: Skipping short section %d (%d chars)", i + 1, len(section))
                         continue
                     
-                    print(f"🔍 SECURITY PARSING: Processing section {i+1} ({len(section)} chars)")
+                    logger.debug("🔍 SECURITY PARSING: Processing section %d (%d chars)", i + 1, len(section))
                     
                     # Extract vulnerability information
                     vuln_info = self._extract_vulnerability_info(section)
                         
                     # Validate the vulnerability
                     if self._is_valid_security_vulnerability(vuln_info, section):
-                        print(f"✅ SECURITY PARSING: Added vulnerability: {vuln_info['vulnerability_type']}")
+                        logger.debug("✅ SECURITY PARSING: Added vulnerability: %s", vuln_info['vulnerability_type'])
                         findings.append(vuln_info)
                     else:
-                        print(f"❌ SECURITY PARSING: Rejected section - insufficient content")
+                        logger.debug("❌ SECURITY PARSING: Rejected section - insufficient content")
                         
                 except Exception as section_error:
-                    print(f"❌ ERROR processing security section {i+1}: {str(section_error)}")
+                    logger.error("❌ ERROR processing security section %d: %s", i + 1, section_error)
                     continue
             
-            print(f"🔍 SECURITY PARSING: Final result - {len(findings)} vulnerabilities found")
+            logger.debug("🔍 SECURITY PARSING: Final result - %d vulnerabilities found", len(findings))
             return findings
             
         except Exception as e:
-            print(f"❌ ERROR in _parse_security_findings: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ ERROR in _parse_security_findings: %s", e)
             return []
 
+    def _structured_security_findings(self, text: str) -> Optional[list]:
+        """Findings from a response that is already JSON (a list, or {"findings": [...]}); None otherwise"""
+        if text.startswith("```"):
+            text = text.strip("`").removeprefix("json").strip()
+        if not text or text[0] not in "[{":
+            return None
+        try:
+            data = loads_json(text)
+        except ValueError:
+            return None
+        if isinstance(data, dict):
+            data = data.get("findings")
+        if not isinstance(data, list):
+            return None
+        
+        findings = []
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            finding = {key: str(item.get(key) or default) for key, default in _VULN_FIELD_DEFAULTS.items()}
+            finding["severity"] = finding["severity"].upper()
+            if finding["severity"] not in _SEVERITIES:
+                finding["severity"] = "MEDIUM"
+            findings.append(finding)
+        return findings
+
     def _extract_vulnerability_info(self, section: str) -> dict:
         """Extract vulnerability information from a section"""
+        # Lowercased once for every keyword scan below
+        section_lower = section.lower()
         vuln_type = self._extract_vulnerability_type(section)
-        severity = self._extract_severity(section)
+        severity = self._extract_severity(section, section_lower)
         description = self._extract_description(section)
         attack_scenario = self._extract_attack_scenario(section)
         remediation = self._extract_remediation(section)
@@ -515,64 +1138,39 @@ Be thorough in finding ALL optimization opportunities."""
     def _extract_vulnerability_type(self, section: str) -> str:
         """Extract vulnerability type"""
         # Look for explicit type declarations
-        type_patterns = [
-            r'(?:vulnerability\s+type|type|category)[:\s]*([^\n]+)',
-            r'\*\*\s*([^*\n]+(?:vulnerability|attack|issue))\s*\*\*',
-            r'(?:^|\n)([^:\n]*(?:reentrancy|overflow|underflow|access control|dos|front.?running|flash loan)[^:\n]*?)(?:\n|:)',
-        ]
-        
-        for pattern in type_patterns:
-            match = re.search(pattern, section, re.IGNORECASE)
+        for pattern in _VULN_TYPE_PATTERNS:
+            match = pattern.search(section)
             if match:
                 vuln_type = match.group(1).strip()
-                vuln_type = re.sub(r'^[*\s\-#\d\.]+|[*\s\-#]+$', '', vuln_type)
+                vuln_type = vuln_type.lstrip(_TITLE_LEAD_CHARS).rstrip(_TITLE_TAIL_CHARS)
                 if len(vuln_type) > 3 and len(vuln_type) < 100:
                     return vuln_type
         
         # Look for specific vulnerability patterns
-        vuln_patterns = {
-            r'reentranc[yi]': 'Reentrancy Vulnerability',
-            r'integer\s+overflow': 'Integer Overflow',
-            r'integer\s+underflow': 'Integer Underflow',
-            r'access\s+control': 'Access Control Vulnerability',
-            r'unchecked.*call': 'Unchecked External Call',
-            r'tx\.origin': 'tx.origin Authentication Bypass',
-            r'timestamp.*depend': 'Timestamp Dependency',
-            r'front.?running': 'Front-running Vulnerability',
-            r'flash\s+loan': 'Flash Loan Attack',
-            r'dos|denial.*service': 'Denial of Service',
-        }
-        
-        for pattern, vuln_name in vuln_patterns.items():
-            if re.search(pattern, section, re.IGNORECASE):
+        for pattern, vuln_name in _VULN_NAME_PATTERNS:
+            if pattern.search(section):
                 return vuln_name
         
         return "Security Vulnerability"
 
-    def _extract_severity(self, section: str) -> str:
+    def _extract_severity(self, section: str, section_lower: str) -> str:
         """Extract severity from text section"""
         # Look for explicit severity declarations
-        severity_patterns = [
-            r'severity[:\s]*([a-zA-Z]+)',
-            r'\*\*\s*severity\s*\*\*[:\s]*([a-zA-Z]+)',
-        ]
-        
-        for pattern in severity_patterns:
-            match = re.search(pattern, section, re.IGNORECASE)
+        for pattern in _SEVERITY_PATTERNS:
+            match = pattern.search(section)
             if match:
                 severity = match.group(1).strip().upper()
                 if severity in ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFORMATIONAL']:
                     return severity
         
         # Look for severity keywords in context
-        section_lower = section.lower()
-        if any(word in section_lower for word in ['critical', 'lose funds', 'total loss', 'drain']):
+        if _has_critical_wording(section_lower):
             return "CRITICAL"
-        elif any(word in section_lower for word in ['high risk', 'significant', 'major impact']):
+        elif _has_high_wording(section_lower):
             return "HIGH"
-        elif any(word in section_lower for word in ['medium', 'moderate', 'limited impact']):
+        elif _has_medium_wording(section_lower):
             return "MEDIUM"
-        elif any(word in section_lower for word in ['low risk', 'minor', 'informational']):
+        elif _has_low_wording(section_lower):
             return "LOW"
         
         return "MEDIUM"
@@ -580,49 +1178,39 @@ Be thorough in finding ALL optimization opportunities."""
     def _extract_description(self, section: str) -> str:
         """Extract vulnerability description"""
         # Look for explicit description sections
-        desc_patterns = [
-            r'(?:description|summary|issue|problem)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)',
-        ]
-        
-        for pattern in desc_patterns:
-            match = re.search(pattern, section, re.IGNORECASE | re.DOTALL)
-            if match:
-                desc = match.group(1).strip()
-                if len(desc) > 40:
-                    return self._clean_extracted_text(desc)
+        match = _DESCRIPTION_RE.search(section)
+        if match:
+            desc = match.group(1).strip()
+            if len(desc) > 40:
+                return self._clean_extracted_text(desc)
         
         # Fallback: Take first substantial paragraph
-        paragraphs = re.split(r'\n\s*\n', section)
+        paragraphs = _PARAGRAPH_SPLIT_RE.split(section)
         for para in paragraphs:
             para = para.strip()
             if (len(para) > 80 and 
-                any(word in para.lower() for word in ['vulnerability', 'allows', 'enables', 'causes', 'risk']) and
-                not self._is_template_text(para)):
+                _has_description_wording(para_lower := para.lower()) and
+                not _has_template_phrase(para_lower)):
                 return self._clean_extracted_text(para)
         
         return "Security vulnerability identified in smart contract code"
 
     def _extract_attack_scenario(self, section: str) -> str:
         """Extract attack scenario"""
-        attack_patterns = [
-            r'(?:attack\s+scenario|scenario|exploit\s+path)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)',
-        ]
-        
-        for pattern in attack_patterns:
-            match = re.search(pattern, section, re.IGNORECASE | re.DOTALL)
-            if match:
-                scenario = match.group(1).strip()
-                if len(scenario) > 30:
-                    return self._clean_extracted_text(scenario)
+        match = _ATTACK_SCENARIO_RE.search(section)
+        if match:
+            scenario = match.group(1).strip()
+            if len(scenario) > 30:
+                return self._clean_extracted_text(scenario)
         
         # Look for sentences describing attack process
-        sentences = re.split(r'[.!?]+', section)
+        sentences = _SENTENCE_SPLIT_RE.split(section)
         attack_sentences = []
         for sentence in sentences:
             sentence = sentence.strip()
             if (len(sentence) > 30 and 
-                any(word in sentence.lower() for word in ['attacker', 'exploit', 'malicious', 'can call', 'manipulate']) and
-                not self._is_template_text(sentence)):
+                _has_attack_wording(sentence_lower := sentence.lower()) and
+                not _has_template_phrase(sentence_lower)):
                 attack_sentences.append(sentence)
                 if len(' '.join(attack_sentences)) > 200:
                     break
@@ -634,30 +1222,20 @@ Be thorough in finding ALL optimization opportunities."""
 
     def _extract_remediation(self, section: str) -> str:
         """Extract remediation advice"""
-        remediation_patterns = [
-            r'(?:remediation|fix|solution|mitigation)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)',
-        ]
-        
-        for pattern in remediation_patterns:
-            match = re.search(pattern, section, re.IGNORECASE | re.DOTALL)
-            if match:
-                remediation = match.group(1).strip()
-                if len(remediation) > 30:
-                    return self._clean_extracted_text(remediation)
+        match = _REMEDIATION_RE.search(section)
+        if match:
+            remediation = match.group(1).strip()
+            if len(remediation) > 30:
+                return self._clean_extracted_text(remediation)
         
         return "Implement security best practices to address this vulnerability"
 
     def _extract_vulnerable_code(self, section: str) -> tuple:
         """Extract vulnerable code snippet and location"""
         # Look for code blocks
-        code_patterns = [
-            r'```(?:solidity)?\s*([^`]+?)```',
-            r'`([^`\n]{15,})`',
-        ]
-        
         code_snippet = ""
-        for pattern in code_patterns:
-            matches = re.findall(pattern, section, re.DOTALL)
+        for pattern in _VULN_CODE_PATTERNS:
+            matches = pattern.findall(section)
             if matches:
                 for match in matches:
                     code = match.strip()
@@ -666,13 +1244,8 @@ Be thorough in finding ALL optimization opportunities."""
         
         # Extract location
         location = ""
-        location_patterns = [
-            r'(?:line|lines?)[:\s]*(\d+(?:\s*-\s*\d+)?)',
-            r'(?:function|method)[:\s]*([a-zA-Z_][a-zA-Z0-9_]*)',
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, section, re.IGNORECASE)
+        for pattern in _LOCATION_PATTERNS:
+            match = pattern.search(section)
             if match:
                 location = match.group(1)
                 break
@@ -685,124 +1258,100 @@ Be thorough in finding ALL optimization opportunities."""
         
         try:
             text = self._clean_agent_response(text)
-            print(f"⚡ GAS PARSING: Starting to parse {len(text)} characters of agent response")
+            # Every kept section is >= 40 chars and the fallback needs > 100, so shorter text can't yield anything
+            if len(text) < 40:
+                return optimizations
+            logger.debug("⚡ GAS PARSING: Starting to parse %d characters of agent response", len(text))
             
             # Split by optimization sections
             sections = []
             
-            # Enhanced patterns to catch more optimization formats with full content
-            opt_patterns = [
-                # Numbered optimizations with headers - capture everything until next section or end
-                r'(?:^|\n)#{1,6}\s*(\d+)\.\s*([^\n]*(?:optimization|packing|efficiency|gas|save|reduce|cheaper|external|public|loop|storage|memory|constant|immutable|error)[^\n]*)\s*\n(.*?)(?=(?:^|\n)#{1,6}\s*\d+\.|\Z)',
-                # Bold numbered optimizations - capture everything until next numbered item or end
-                r'(?:^|\n)(\d+)\.\s*\*\*([^\*]*(?:optimization|packing|efficiency|gas|save|reduce|cheaper|external|public|loop|storage|memory|constant|immutable|error)[^\*]*)\*\*\s*\n(.*?)(?=(?:^|\n)\d+\.|\Z)',
-                # Simple numbered optimizations - capture everything until next numbered item or end
-                r'(?:^|\n)(\d+)\.\s*([^\n]*(?:optimization|packing|efficiency|gas|save|reduce|cheaper|external|public|loop|storage|memory|constant|immutable|error)[^\n]*)\n(.*?)(?=(?:^|\n)\d+\.|\Z)',
-                # Bold optimization headers without numbers
-                r'(?:^|\n)\*\*([^\*]*(?:optimization|packing|efficiency|gas|save|reduce|cheaper|external|public|loop|storage|memory|constant|immutable|error)[^\*]*)\*\*\s*\n(.*?)(?=(?:^|\n)\*\*[^\*]*(?:optimization|packing|efficiency|gas)|\Z)',
-            ]
-            
-            for pattern in opt_patterns:
-                numbered_opts = re.findall(pattern, text, re.DOTALL | re.MULTILINE | re.IGNORECASE)
+            for header_re, boundary_re in _GAS_SECTION_STYLES:
+                numbered_opts = _gas_section_matches(text, header_re, boundary_re)
                 if numbered_opts:
-                    print(f"⚡ GAS PARSING: Found {len(numbered_opts)} optimizations with pattern")
-                    for match in numbered_opts:
-                        if len(match) == 3:  # (num, title, content)
-                            num, title, content = match
-                            full_section = f"{title.strip()}\n{content.strip()}"
-                        else:  # (title, content)
-                            title, content = match
-                            full_section = f"{title.strip()}\n{content.strip()}"
-                            num = "?"
-                        
-                        if len(content.strip()) > 30:  # Reduced threshold
-                            sections.append(full_section)
-                            print(f"📝 Added optimization {num}: {title.strip()[:60]}...")
+                    logger.debug("⚡ GAS PARSING: Found %d optimizations with pattern", len(numbered_opts))
+                    for num, title, content in numbered_opts:
+                        if len(content) > 30:  # Reduced threshold
+                            sections.append(f"{title}\n{content}")
+                            logger.debug("📝 Added optimization %s: %.60s...", num, title)
                     break
             
             # If no numbered sections, use enhanced paragraph-based parsing
             if not sections:
-                print(f"⚡ GAS PARSING: Using enhanced paragraph-based parsing")
-                
-                # Try splitting by different patterns
-                split_patterns = [
-                    r'\n\s*\n',  # Double newlines
-                    r'(?:^|\n)(?=\d+\.)',  # Before numbered items
-                    r'(?:^|\n)(?=\*\*[^*]*(?:optimization|gas|save|reduce|efficient))',  # Before bold optimization headers
-                ]
+                logger.debug("⚡ GAS PARSING: Using enhanced paragraph-based parsing")
                 
-                for pattern in split_patterns:
-                    paragraphs = re.split(pattern, text)
-                    if len(paragraphs) > 1:
+                # Split by the first pattern that occurs at all (any match gives >1 piece)
+                paragraphs = [text]
+                for pattern in _GAS_PARAGRAPH_SPLIT_PATTERNS:
+                    if pattern.search(text):
+                        paragraphs = pattern.split(text)
                         break
                 
-                gas_keywords = [
-                    'gas', 'optimization', 'optimize', 'efficient', 'cheaper', 'save', 'reduce',
-                    'packing', 'storage', 'memory', 'external', 'public', 'loop',
-                    'increment', 'constant', 'immutable', 'error', 'require', 'assembly',
-                    'uint256', 'uint', 'bytes32', 'mapping', 'struct', 'array',
-                    'expensive', 'cost', 'consumption', 'usage'
-                ]
-                
                 for para in paragraphs:
                     para = para.strip()
+                    para_lower = para.lower()
                     if (len(para) > 50 and  # Reduced minimum length
-                        any(keyword in para.lower() for keyword in gas_keywords) and
-                        not self._is_template_text(para)):
+                        _has_gas_keyword(para_lower) and
+                        not _has_template_phrase(para_lower)):
                         sections.append(para)
-                        print(f"📝 Added paragraph section: {para[:60]}...")
+                        logger.debug("📝 Added paragraph section: %.60s...", para)
             
-            print(f"⚡ GAS PARSING: Processing {len(sections)} sections for optimization extraction")
+            logger.debug("⚡ GAS PARSING: Processing %d sections for optimization extraction", len(sections))
             
             for i, section in enumerate(sections):
                 try:
                     section = section.strip()
                     if len(section) < 40:  # Reduced minimum length
-                        print(f"⚡ GAS PARSING: Skipping short section {i+1} ({len(section)} chars)")
+                        logger.debug("⚡ GAS PARSING: Skipping short section %d (%d chars)", i + 1, len(section))
                         continue
                     
-                    print(f"⚡ GAS PARSING: Processing section {i+1}: {section[:100]}...")
+                    logger.debug("⚡ GAS PARSING: Processing section %d: %.100s...", i + 1, section)
                     
                     opt_info = self._extract_gas_optimization_info(section)
                     
                     if self._is_valid_gas_optimization(opt_info, section):
-                        print(f"✅ GAS PARSING: Added optimization: {opt_info['optimization_type']}")
+                        logger.debug("✅ GAS PARSING: Added optimization: %s", opt_info['optimization_type'])
                         optimizations.append(opt_info)
                     else:
-                        print(f"❌ GAS PARSING: Rejected section - insufficient content")
-                        print(f"   Description length: {len(opt_info.get('description', ''))}")
-                        print(f"   Optimization type: {opt_info.get('optimization_type', 'N/A')}")
+                        logger.debug("❌ GAS PARSING: Rejected section - insufficient content\n   Description length: %d\n   Optimization type: %s",
+                                     len(opt_info.get('description', '')), opt_info.get('optimization_type', 'N/A'))
                         
                 except Exception as section_error:
-                    print(f"❌ ERROR processing gas section {i+1}: {str(section_error)}")
-                    import traceback
-                    traceback.print_exc()
+                    # One line per bad section; the traceback only when debugging
+                    logger.error("❌ ERROR processing gas section %d: %s", i + 1, section_error,
+                                 exc_info=logger.isEnabledFor(logging.DEBUG))
                     continue
             
-            print(f"⚡ GAS PARSING: Final result - {len(optimizations)} optimizations found")
+            logger.debug("⚡ GAS PARSING: Final result - %d optimizations found", len(optimizations))
             
             # If no optimizations found, create fallback optimizations from raw text
             if len(optimizations) == 0 and len(text) > 100:
-                print("⚡ GAS PARSING: No structured optimizations found, creating fallback optimizations...")
+                logger.debug("⚡ GAS PARSING: No structured optimizations found, creating fallback optimizations...")
                 fallback_optimizations = self._create_fallback_gas_optimizations(text)
                 optimizations.extend(fallback_optimizations)
-                print(f"⚡ GAS PARSING: Added {len(fallback_optimizations)} fallback optimizations")
+                logger.debug("⚡ GAS PARSING: Added %d fallback optimizations", len(fallback_optimizations))
             
             return optimizations
             
         except Exception as e:
-            print(f"❌ ERROR in _extract_gas_optimizations: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ ERROR in _extract_gas_optimizations: %s", e)
             return []
 
     def _extract_gas_optimization_info(self, section: str) -> dict:
         """Extract gas optimization information"""
-        opt_type = self._extract_optimization_type(section)
-        description = self._extract_optimization_description(section)
-        gas_savings = self._extract_gas_savings(section)
-        difficulty = self._extract_implementation_difficulty(section)
-        original_code, optimized_code = self._extract_code_examples(section)
+        # Lowercased once for every keyword scan below
+        section_lower = section.lower()
+        # Only the description is taken from the head of a long section; the labelled fields can sit at its tail
+        if len(section) > _GAS_SECTION_SCAN_CHARS:
+            head = section[:_GAS_SECTION_SCAN_CHARS]
+            head_lower = head.lower()
+        else:
+            head, head_lower = section, section_lower
+        opt_type = self._extract_optimization_type(section, section_lower)
+        description = self._extract_optimization_description(head, head_lower)
+        gas_savings = self._extract_gas_savings(section_lower)
+        difficulty = self._extract_implementation_difficulty(section_lower)
+        original_code, optimized_code = self._extract_code_examples(section, section_lower)
         
         return {
             "optimization_type": opt_type,
@@ -813,57 +1362,23 @@ Be thorough in finding ALL optimization opportunities."""
             "optimized_code": optimized_code
         }
 
-    def _extract_optimization_type(self, section: str) -> str:
+    def _extract_optimization_type(self, section: str, section_lower: str) -> str:
         """Extract optimization type"""
-        # Enhanced type patterns
-        type_patterns = [
-            r'(?:optimization\s+type|type|category)[:\s]*([^\n]+)',
-            r'\*\*\s*([^*\n]+(?:optimization|packing|efficiency|gas|save|reduce))\s*\*\*',
-            r'(?:^|\n)#{1,6}\s*([^#\n]*(?:optimization|packing|efficiency|gas|save|reduce)[^#\n]*)(?:\n|$)',
-            r'(?:^|\n)(\d+\.\s*[^:\n]*(?:optimization|packing|efficiency|gas|save|reduce)[^:\n]*?)(?:\n|:)',
-        ]
-        
-        for pattern in type_patterns:
-            match = re.search(pattern, section, re.IGNORECASE)
+        for pattern in _OPT_TYPE_PATTERNS:
+            match = pattern.search(section)
             if match:
                 opt_type = match.group(1).strip()
-                opt_type = re.sub(r'^[*\s\-#\d\.]+|[*\s\-#]+$', '', opt_type)
+                opt_type = opt_type.lstrip(_TITLE_LEAD_CHARS).rstrip(_TITLE_TAIL_CHARS)
                 if len(opt_type) > 3 and len(opt_type) < 80:
                     return opt_type
         
-        # Enhanced specific optimization patterns
-        opt_patterns = {
-            r'storage.*pack': 'Storage Packing Optimization',
-            r'memory.*cach': 'Memory Caching Optimization',
-            r'loop.*optim': 'Loop Optimization',
-            r'external.*public': 'External vs Public Optimization',
-            r'public.*external': 'Function Visibility Optimization',
-            r'custom.*error': 'Custom Error Optimization',
-            r'require.*revert': 'Error Handling Optimization',
-            r'\+\+i.*i\+\+': 'Increment Optimization',
-            r'i\+\+.*\+\+i': 'Pre-increment Optimization',
-            r'constant.*immutable': 'Variable Declaration Optimization',
-            r'immutable.*constant': 'State Variable Optimization',
-            r'uint256.*uint': 'Type Optimization',
-            r'bytes32.*string': 'Data Type Optimization',
-            r'mapping.*array': 'Data Structure Optimization',
-            r'assembly.*inline': 'Assembly Optimization',
-            r'gas.*limit': 'Gas Limit Optimization',
-            r'storage.*read': 'Storage Access Optimization',
-            r'storage.*write': 'Storage Write Optimization',
-            r'function.*visibility': 'Function Visibility Optimization',
-            r'struct.*pack': 'Struct Packing Optimization',
-            r'array.*length': 'Array Length Optimization',
-            r'zero.*value': 'Zero Value Optimization'
-        }
-        
-        section_lower = section.lower()
-        for pattern, opt_name in opt_patterns.items():
-            if re.search(pattern, section_lower):
+        # Specific optimization patterns (matched against the lowercased section)
+        for pattern, opt_name in _OPT_NAME_PATTERNS:
+            if pattern.search(section_lower):
                 return opt_name
         
         # Check for common gas optimization keywords in the first line
-        first_line = section.split('\n')[0].lower()
+        first_line = section_lower.split('\n', 1)[0]
         if any(word in first_line for word in ['storage', 'memory', 'loop', 'external', 'public', 'constant', 'immutable']):
             if 'storage' in first_line:
                 return 'Storage Optimization'
@@ -878,36 +1393,32 @@ Be thorough in finding ALL optimization opportunities."""
         
         return "Gas Optimization"
 
-    def _extract_optimization_description(self, section: str) -> str:
+    def _extract_optimization_description(self, section: str, section_lower: str) -> str:
         """Extract optimization description"""
-        # Enhanced description patterns
-        desc_patterns = [
-            r'(?:description|summary|issue|inefficiency|problem)[:\s]*((?:[^\n]|\n(?!\s*\*\*))*?)(?=\n\s*\*\*|$)',
-            r'(?:current\s+code|original\s+code|before)[:\s]*[^\n]*\n(.*?)(?=(?:optimized|after|solution|fix|\n\s*\*\*)|$)',
-            r'(?:^|\n)([^:\n]*(?:gas|inefficient|optimize|reduce|save|expensive|cost)[^:\n]*?)(?:\n|:)',
-        ]
-        
-        for pattern in desc_patterns:
-            match = re.search(pattern, section, re.IGNORECASE | re.DOTALL)
-            if match:
-                desc = match.group(1).strip()
+        for start_re, end_re in _OPT_DESCRIPTION_SPANS:
+            span = _span_between(start_re, end_re, section)
+            if span is not None:
+                desc = span.strip()
                 desc = self._clean_extracted_text(desc)
                 if len(desc) > 20 and not self._is_template_text(desc):
                     return desc
         
-        # Fallback to first sentences that mention gas optimization
-        sentences = re.split(r'[.!?]+', section)
+        # Fallback to first sentences that mention gas optimization; lowering never
+        # touches the split characters, so the lowered pieces line up with the originals
+        sentences = _SENTENCE_SPLIT_RE.split(section)
+        sentences_lower = _SENTENCE_SPLIT_RE.split(section_lower)
         desc_sentences = []
         
-        for sentence in sentences[:6]:  # Check more sentences
+        for sentence, sentence_lower in zip(sentences[:6], sentences_lower):  # Check more sentences
             sentence = sentence.strip()
+            sentence_lower = sentence_lower.strip()
             if (len(sentence) > 15 and  # Reduced threshold
-                any(word in sentence.lower() for word in [
+                any(word in sentence_lower for word in [
                     'gas', 'inefficient', 'optimize', 'reduce', 'save', 'expensive',
                     'cost', 'efficient', 'cheaper', 'packing', 'storage', 'memory',
                     'external', 'public', 'loop', 'constant', 'immutable'
                 ]) and
-                not self._is_template_text(sentence)):
+                not _has_template_phrase(sentence_lower)):
                 desc_sentences.append(sentence)
                 if len(' '.join(desc_sentences)) > 80:
                     break
@@ -916,53 +1427,31 @@ Be thorough in finding ALL optimization opportunities."""
             return self._clean_extracted_text('. '.join(desc_sentences) + '.')
         
         # Last resort: use the first substantial line that mentions gas
-        lines = section.split('\n')
-        for line in lines:
-            line = line.strip()
-            if (len(line) > 20 and 
-                any(word in line.lower() for word in ['gas', 'optimization', 'efficient', 'save', 'reduce']) and
-                not self._is_template_text(line)):
+        for match in _GAS_LINE_RE.finditer(section):
+            line = match.group(0).strip()
+            if len(line) > 20 and not _has_template_phrase(line.lower()):
                 return self._clean_extracted_text(line)
         
         return "Gas optimization opportunity identified in smart contract"
 
-    def _extract_gas_savings(self, section: str) -> str:
-        """Extract estimated gas savings"""
-        # Enhanced patterns to capture more gas savings formats
-        savings_patterns = [
-            r'(?:estimated\s+)?gas\s+savings?[:\s]*(\d+)',
-            r'(?:saves?|reduction)[:\s]*(\d+)\s*gas',
-            r'(\d+)\s*gas.*?(?:saved|reduction|less)',
-            r'(\d+)\s*gas\s+(?:per|units)',  # "1200 gas per iteration", "15000 gas units"
-            r'saves?\s+approximately\s+(\d+)\s*gas',  # "saves approximately 1200 gas"
-            r'estimated\s+savings?[:\s]*(\d+)',  # "Estimated savings: 2000"
-            r'gas[:\s]*(\d+)\s*units',  # "Gas: 15000 units"
-            r'(\d+)\s*(?:gas\s+)?units\s+per',  # "15000 units per transaction"
-        ]
-        
-        for pattern in savings_patterns:
-            match = re.search(pattern, section, re.IGNORECASE)
+    def _extract_gas_savings(self, section_lower: str) -> str:
+        """Extract estimated gas savings from the lowercased section"""
+        for pattern in _GAS_SAVINGS_PATTERNS:
+            match = pattern.search(section_lower)
             if match:
                 savings = int(match.group(1))
                 if 0 < savings < 1000000:  # Reasonable range
                     return str(savings)
         
         # Look for proper range patterns (e.g., "1000-1500 gas", "500 to 800 gas")
-        range_patterns = [
-            r'(\d+)[-–]\s*(\d+)\s*gas',  # "1000-1500 gas"
-            r'(\d+)\s*to\s*(\d+)\s*gas',  # "500 to 800 gas"
-            r'between\s+(\d+)\s+and\s+(\d+)\s*gas',  # "between 100 and 200 gas"
-        ]
-        
-        for pattern in range_patterns:
-            range_match = re.search(pattern, section, re.IGNORECASE)
+        for pattern in _GAS_RANGE_PATTERNS:
+            range_match = pattern.search(section_lower)
             if range_match:
                 lower, upper = int(range_match.group(1)), int(range_match.group(2))
                 if lower < upper:  # Valid range
                     return str(upper)  # Take upper bound
         
         # Default estimates based on optimization type
-        section_lower = section.lower()
         if 'storage' in section_lower and 'pack' in section_lower:
             return "20000"
         elif 'loop' in section_lower:
@@ -972,22 +1461,16 @@ Be thorough in finding ALL optimization opportunities."""
         else:
             return "1000"
 
-    def _extract_implementation_difficulty(self, section: str) -> str:
-        """Extract implementation difficulty"""
-        difficulty_patterns = [
-            r'(?:implementation\s+)?difficulty[:\s]*([a-zA-Z]+)',
-            r'(?:complexity|effort)[:\s]*([a-zA-Z]+)',
-        ]
-        
-        for pattern in difficulty_patterns:
-            match = re.search(pattern, section, re.IGNORECASE)
+    def _extract_implementation_difficulty(self, section_lower: str) -> str:
+        """Extract implementation difficulty from the lowercased section"""
+        for pattern in _DIFFICULTY_PATTERNS:
+            match = pattern.search(section_lower)
             if match:
-                difficulty = match.group(1).strip().lower()
-                if difficulty in ['easy', 'medium', 'hard']:
+                difficulty = _DIFFICULTY_LEVELS.get(match.group(1))
+                if difficulty:
                     return difficulty
         
         # Infer from content
-        section_lower = section.lower()
         if any(word in section_lower for word in ['simple', 'straightforward', 'easy', 'trivial']):
             return "easy"
         elif any(word in section_lower for word in ['complex', 'difficult', 'risky', 'careful', 'breaking']):
@@ -995,37 +1478,33 @@ Be thorough in finding ALL optimization opportunities."""
         else:
             return "medium"
 
-    def _extract_code_examples(self, section: str) -> tuple:
+    def _extract_code_examples(self, section: str, section_lower: str) -> tuple:
         """Extract original and optimized code examples"""
-        # Find all code blocks
-        code_patterns = [
-            r'```(?:solidity|sol)?\s*(.*?)```',
-            r'`([^`\n]{20,})`',
-        ]
-        
+        # Find code blocks (fenced first, then inline); only the first two are ever used
         all_code_blocks = []
-        for pattern in code_patterns:
-            blocks = re.findall(pattern, section, re.DOTALL)
-            for block in blocks:
-                block = block.strip()
+        for pattern in _GAS_CODE_PATTERNS:
+            for match in pattern.finditer(section):
+                block = match.group(1).strip()
                 if len(block) > 20 and self._looks_like_solidity_code(block):
                     all_code_blocks.append(block)
+                    if len(all_code_blocks) == 2:
+                        break
+            if len(all_code_blocks) == 2:
+                break
         
         if len(all_code_blocks) >= 2:
             return all_code_blocks[0], all_code_blocks[1]
         elif len(all_code_blocks) == 1:
             # Generate the missing code example
-            return self._generate_code_examples(all_code_blocks[0], section)
+            return self._generate_code_examples(all_code_blocks[0], section_lower)
         else:
             # Generate both based on section content
             default_original = "// Original inefficient code:\ncontract Example {\n    uint256 public value;\n    function setValue(uint256 _value) public {\n        value = _value;\n    }\n}"
             default_optimized = "// Optimized code:\ncontract Example {\n    uint256 public value;\n    function setValue(uint256 _value) external {\n        value = _value;\n    }\n}"
             return default_original, default_optimized
 
-    def _generate_code_examples(self, code: str, section: str) -> tuple:
-        """Generate missing code example based on existing one and context"""
-        section_lower = section.lower()
-        
+    def _generate_code_examples(self, code: str, section_lower: str) -> tuple:
+        """Generate missing code example based on existing one and (lowercased) section context"""
         # Determine if existing code is original or optimized
         if any(word in section_lower for word in ['before', 'current', 'inefficient', 'original']):
             # Existing is original, generate optimized
@@ -1044,37 +1523,35 @@ Be thorough in finding ALL optimization opportunities."""
         if not text or len(text) < 10:
             return False
         
-        solidity_indicators = [
-            r'\bfunction\b', r'\bcontract\b', r'\bmapping\b', r'\buint\d*\b',
-            r'\baddress\b', r'\bbool\b', r'\bpublic\b', r'\bprivate\b',
-            r'\bexternal\b', r'\binternal\b', r'\brequire\b', r'\brevert\b'
-        ]
+        # Every whole-word hit is also a substring hit, so fewer than two substrings settles it
+        text_lower = text.lower()
+        hits = 0
+        for token in _SOLIDITY_TOKENS:
+            if token in text_lower:
+                hits += 1
+                if hits == 2:
+                    break
+        else:
+            return False
         
-        matches = sum(1 for pattern in solidity_indicators if re.search(pattern, text, re.IGNORECASE))
-        return matches >= 2
+        seen = set()
+        for match in _SOLIDITY_INDICATOR_RE.finditer(text):
+            seen.add(match.lastindex)
+            if len(seen) >= 2:
+                return True
+        return False
 
     def _clean_extracted_text(self, text: str) -> str:
         """Clean extracted text"""
         if not text:
             return ""
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\n\n+', '\n\n', text)
-        
-        return text.strip()
+        # Collapse all whitespace (newlines included) to single spaces
+        return ' '.join(text.split())
 
-    def _is_template_text(self, text: str) -> str:
+    def _is_template_text(self, text: str) -> bool:
         """Check if text is template/instructional content"""
-        template_phrases = [
-            'provide', 'include', 'example',
-            'template', 'guidelines', 'instructions', 'format',
-            'structure', 'should contain', 'must include',
-            'for each vulnerability found'
-        ]
-        
-        text_lower = text.lower()
-        return any(phrase in text_lower for phrase in template_phrases)
+        return _has_template_phrase(text.lower())
 
     def _is_valid_security_vulnerability(self, vuln_info: dict, original_section: str) -> bool:
         """Validate if parsed content represents a real vulnerability"""
@@ -1083,16 +1560,11 @@ Be thorough in finding ALL optimization opportunities."""
             return False
         
         # Must contain security-related keywords
-        security_keywords = [
-            'vulnerability', 'security', 'attack', 'exploit', 'risk', 'unsafe', 
-            'malicious', 'reentrancy', 'overflow', 'underflow', 'access control'
-        ]
-        
-        if not any(keyword in desc for keyword in security_keywords):
+        if not _has_security_keyword(desc):
             return False
         
-        # Reject template content
-        if self._is_template_text(desc):
+        # Reject template content (desc is already lowercased)
+        if _has_template_phrase(desc):
             return False
         
         return True
@@ -1101,35 +1573,26 @@ Be thorough in finding ALL optimization opportunities."""
         """Validate if parsed content represents a real gas optimization"""
         desc = opt_info.get('description', '').lower()
         if len(desc) < 20:  # Reduced threshold
-            print(f"   Validation failed: Description too short ({len(desc)} chars)")
+            logger.debug("   Validation failed: Description too short (%d chars)", len(desc))
             return False
         
         # Enhanced gas-related keywords
-        gas_keywords = [
-            'gas', 'optimization', 'optimize', 'efficient', 'cheaper', 'save',
-            'reduce', 'packing', 'storage', 'memory', 'external',
-            'public', 'loop', 'increment', 'constant', 'immutable',
-            'cost', 'expensive', 'consumption', 'usage', 'assembly',
-            'uint256', 'uint', 'bytes32', 'mapping', 'struct', 'array',
-            'call', 'function', 'visibility', 'error', 'require'
-        ]
-        
-        if not any(keyword in desc for keyword in gas_keywords):
-            print(f"   Validation failed: No gas keywords found in description")
+        if not _has_gas_validation_keyword(desc):
+            logger.debug("   Validation failed: No gas keywords found in description")
             return False
         
         # Check optimization type
         opt_type = opt_info.get('optimization_type', '').lower()
         if 'gas' not in opt_type and 'optimization' not in opt_type and len(opt_type) < 3:
-            print(f"   Validation failed: Invalid optimization type: {opt_type}")
+            logger.debug("   Validation failed: Invalid optimization type: %s", opt_type)
             return False
         
-        # Reject template content
-        if self._is_template_text(desc):
-            print(f"   Validation failed: Template text detected")
+        # Reject template content (desc is already lowercased)
+        if _has_template_phrase(desc):
+            logger.debug("   Validation failed: Template text detected")
             return False
         
-        print(f"   ✅ Validation passed: {opt_info.get('optimization_type', 'Unknown')}")
+        logger.debug("   ✅ Validation passed: %s", opt_info.get('optimization_type', 'Unknown'))
         return True
 
     def _clean_agent_response(self, text: str) -> str:
@@ -1138,8 +1601,8 @@ Be thorough in finding ALL optimization opportunities."""
             return ""
         
         # Remove common metadata patterns
-        text = re.sub(r'conversation_id[:\s]*[a-zA-Z0-9\-_]+', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'request_id[:\s]*[a-zA-Z0-9\-_]+', '', text, flags=re.IGNORECASE)
+        for pattern in _METADATA_PATTERNS:
+            text = pattern.sub('', text)
         
         return text.strip()
 
@@ -1151,8 +1614,8 @@ Be thorough in finding ALL optimization opportunities."""
         optimized = original_code
         
         # Apply common optimizations
-        optimized = re.sub(r'\bpublic\b', 'external', optimized)
-        optimized = re.sub(r'\bi\+\+', '++i', optimized)
+        optimized = _PUBLIC_KEYWORD_RE.sub('external', optimized)
+        optimized = _POST_INCREMENT_RE.sub('++i', optimized)
         
         return f"// Gas-optimized version:\n{optimized}"
 
@@ -1164,8 +1627,8 @@ Be thorough in finding ALL optimization opportunities."""
         original = optimized_code
         
         # Reverse optimizations
-        original = re.sub(r'\bexternal\b', 'public', original)
-        original = re.sub(r'\+\+i\b', 'i++', original)
+        original = _EXTERNAL_KEYWORD_RE.sub('public', original)
+        original = _PRE_INCREMENT_RE.sub('i++', original)
         
         return f"// Original inefficient version:\n{original}"
     
@@ -1173,52 +1636,14 @@ Be thorough in finding ALL optimization opportunities."""
         """Create fallback gas optimizations when structured parsing fails"""
         optimizations = []
         
-        # Common gas optimization patterns to look for
-        optimization_hints = [
-            {
-                'keywords': ['storage', 'pack', 'slot'],
-                'type': 'Storage Packing Optimization',
-                'description': 'Pack storage variables to reduce storage slots and save gas on state operations.',
-                'savings': '20000'
-            },
-            {
-                'keywords': ['external', 'public', 'function'],
-                'type': 'Function Visibility Optimization',
-                'description': 'Use external instead of public for functions to save gas on function calls.',
-                'savings': '500'
-            },
-            {
-                'keywords': ['loop', '++i', 'i++', 'increment'],
-                'type': 'Loop Optimization',
-                'description': 'Use ++i instead of i++ in loops to save gas on increment operations.',
-                'savings': '1000'
-            },
-            {
-                'keywords': ['constant', 'immutable', 'variable'],
-                'type': 'Variable Declaration Optimization',
-                'description': 'Use constant or immutable for unchanging values to save gas.',
-                'savings': '2000'
-            },
-            {
-                'keywords': ['require', 'error', 'revert', 'string'],
-                'type': 'Custom Error Optimization',
-                'description': 'Replace require statements with custom errors to reduce gas costs.',
-                'savings': '1500'
-            },
-            {
-                'keywords': ['memory', 'storage', 'cache'],
-                'type': 'Memory Optimization',
-                'description': 'Cache storage reads in memory to avoid redundant SLOAD operations.',
-                'savings': '800'
-            }
-        ]
-        
         text_lower = text.lower()
         
-        for hint in optimization_hints:
+        for hint in _GAS_FALLBACK_HINTS:
+            if len(optimizations) == 3:  # Limit to 3 fallback optimizations
+                break
             if any(keyword in text_lower for keyword in hint['keywords']):
                 # Extract relevant text snippet
-                code_snippet = self._extract_relevant_code_snippet(text, hint['keywords'])
+                code_snippet = self._extract_relevant_code_snippet(text, text_lower, hint['keywords'])
                 
                 optimization = {
                     'optimization_type': hint['type'],
@@ -1230,29 +1655,23 @@ Be thorough in finding ALL optimization opportunities."""
                 }
                 
                 optimizations.append(optimization)
-                print(f"📝 Created fallback optimization: {hint['type']}")
+                logger.debug("📝 Created fallback optimization: %s", hint['type'])
         
-        return optimizations[:3]  # Limit to 3 fallback optimizations
+        return optimizations
 
-    def _extract_relevant_code_snippet(self, text: str, keywords: list) -> str:
+    def _extract_relevant_code_snippet(self, text: str, text_lower: str, keywords: list) -> str:
         """Extract a relevant code snippet based on keywords"""
         # Look for code blocks first
-        code_patterns = [
-            r'```(?:solidity|sol)?\s*(.*?)```',
-            r'`([^`\n]{20,})`',
-        ]
-        
-        for pattern in code_patterns:
-            matches = re.findall(pattern, text, re.DOTALL)
-            for match in matches:
-                match = match.strip()
-                if any(keyword in match.lower() for keyword in keywords):
+        for pattern in _GAS_CODE_PATTERNS:
+            for match in pattern.finditer(text):
+                match = match.group(1).strip()
+                match_lower = match.lower()
+                if any(keyword in match_lower for keyword in keywords):
                     return match[:200]  # Limit length
         
-        # Look for lines containing keywords
-        lines = text.split('\n')
-        for line in lines:
-            if any(keyword in line.lower() for keyword in keywords) and len(line.strip()) > 10:
+        # Look for lines containing keywords (lowering keeps newlines, so the lines pair up)
+        for line, line_lower in zip(text.split('\n'), text_lower.split('\n')):
+            if any(keyword in line_lower for keyword in keywords) and len(line.strip()) > 10:
                 return line.strip()[:100]
         
         return ""